@@ -1,9 +1,11 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from app.database.engines import engines
+
 load_dotenv()
 
 DB_HOST = os.getenv("DB_HOST")
@@ -14,8 +16,19 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+# Motores del registro común (mismo pool y métricas que la base de datos principal)
+engines.register("hybrid", DATABASE_URL)
+engine = engines.engine("hybrid")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Motor asíncrono (asyncpg) para los handlers async
+async_engine = engines.async_engine("hybrid")
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+# Base propia del módulo híbrido, separada a propósito de la de
+# app.database.database: sus modelos viven en otra base de datos (PostgreSQL)
+# y sus metadatos no deben mezclarse con los de la principal en create_all
 Base = declarative_base()
 
 def get_db():
@@ -24,3 +37,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
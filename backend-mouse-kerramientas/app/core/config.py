@@ -13,12 +13,50 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./mouse_kerramientas.db"
+    # Pool de conexiones de cada motor SQL, por worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # segundos; -1 no recicla las conexiones
+    DB_POOL_PRE_PING: bool = True
+    # Perfil de producción para SQLite en fichero: WAL, pragmas en cada
+    # conexión y un pool de solo lectura para los GET (desactivado por defecto)
+    SQLITE_PRODUCTION_PROFILE: bool = False
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes
+    SQLITE_CACHE_SIZE: int = -65536  # negativo: KiB por conexión
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Scheduled Jobs (0 desactiva la tarea)
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = 300
+    
+    # Admin Dashboard
+    ADMIN_DASHBOARD_CACHE_SECONDS: int = 30
+    
+    # Audit Log (escritura por lotes)
+    AUDIT_LOG_BATCH_SIZE: int = 100
+    AUDIT_LOG_FLUSH_SECONDS: float = 1.0
+    AUDIT_LOG_MAX_PENDING: int = 10000  # lleno: se escribe en el hilo de la petición
+    AUDIT_LOG_MAX_ATTEMPTS: int = 3  # después se descarta la entrada (queda en el log)
+    
+    # Backups
+    BACKUP_DIR: str = "backups"
+    BACKUP_BATCH_SIZE: int = 1000
+    BACKUP_CHECK_INTERVAL_SECONDS: int = 60  # 0 desactiva las copias programadas
     
     # Security
     BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # por encima se responde 503
+    AUTH_USER_CACHE_SECONDS: int = 30
+    AUTH_USER_CACHE_SIZE: int = 10000
+    ACCESS_TOKEN_CLAIMS: bool = True  # id, estado y versión del usuario en el token
+    TOKEN_VERSION_REFRESH_SECONDS: float = 5.0
+    REVOKED_TOKEN_SWEEP_INTERVAL_SECONDS: int = 3600  # 0 desactiva la limpieza
     
     # API Configuration
     API_V1_STR: str = "/api"
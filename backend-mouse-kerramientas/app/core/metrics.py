@@ -0,0 +1,68 @@
+"""
+Métricas en memoria del proceso (contadores, indicadores y tiempos)
+"""
+import threading
+from typing import Dict
+
+
+class Metrics:
+    """
+    Registro de métricas seguro entre hilos
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Incrementar un contador
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Fijar el valor actual de un indicador
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Registrar una observación (por ejemplo, una duración en milisegundos)
+        """
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += value
+            timing["max"] = max(timing["max"], value)
+
+    def snapshot(self) -> dict:
+        """
+        Obtener una copia de todas las métricas
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {
+                    name: {**timing, "avg": timing["total"] / timing["count"]}
+                    for name, timing in self._timings.items()
+                }
+            }
+
+    def reset(self) -> None:
+        """
+        Eliminar todas las métricas
+        """
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+
+# Instancia global de métricas
+metrics = Metrics()
@@ -0,0 +1,141 @@
+"""
+Paginación por cursor (keyset) para los listados de la API
+"""
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# Cabecera en la que se devuelve el cursor de la página siguiente
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CURSOR_DESCRIPTION = f"Cursor opaco de la página siguiente (cabecera {NEXT_CURSOR_HEADER}); reemplaza a skip"
+
+
+class InvalidCursorError(ValueError):
+    """
+    Error lanzado cuando el cursor recibido no es válido
+    """
+
+
+class CursorPage(list):
+    """
+    Lista de resultados con el cursor de la página siguiente
+    """
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codificar los valores de ordenación de la última fila como cursor opaco
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodificar un cursor opaco
+
+    Raises:
+        InvalidCursorError: si el cursor está corrupto o no corresponde al listado
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Cursor inválido")
+    return values
+
+
+def keyset_page(
+    query: Query,
+    keys: Sequence[Tuple[Any, bool]],
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> CursorPage:
+    """
+    Paginar una consulta por cursor, o por skip/limit si no se recibe cursor
+
+    Args:
+        query: Consulta a paginar
+        keys: Columnas de ordenación únicas en conjunto, como (columna, descendente)
+        cursor: Cursor devuelto por la página anterior
+        skip: Registros a saltar (modo heredado, se ignora si hay cursor)
+        limit: Número máximo de registros
+
+    Returns:
+        Página de resultados con ``next_cursor`` si puede haber más registros
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        conditions = []
+        for position, (column, descending) in enumerate(keys):
+            equal = [keys[i][0] == values[i] for i in range(position)]
+            step = column < values[position] if descending else column > values[position]
+            conditions.append(and_(*equal, step))
+        query = query.filter(or_(*conditions))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    query = query.add_columns(*[column for column, _ in keys])
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+
+    page = CursorPage()
+    for row in rows:
+        item = row[:-len(keys)]
+        page.append(item[0] if len(item) == 1 else item)
+    if rows and len(rows) == limit:
+        page.next_cursor = encode_cursor(rows[-1][-len(keys):])
+    return page
+
+
+def offset_page(
+    query: Query,
+    order_by: Sequence[Any],
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> CursorPage:
+    """
+    Paginar por posición una consulta cuyo orden no sirve de cursor (por
+    ejemplo la relevancia, que cambia al cambiar el índice de texto). El
+    cursor guarda la posición de la página siguiente.
+
+    Args:
+        query: Consulta a paginar
+        order_by: Expresiones de ordenación; la última debe ser única
+        cursor: Cursor devuelto por la página anterior
+        skip: Registros a saltar (modo heredado, se ignora si hay cursor)
+        limit: Número máximo de registros
+
+    Returns:
+        Página de resultados con ``next_cursor`` si puede haber más registros
+    """
+    offset = skip
+    if cursor:
+        kind, offset = decode_cursor(cursor, 2)
+        if kind != "offset" or not isinstance(offset, int) or offset < 0:
+            raise InvalidCursorError("Cursor inválido")
+
+    rows = query.order_by(*order_by).offset(offset).limit(limit).all()
+
+    page = CursorPage(rows)
+    if rows and len(rows) == limit:
+        page.next_cursor = encode_cursor(["offset", offset + len(rows)])
+    return page
+
+
+def set_next_cursor(response: Response, page: CursorPage) -> None:
+    """
+    Añadir el cursor de la página siguiente a la respuesta
+    """
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
@@ -1,8 +1,9 @@
 """
 Utilidades de seguridad para autenticación y manejo de contraseñas
 """
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -10,15 +11,26 @@ from passlib.context import CryptContext
 
 from .config import settings
 
-# Configuración de bcrypt para hashear contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Configuración de bcrypt para hashear contraseñas. El coste es exactamente
+# BCRYPT_ROUNDS: los hashes con otro coste (mayor o menor) se consideran
+# desactualizados y se rehashean en el siguiente login correcto.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Valor del claim "typ" de los refresh tokens (los de acceso no lo llevan)
+REFRESH_TOKEN_TYPE = "refresh"
 
 # Configuración OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[dict] = None
 ) -> str:
     """
     Crear un token JWT de acceso
@@ -26,6 +38,7 @@ def create_access_token(
     Args:
         subject: El sujeto del token (normalmente user_id)
         expires_delta: Tiempo de expiración opcional
+        claims: Claims adicionales (id, estado y versión del usuario)
         
     Returns:
         Token JWT como string
@@ -37,11 +50,29 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(subject: Union[str, Any], claims: dict) -> str:
+    """
+    Crear un refresh token JWT con identificador único (``jti``)
+    
+    Args:
+        subject: El sujeto del token
+        claims: Claims del usuario (id, estado y versión)
+        
+    Returns:
+        Token JWT como string
+    """
+    return create_access_token(
+        subject,
+        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        claims={**claims, "typ": REFRESH_TOKEN_TYPE, "jti": uuid.uuid4().hex}
+    )
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verificar una contraseña en texto plano contra su hash
@@ -56,6 +87,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar una contraseña y, si su hash usa otro coste, calcular el nuevo
+    
+    Args:
+        plain_password: Contraseña en texto plano
+        hashed_password: Contraseña hasheada
+        
+    Returns:
+        (coincide, nuevo hash o None si no hace falta actualizarlo)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """
     Hashear una contraseña
@@ -69,6 +116,24 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def decode_token(token: str) -> Optional[dict]:
+    """
+    Verificar un token JWT y devolver todos sus claims
+    
+    Args:
+        token: Token JWT
+        
+    Returns:
+        Claims del token si es válido, None en caso contrario
+    """
+    try:
+        return jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+
+
 def verify_token(token: str) -> Union[str, None]:
     """
     Verificar y decodificar un token JWT
@@ -1,20 +1,24 @@
+import json
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy import desc
 
+from ..core.pagination import CursorPage, keyset_page
 from ..models.admin_log import AdminLog
 from ..models.backup_config import BackupConfig
+from ..models.backup_manifest import BackupManifest
 from ..schemas.admin import AdminLogCreate, BackupConfigCreate, BackupConfigUpdate
 
 
-def create_admin_log(
-    db: Session, 
-    log: AdminLogCreate, 
-    admin_id: int, 
+def add_admin_log(
+    db: Session,
+    log: AdminLogCreate,
+    admin_id: int,
     admin_username: str,
     ip_address: Optional[str] = None
 ) -> AdminLog:
+    # Añade la entrada a la transacción en curso; la confirma quien llama
     db_log = AdminLog(
         admin_id=admin_id,
         admin_username=admin_username,
@@ -25,13 +29,25 @@ def create_admin_log(
         ip_address=ip_address
     )
     db.add(db_log)
+    return db_log
+
+
+def create_admin_log(
+    db: Session, 
+    log: AdminLogCreate, 
+    admin_id: int, 
+    admin_username: str,
+    ip_address: Optional[str] = None
+) -> AdminLog:
+    db_log = add_admin_log(db, log, admin_id, admin_username, ip_address)
     db.commit()
     db.refresh(db_log)
     return db_log
 
 
-def get_admin_logs(db: Session, skip: int = 0, limit: int = 100) -> List[AdminLog]:
-    return db.query(AdminLog).order_by(desc(AdminLog.created_at)).offset(skip).limit(limit).all()
+def get_admin_logs(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> CursorPage:
+    # El id crece con created_at, así que ordenar por id (desc) da el mismo orden con un índice único
+    return keyset_page(db.query(AdminLog), [(AdminLog.id, True)], cursor=cursor, skip=skip, limit=limit)
 
 
 def get_admin_logs_by_admin(db: Session, admin_id: int, skip: int = 0, limit: int = 100) -> List[AdminLog]:
@@ -77,3 +93,29 @@ def delete_backup_config(db: Session, config_id: int) -> bool:
         db.commit()
         return True
     return False
+
+
+def get_backup_manifests(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> CursorPage:
+    # Catálogo de copias: más recientes primero, con el nombre de la copia anterior de la cadena
+    parent = aliased(BackupManifest)
+    query = db.query(BackupManifest, parent.filename).outerjoin(
+        parent, BackupManifest.parent_id == parent.id
+    ).filter(BackupManifest.kind.in_(["full", "incremental"]))
+    page = keyset_page(query, [(BackupManifest.id, True)], cursor=cursor, skip=skip, limit=limit)
+    page[:] = [
+        {
+            "id": manifest.id,
+            "filename": manifest.filename,
+            "kind": manifest.kind,
+            "parent": parent_filename,
+            "config_id": manifest.config_id,
+            "size": manifest.size,
+            "tables": json.loads(manifest.tables),
+            "checksum": manifest.checksum,
+            "duration_ms": manifest.duration_ms,
+            "created_by": manifest.created_by,
+            "created_at": manifest.created_at
+        }
+        for manifest, parent_filename in page
+    ]
+    return page
@@ -3,9 +3,11 @@ Operaciones CRUD para calificaciones.
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import and_, case, func
+from sqlalchemy.dialects import postgresql, sqlite
 
-from ..models.rating import Rating
+from ..core.pagination import CursorPage, keyset_page
+from ..models.rating import Rating, ToolRatingSummary
 from ..models.user import User
 from ..models.tool import Tool
 from ..schemas.rating import RatingCreate, RatingUpdate
@@ -16,9 +18,37 @@ def get_rating(db: Session, rating_id: int) -> Optional[Rating]:
     return db.query(Rating).filter(Rating.id == rating_id).first()
 
 
-def get_ratings_by_tool(db: Session, tool_id: int, skip: int = 0, limit: int = 100) -> List[Rating]:
+def get_ratings_by_tool(
+    db: Session, tool_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> CursorPage:
     """Obtiene las calificaciones de una herramienta específica."""
-    return db.query(Rating).filter(Rating.tool_id == tool_id).offset(skip).limit(limit).all()
+    query = db.query(Rating).filter(Rating.tool_id == tool_id)
+    return keyset_page(query, [(Rating.id, False)], cursor=cursor, skip=skip, limit=limit)
+
+
+def get_ratings_with_user_by_tool(
+    db: Session, tool_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> CursorPage:
+    """Obtiene las calificaciones de una herramienta con los datos del usuario en una sola consulta."""
+    query = db.query(Rating, User.username, User.full_name).join(
+        User, Rating.user_id == User.id
+    ).filter(Rating.tool_id == tool_id)
+    page = keyset_page(query, [(Rating.id, False)], cursor=cursor, skip=skip, limit=limit)
+    page[:] = [
+        {
+            "id": rating.id,
+            "tool_id": rating.tool_id,
+            "user_id": rating.user_id,
+            "rating": rating.rating,
+            "comment": rating.comment,
+            "created_at": rating.created_at,
+            "updated_at": rating.updated_at,
+            "user_username": user_username,
+            "user_full_name": user_full_name
+        }
+        for rating, user_username, user_full_name in page
+    ]
+    return page
 
 
 def get_ratings_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Rating]:
@@ -42,6 +72,7 @@ def create_rating(db: Session, rating: RatingCreate, user_id: int) -> Rating:
         comment=rating.comment
     )
     db.add(db_rating)
+    _apply_rating_delta(db, rating.tool_id, new_value=rating.rating)
     db.commit()
     db.refresh(db_rating)
     return db_rating
@@ -53,10 +84,13 @@ def update_rating(db: Session, rating_id: int, rating_update: RatingUpdate) -> O
     if not db_rating:
         return None
     
+    old_value = db_rating.rating
     update_data = rating_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_rating, key, value)
     
+    if db_rating.rating != old_value:
+        _apply_rating_delta(db, db_rating.tool_id, old_value=old_value, new_value=db_rating.rating)
     db.commit()
     db.refresh(db_rating)
     return db_rating
@@ -69,31 +103,154 @@ def delete_rating(db: Session, rating_id: int) -> bool:
         return False
     
     db.delete(db_rating)
+    _apply_rating_delta(db, db_rating.tool_id, old_value=db_rating.rating)
     db.commit()
     return True
 
 
+def _star_field(value: float) -> str:
+    """Columna del resumen que corresponde a una calificación (1 a 5 estrellas)."""
+    return f"stars_{min(max(int(value), 1), 5)}"
+
+
+def _apply_rating_delta(
+    db: Session, tool_id: int, old_value: Optional[float] = None, new_value: Optional[float] = None
+) -> None:
+    """
+    Actualiza el resumen de la herramienta en la transacción en curso.
+
+    Los incrementos se aplican en SQL (``col = col + n``) para no perder
+    actualizaciones concurrentes.
+    """
+    deltas = {}
+    if old_value is not None:
+        deltas["rating_count"] = deltas.get("rating_count", 0) - 1
+        deltas["rating_sum"] = deltas.get("rating_sum", 0.0) - old_value
+        deltas[_star_field(old_value)] = deltas.get(_star_field(old_value), 0) - 1
+    if new_value is not None:
+        deltas["rating_count"] = deltas.get("rating_count", 0) + 1
+        deltas["rating_sum"] = deltas.get("rating_sum", 0.0) + new_value
+        deltas[_star_field(new_value)] = deltas.get(_star_field(new_value), 0) + 1
+
+    values = {
+        field: getattr(ToolRatingSummary, field) + delta
+        for field, delta in deltas.items()
+        if delta
+    }
+    if not values:
+        return
+
+    updated = db.query(ToolRatingSummary).filter(
+        ToolRatingSummary.tool_id == tool_id
+    ).update(values, synchronize_session=False)
+    if not updated:
+        # Primera calificación de la herramienta o resumen todavía no calculado
+        db.flush()
+        _create_summary(db, tool_id, values)
+
+
+def _create_summary(db: Session, tool_id: int, deltas: dict) -> None:
+    """
+    Crea el resumen de la herramienta desde la tabla ratings.
+
+    Si otra transacción lo crea a la vez, su cálculo no incluye esta
+    calificación (aún sin confirmar): ``ON CONFLICT`` aplica entonces los
+    incrementos sobre su fila en lugar de fallar por clave duplicada.
+    """
+    dialect = db.connection().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        rebuild_rating_summaries(db, tool_id=tool_id, commit=False)
+        return
+
+    rows = _summary_rows(db, tool_id)
+    if not rows:
+        return
+    statement = insert(ToolRatingSummary).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[ToolRatingSummary.tool_id],
+        set_={**deltas, "updated_at": func.now()}
+    ))
+
+
+def _summary_rows(db: Session, tool_id: Optional[int] = None) -> List[dict]:
+    """Resúmenes calculados desde la tabla ratings, de una herramienta o de todas."""
+    def stars(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    query = db.query(
+        Rating.tool_id,
+        func.count(Rating.id),
+        func.coalesce(func.sum(Rating.rating), 0.0),
+        stars(Rating.rating < 2),
+        stars(and_(Rating.rating >= 2, Rating.rating < 3)),
+        stars(and_(Rating.rating >= 3, Rating.rating < 4)),
+        stars(and_(Rating.rating >= 4, Rating.rating < 5)),
+        stars(Rating.rating >= 5)
+    ).group_by(Rating.tool_id)
+    if tool_id is not None:
+        query = query.filter(Rating.tool_id == tool_id)
+
+    return [
+        {
+            "tool_id": row[0],
+            "rating_count": row[1],
+            "rating_sum": row[2],
+            "stars_1": row[3],
+            "stars_2": row[4],
+            "stars_3": row[5],
+            "stars_4": row[6],
+            "stars_5": row[7]
+        }
+        for row in query.all()
+    ]
+
+
+def rebuild_rating_summaries(db: Session, tool_id: Optional[int] = None, commit: bool = True) -> int:
+    """
+    Recalcula por completo los resúmenes de calificaciones desde la tabla ratings.
+
+    Args:
+        tool_id: Herramienta a recalcular; todas si es None
+        commit: Confirmar la transacción al terminar
+
+    Returns:
+        Número de resúmenes escritos
+    """
+    summaries = db.query(ToolRatingSummary)
+    if tool_id is not None:
+        summaries = summaries.filter(ToolRatingSummary.tool_id == tool_id)
+    summaries.delete(synchronize_session=False)
+
+    rows = _summary_rows(db, tool_id)
+    db.bulk_insert_mappings(ToolRatingSummary, rows)
+    if commit:
+        db.commit()
+    return len(rows)
+
+
 def get_tool_rating_stats(db: Session, tool_id: int) -> dict:
-    """Obtiene estadísticas de calificación para una herramienta."""
-    ratings = db.query(Rating.rating).filter(Rating.tool_id == tool_id).all()
-    
-    if not ratings:
+    """Obtiene estadísticas de calificación para una herramienta desde su resumen."""
+    summary = db.query(ToolRatingSummary).filter(ToolRatingSummary.tool_id == tool_id).first()
+
+    if not summary or not summary.rating_count:
         return {
             "total_ratings": 0,
             "average_rating": 0.0,
             "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
         }
-    
-    rating_values = [r.rating for r in ratings]
-    total_ratings = len(rating_values)
-    average_rating = sum(rating_values) / total_ratings
-    
-    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for rating in rating_values:
-        rating_distribution[int(rating)] += 1
-    
+
     return {
-        "total_ratings": total_ratings,
-        "average_rating": round(average_rating, 2),
-        "rating_distribution": rating_distribution
+        "total_ratings": summary.rating_count,
+        "average_rating": round(summary.rating_sum / summary.rating_count, 2),
+        "rating_distribution": {
+            1: summary.stars_1,
+            2: summary.stars_2,
+            3: summary.stars_3,
+            4: summary.stars_4,
+            5: summary.stars_5
+        }
     }
@@ -6,10 +6,15 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from datetime import datetime, timedelta
 
+from ..core.pagination import CursorPage, keyset_page
 from ..models.rental import Rental, RentalStatus
 from ..models.tool import Tool
 from ..models.user import User
 from ..schemas.rental import RentalCreate, RentalUpdate, RentalReturn
+from ..services.admin_dashboard import dashboard_cache
+from ..services.availability import (
+    is_tool_available, lock_tool_for_booking, refresh_tool_availability
+)
 
 
 def get_rental(db: Session, rental_id: int) -> Optional[Rental]:
@@ -17,9 +22,12 @@ def get_rental(db: Session, rental_id: int) -> Optional[Rental]:
     return db.query(Rental).filter(Rental.id == rental_id).first()
 
 
-def get_rentals_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Rental]:
+def get_rentals_by_user(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> CursorPage:
     """Obtiene los alquileres de un usuario específico."""
-    return db.query(Rental).filter(Rental.user_id == user_id).offset(skip).limit(limit).all()
+    query = db.query(Rental).filter(Rental.user_id == user_id)
+    return keyset_page(query, [(Rental.id, False)], cursor=cursor, skip=skip, limit=limit)
 
 
 def get_rentals_by_tool(db: Session, tool_id: int, skip: int = 0, limit: int = 100) -> List[Rental]:
@@ -47,9 +55,82 @@ def get_user_active_rentals(db: Session, user_id: int) -> List[Rental]:
     ).all()
 
 
-def create_rental(db: Session, rental: RentalCreate, user_id: int) -> Rental:
-    """Crea un nuevo alquiler."""
-    tool = db.query(Tool).filter(Tool.id == rental.tool_id).first()
+def _rental_details_query(db: Session):
+    """Consulta de alquileres unida con los datos de herramienta y usuario."""
+    return db.query(
+        Rental,
+        Tool.name,
+        Tool.brand,
+        Tool.model,
+        Tool.daily_price,
+        User.username,
+        User.full_name
+    ).join(Tool, Rental.tool_id == Tool.id).join(User, Rental.user_id == User.id)
+
+
+def _rental_details(row) -> dict:
+    """Convierte una fila de la consulta unida en el formato de RentalWithDetails."""
+    rental, tool_name, tool_brand, tool_model, tool_daily_price, user_username, user_full_name = row
+    return {
+        "id": rental.id,
+        "tool_id": rental.tool_id,
+        "user_id": rental.user_id,
+        "start_date": rental.start_date,
+        "end_date": rental.end_date,
+        "actual_return_date": rental.actual_return_date,
+        "total_price": rental.total_price,
+        "status": rental.status,
+        "notes": rental.notes,
+        "created_at": rental.created_at,
+        "updated_at": rental.updated_at,
+        "tool_name": tool_name,
+        "tool_brand": tool_brand,
+        "tool_model": tool_model,
+        "tool_daily_price": tool_daily_price,
+        "user_username": user_username,
+        "user_full_name": user_full_name
+    }
+
+
+def get_rental_with_details(db: Session, rental_id: int) -> Optional[dict]:
+    """Obtiene un alquiler con los datos de herramienta y usuario en una sola consulta."""
+    row = _rental_details_query(db).filter(Rental.id == rental_id).first()
+    return _rental_details(row) if row else None
+
+
+def get_rentals_with_details_by_user(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> CursorPage:
+    """Obtiene los alquileres de un usuario con los datos de herramienta y usuario en una sola consulta."""
+    query = _rental_details_query(db).filter(Rental.user_id == user_id)
+    page = keyset_page(query, [(Rental.id, False)], cursor=cursor, skip=skip, limit=limit)
+    page[:] = [_rental_details(row) for row in page]
+    return page
+
+
+def get_user_active_rentals_with_details(db: Session, user_id: int) -> List[dict]:
+    """Obtiene los alquileres activos de un usuario con los datos de herramienta y usuario en una sola consulta."""
+    rows = _rental_details_query(db).filter(
+        and_(
+            Rental.user_id == user_id,
+            Rental.status.in_([RentalStatus.PENDING, RentalStatus.ACTIVE])
+        )
+    ).all()
+    return [_rental_details(row) for row in rows]
+
+
+def create_rental(db: Session, rental: RentalCreate, user_id: int) -> Optional[Rental]:
+    """
+    Crea un nuevo alquiler si la herramienta está libre en esas fechas.
+
+    La comprobación y la inserción se hacen con la herramienta bloqueada, de
+    modo que dos reservas simultáneas no pueden solaparse. Devuelve None si la
+    herramienta no existe o ya está reservada en ese periodo.
+    """
+    tool = lock_tool_for_booking(db, rental.tool_id)
+    if tool is None or not is_tool_available(db, rental.tool_id, rental.start_date, rental.end_date):
+        db.rollback()
+        return None
     
     days = (rental.end_date.date() - rental.start_date.date()).days + 1
     total_price = days * tool.daily_price
@@ -64,7 +145,10 @@ def create_rental(db: Session, rental: RentalCreate, user_id: int) -> Rental:
         status=RentalStatus.PENDING
     )
     
-    tool.is_available = False
+    # is_available refleja si la herramienta está fuera ahora; las reservas
+    # futuras se controlan por rango de fechas (services/availability.py)
+    if rental.start_date <= datetime.utcnow():
+        tool.is_available = False
     
     db.add(db_rental)
     db.commit()
@@ -102,7 +186,8 @@ def return_rental(db: Session, rental_id: int, return_data: RentalReturn) -> Opt
     if return_data.notes:
         db_rental.notes = return_data.notes
     
-    db_rental.tool.is_available = True
+    # Otra reserva puede tener la herramienta fuera en este momento
+    refresh_tool_availability(db, db_rental.tool)
     
     db.commit()
     db.refresh(db_rental)
@@ -116,6 +201,7 @@ def activate_rental(db: Session, rental_id: int) -> Optional[Rental]:
         return None
     
     db_rental.status = RentalStatus.ACTIVE
+    db_rental.tool.is_available = False
     
     db.commit()
     db.refresh(db_rental)
@@ -129,45 +215,55 @@ def cancel_rental(db: Session, rental_id: int) -> Optional[Rental]:
         return None
     
     db_rental.status = RentalStatus.CANCELLED
-    db_rental.tool.is_available = True
+    refresh_tool_availability(db, db_rental.tool)
     
     db.commit()
     db.refresh(db_rental)
     return db_rental
 
 
-def check_overdue_rentals(db: Session):
-    """Marca como vencidos los alquileres que superaron la fecha de devolución."""
+def check_overdue_rentals(db: Session) -> int:
+    """
+    Marca como vencidos los alquileres que superaron la fecha de devolución.
+
+    Se ejecuta como un único UPDATE sin cargar los alquileres en memoria.
+    """
     current_date = datetime.utcnow()
-    overdue_rentals = db.query(Rental).filter(
+    overdue_count = db.query(Rental).filter(
         and_(
             Rental.status == RentalStatus.ACTIVE,
             Rental.end_date < current_date
         )
-    ).all()
-    
-    for rental in overdue_rentals:
-        rental.status = RentalStatus.OVERDUE
+    ).update(
+        {Rental.status: RentalStatus.OVERDUE, Rental.updated_at: func.now()},
+        synchronize_session=False
+    )
     
     db.commit()
-    return len(overdue_rentals)
+    # El UPDATE masivo no pasa por los eventos de flush que invalidan el panel
+    if overdue_count:
+        dashboard_cache.invalidate()
+    return overdue_count
 
 
 def get_rental_stats(db: Session) -> dict:
-    """Obtiene estadísticas generales de alquileres."""
-    total_rentals = db.query(Rental).count()
-    active_rentals = db.query(Rental).filter(Rental.status == RentalStatus.ACTIVE).count()
-    overdue_rentals = db.query(Rental).filter(Rental.status == RentalStatus.OVERDUE).count()
-    completed_rentals = db.query(Rental).filter(Rental.status == RentalStatus.RETURNED).count()
+    """Obtiene estadísticas generales de alquileres con una sola consulta agrupada por estado."""
+    rows = db.query(
+        Rental.status,
+        func.count(Rental.id),
+        func.coalesce(func.sum(Rental.total_price), 0.0)
+    ).group_by(Rental.status).all()
     
-    total_revenue = db.query(func.sum(Rental.total_price)).filter(
-        Rental.status.in_([RentalStatus.RETURNED, RentalStatus.ACTIVE])
-    ).scalar() or 0.0
+    counts = {status: count for status, count, _ in rows}
+    total_revenue = sum(
+        revenue for status, _, revenue in rows
+        if status in (RentalStatus.RETURNED, RentalStatus.ACTIVE)
+    )
     
     return {
-        "total_rentals": total_rentals,
-        "active_rentals": active_rentals,
-        "overdue_rentals": overdue_rentals,
-        "completed_rentals": completed_rentals,
+        "total_rentals": sum(counts.values()),
+        "active_rentals": counts.get(RentalStatus.ACTIVE, 0),
+        "overdue_rentals": counts.get(RentalStatus.OVERDUE, 0),
+        "completed_rentals": counts.get(RentalStatus.RETURNED, 0),
         "total_revenue": float(total_revenue)
     }
@@ -0,0 +1,150 @@
+"""
+Operaciones CRUD para herramientas.
+"""
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.pagination import CursorPage, keyset_page, offset_page
+from ..models.tool import Tool, ToolCondition
+from ..models.user import User
+from ..schemas.tool import ToolCreate, ToolUpdate
+from ..schemas.admin import AdminLogCreate
+from ..services.tool_search import apply_text_search
+from .admin import add_admin_log
+
+
+def get_tools(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    available: Optional[bool] = None,
+    cursor: Optional[str] = None
+) -> CursorPage:
+    """Obtiene una lista de herramientas con filtro opcional de disponibilidad."""
+    query = db.query(Tool)
+    if available is not None:
+        query = query.filter(Tool.is_available == available)
+    return keyset_page(query, [(Tool.id, False)], cursor=cursor, skip=skip, limit=limit)
+
+
+def search_tools(
+    db: Session,
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    condition: Optional[ToolCondition] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    available: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> CursorPage:
+    """
+    Busca herramientas por texto y filtros.
+
+    La búsqueda por texto usa el índice de texto completo y ordena los
+    resultados por relevancia; esas páginas se recorren por posición.
+    """
+    query = db.query(Tool)
+    rank = None
+
+    if q:
+        query, rank = apply_text_search(query, q)
+
+    if category:
+        query = query.filter(Tool.category.ilike(f"%{category}%"))
+
+    if brand:
+        query = query.filter(Tool.brand.ilike(f"%{brand}%"))
+
+    if condition:
+        query = query.filter(Tool.condition == condition)
+
+    if min_price is not None:
+        query = query.filter(Tool.daily_price >= min_price)
+
+    if max_price is not None:
+        query = query.filter(Tool.daily_price <= max_price)
+
+    if available is not None:
+        query = query.filter(Tool.is_available == available)
+
+    if rank is not None:
+        # La relevancia cambia con el índice y no es estable como cursor
+        return offset_page(query, [rank.asc(), Tool.id.asc()], cursor=cursor, skip=skip, limit=limit)
+
+    return keyset_page(query, [(Tool.id, False)], cursor=cursor, skip=skip, limit=limit)
+
+
+
+# Las mutaciones de herramientas guardan el cambio y su entrada de auditoría
+# en un único commit. Los datos de respuesta se toman tras el flush y antes
+# del commit: las columnas calculadas por la base de datos (created_at,
+# updated_at) se cargan en la misma transacción, sin refresh tras el commit.
+
+def _tool_data(db_tool: Tool) -> dict:
+    return {column.key: getattr(db_tool, column.key) for column in Tool.__table__.columns}
+
+
+def _audit(db: Session, admin: User, action: str, tool_id: int, details: str, ip_address: Optional[str]) -> None:
+    log = AdminLogCreate(action=action, resource="tool", resource_id=str(tool_id), details=details)
+    add_admin_log(db, log, admin_id=admin.id, admin_username=admin.username, ip_address=ip_address)
+
+
+def create_tool(
+    db: Session,
+    tool: ToolCreate,
+    admin: User,
+    ip_address: Optional[str] = None
+) -> dict:
+    """Crea una herramienta y registra la acción en la misma transacción."""
+    db_tool = Tool(**tool.dict())
+    db.add(db_tool)
+    db.flush()
+
+    _audit(db, admin, "CREATE", db_tool.id, f"Created tool: {db_tool.name}", ip_address)
+    result = _tool_data(db_tool)
+    db.commit()
+    return result
+
+
+def update_tool(
+    db: Session,
+    tool_id: int,
+    tool_update: ToolUpdate,
+    admin: User,
+    ip_address: Optional[str] = None
+) -> Optional[dict]:
+    """Actualiza una herramienta y registra la acción en la misma transacción."""
+    db_tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    if db_tool is None:
+        return None
+
+    for key, value in tool_update.dict(exclude_unset=True).items():
+        setattr(db_tool, key, value)
+    # El flush aplica onupdate y así la respuesta lleva el nuevo updated_at
+    db.flush()
+
+    _audit(db, admin, "UPDATE", tool_id, f"Updated tool: {db_tool.name}", ip_address)
+    result = _tool_data(db_tool)
+    db.commit()
+    return result
+
+
+def delete_tool(
+    db: Session,
+    tool_id: int,
+    admin: User,
+    ip_address: Optional[str] = None
+) -> bool:
+    """Elimina una herramienta y registra la acción en la misma transacción."""
+    db_tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    if db_tool is None:
+        return False
+
+    db.delete(db_tool)
+    _audit(db, admin, "DELETE", tool_id, f"Deleted tool: {db_tool.name}", ip_address)
+    db.commit()
+    return True
@@ -5,7 +5,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
-from ..core.security import get_password_hash, verify_password
+from ..core.security import get_password_hash, verify_and_update_password
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
 
@@ -31,11 +31,15 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     return db.query(User).filter(User.username == username).first()
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
     """
     Crear un nuevo usuario
+    
+    Si se recibe ``hashed_password`` (ya calculado fuera del event loop) no se
+    vuelve a hashear la contraseña.
     """
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -56,8 +60,20 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     user = get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        update_password_hash(db, user, new_hash)
+    return user
+
+
+def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+    """
+    Guardar un hash recalculado (por ejemplo, tras cambiar BCRYPT_ROUNDS)
+    """
+    user.hashed_password = hashed_password
+    db.commit()
     return user
 
 
@@ -1,20 +1,31 @@
 """
 Configuración de la base de datos SQLite
 """
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from ..core.config import settings
+from .engines import async_database_url, engines  # noqa: F401 (async_database_url se reexporta)
 
-# Crear el motor de base de datos
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Necesario para SQLite
-)
+# Motores de la base de datos principal, desde el registro común
+engine = engines.engine("default")
+
+# Motor asíncrono sobre la misma base de datos, para los handlers async
+async_engine = engines.async_engine("default")
+
+# Conexiones de solo lectura para los GET (perfil de producción de SQLite);
+# en otro caso es el mismo motor
+read_engine = engines.read_engine("default")
 
 # Crear la fábrica de sesiones
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Sesiones asíncronas; los objetos siguen cargados tras el commit porque no
+# pueden recargarse de forma perezosa fuera de un await
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Base declarativa para los modelos
 Base = declarative_base()
@@ -28,4 +39,26 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    """
+    Dependency para endpoints de solo lectura: la sesión usa el pool de
+    lectura y no puede escribir en la base de datos
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Dependency para obtener una sesión asíncrona de base de datos. Las consultas
+    no bloquean el event loop; el código síncrono existente (crud, servicios) se
+    reutiliza con ``await db.run_sync(funcion, ...)``.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
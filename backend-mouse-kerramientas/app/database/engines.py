@@ -0,0 +1,234 @@
+"""
+Registro único de motores SQL.
+
+La aplicación usa dos bases de datos SQL: la principal (``DATABASE_URL``,
+SQLite por defecto) y la PostgreSQL del módulo híbrido (``app.config.database``).
+Ambas registran aquí su URL y obtienen de ``engines`` sus motores síncrono y
+asíncrono, creados una sola vez por proceso con la misma configuración de pool
+(``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT``, ``DB_POOL_RECYCLE``
+y ``DB_POOL_PRE_PING``). Cada pool publica en ``metrics`` el tiempo de espera
+por una conexión (``db.<nombre>.pool.wait_ms``), los timeouts y las conexiones
+en uso, para dimensionar las conexiones de cada worker.
+
+Con ``SQLITE_PRODUCTION_PROFILE`` las bases de datos SQLite en fichero usan
+WAL y los pragmas ``synchronous``, ``mmap_size``, ``cache_size`` y
+``busy_timeout`` en cada conexión, y ``read_engine`` ofrece un pool aparte de
+conexiones de solo lectura. En WAL los lectores no bloquean al escritor ni
+esperan por él, así que los GET no compiten con las escrituras.
+"""
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+# Driver asíncrono para cada driver síncrono soportado
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Obtener la URL equivalente con el driver asíncrono (aiosqlite / asyncpg)
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+class _TimedPoolMixin:
+    """
+    Mide cuánto se espera por una conexión del pool y cuántas hay en uso
+    """
+    metrics_prefix = "db.default.pool"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            metrics.observe(f"{self.metrics_prefix}.wait_ms", (time.perf_counter() - start) * 1000)
+        metrics.increment(f"{self.metrics_prefix}.checkouts")
+        metrics.set_gauge(f"{self.metrics_prefix}.checked_out", self.checkedout())
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        metrics.set_gauge(f"{self.metrics_prefix}.checked_out", self.checkedout())
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _is_file_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite" and not _is_memory_sqlite(url)
+
+
+def read_only_url(url: str) -> str:
+    """
+    Obtener la URL SQLite que abre el mismo fichero en modo solo lectura
+    """
+    parsed = make_url(url)
+    database = parsed.database if parsed.database.startswith("file:") else f"file:{parsed.database}"
+    query = {**parsed.query, "mode": "ro", "uri": "true"}
+    return parsed.set(database=database, query=query).render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """
+    Pragmas del perfil de producción para cada conexión SQLite nueva
+    """
+    # El modo WAL se guarda en el fichero; solo lo fijan las conexiones de escritura
+    pragmas = [] if read_only else ["PRAGMA journal_mode=WAL"]
+    return pragmas + [
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+
+
+class EngineRegistry:
+    """
+    Motores SQL por nombre, creados bajo demanda con la configuración de pool
+    """
+
+    def __init__(self):
+        self._urls: Dict[str, str] = {}
+        self._engines: Dict[str, Engine] = {}
+        self._async_engines: Dict[str, AsyncEngine] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, url: str) -> None:
+        """
+        Registrar la URL de una base de datos
+        """
+        with self._lock:
+            self._urls[name] = url
+
+    def _options(self, name: str, url: str, pool_class) -> dict:
+        options = {}
+        if make_url(url).get_backend_name() == "sqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            # SQLite en memoria: una conexión por hilo, sin pool configurable
+            return options
+        # Una subclase por motor para que el nombre sobreviva a engine.dispose()
+        options["poolclass"] = type(
+            pool_class.__name__, (pool_class,), {"metrics_prefix": f"db.{name}.pool"}
+        )
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        return options
+
+    def _instrument(self, name: str, engine: Engine, url: str) -> None:
+        pragmas = []
+        if settings.SQLITE_PRODUCTION_PROFILE and _is_file_sqlite(url):
+            pragmas = sqlite_pragmas(read_only=make_url(url).query.get("mode") == "ro")
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            metrics.increment(f"db.{name}.pool.connects")
+            if pragmas:
+                cursor = dbapi_connection.cursor()
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+                cursor.close()
+
+    def engine(self, name: str = "default") -> Engine:
+        """
+        Motor síncrono de una base de datos registrada
+        """
+        with self._lock:
+            if name not in self._engines:
+                url = self._urls[name]
+                engine = create_engine(url, **self._options(name, url, TimedQueuePool))
+                self._instrument(name, engine, url)
+                self._engines[name] = engine
+            return self._engines[name]
+
+    def read_engine(self, name: str = "default") -> Engine:
+        """
+        Motor de solo lectura para los GET. Solo existe para SQLite en fichero
+        con el perfil de producción; en otro caso es el motor normal.
+        """
+        url = self._urls[name]
+        if not (settings.SQLITE_PRODUCTION_PROFILE and _is_file_sqlite(url)):
+            return self.engine(name)
+        read_name = f"{name}_read"
+        with self._lock:
+            self._urls.setdefault(read_name, read_only_url(url))
+        return self.engine(read_name)
+
+    def async_engine(self, name: str = "default") -> AsyncEngine:
+        """
+        Motor asíncrono (aiosqlite / asyncpg) de una base de datos registrada
+        """
+        with self._lock:
+            if name not in self._async_engines:
+                url = async_database_url(self._urls[name])
+                engine = create_async_engine(url, **self._options(f"{name}_async", url, TimedAsyncQueuePool))
+                self._instrument(f"{name}_async", engine.sync_engine, url)
+                self._async_engines[name] = engine
+            return self._async_engines[name]
+
+    def pool_status(self) -> dict:
+        """
+        Estado actual de los pools creados
+        """
+        with self._lock:
+            engines = {
+                **self._engines,
+                **{f"{name}_async": engine.sync_engine for name, engine in self._async_engines.items()}
+            }
+        return {name: engine.pool.status() for name, engine in engines.items()}
+
+    def dispose(self) -> None:
+        """
+        Cerrar las conexiones de los motores síncronos
+        """
+        with self._lock:
+            engines = list(self._engines.values())
+        for engine in engines:
+            engine.dispose()
+
+    async def dispose_async(self) -> None:
+        """
+        Cerrar las conexiones de los motores asíncronos
+        """
+        with self._lock:
+            engines = list(self._async_engines.values())
+        for engine in engines:
+            await engine.dispose()
+
+
+# Registro global de motores; la base de datos principal se registra aquí
+engines = EngineRegistry()
+engines.register("default", settings.DATABASE_URL)
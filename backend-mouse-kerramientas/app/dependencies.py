@@ -6,33 +6,50 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from .core.security import oauth2_scheme, verify_token
-from .crud import user as crud_user
+from .core.security import REFRESH_TOKEN_TYPE, decode_token, oauth2_scheme
 from .database.database import get_db
 from .models.user import User
+from .schemas.token import TokenUser
+from .services.token_versions import token_versions
+from .services.user_cache import get_cached_user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode(token: str, db: Session) -> dict:
+    """
+    Decodificar el token y rechazarlo si su versión ya no es la vigente
+    """
+    payload = decode_token(token)
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    # Los refresh tokens solo sirven para /auth/refresh
+    if payload.get("typ") == REFRESH_TOKEN_TYPE:
+        raise _credentials_exception()
+    if "ver" in payload and payload["ver"] != token_versions.current(db, payload.get("uid")):
+        raise _credentials_exception()
+    return payload
 
 
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], 
+    token: Annotated[str, Depends(oauth2_scheme)],
     db: Session = Depends(get_db)
 ) -> User:
     """
     Dependency para obtener el usuario actual desde el token JWT
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    username = verify_token(token)
-    if username is None:
-        raise credentials_exception
-    
-    user = crud_user.get_user_by_username(db, username=username)
+    payload = _decode(token, db)
+
+    user = get_cached_user(db, payload["sub"])
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     return user
 
 
@@ -58,4 +75,59 @@ async def get_current_admin_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_token_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db)
+) -> TokenUser:
+    """
+    Dependency para endpoints de solo lectura: obtiene el usuario de los claims
+    del token sin consultar la base de datos. Los tokens sin claims se
+    resuelven con el usuario de la base de datos.
+    """
+    payload = _decode(token, db)
+
+    if "uid" in payload and "ver" in payload:
+        return TokenUser(
+            id=payload["uid"],
+            username=payload["sub"],
+            is_active=payload.get("act", False),
+            is_superuser=payload.get("su", False)
+        )
+
+    user = get_cached_user(db, payload["sub"])
+    if user is None:
+        raise _credentials_exception()
+    return TokenUser(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        is_superuser=user.is_superuser
+    )
+
+
+async def get_token_active_user(
+    current_user: Annotated[TokenUser, Depends(get_token_user)]
+) -> TokenUser:
+    """
+    Dependency para obtener el usuario activo desde los claims del token
+    """
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+async def get_token_admin_user(
+    current_user: Annotated[TokenUser, Depends(get_token_active_user)]
+) -> TokenUser:
+    """
+    Dependency para verificar desde los claims del token que el usuario es administrador
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
@@ -1,19 +1,31 @@
 """
 Archivo principal de la aplicación FastAPI para Mouse Kerramientas - Arquitectura Híbrida
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import os
 from dotenv import load_dotenv
 
+from .core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
 from .database.database import Base, engine
+from .database.engines import engines
 from .config.mongodb import connect_to_mongo, close_mongo_connection
-from .routes import auth, products, tools, users, hybrid, ratings
+from .routes import auth, products, tools, users, hybrid, ratings, rentals
+from .services.audit_log import audit_log_writer
+from .services.backup_tracking import ensure_backup_tracking
+from .services.jobs import register_jobs
+from .services.password_hasher import password_hasher
+from .services.scheduler import scheduler
+from .services.tool_search import ensure_search_index
 
 load_dotenv()
 
 # Crear las tablas de la base de datos SQL
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+ensure_backup_tracking(engine)
+register_jobs(scheduler)
 
 # Crear la instancia de la aplicación
 app = FastAPI(
@@ -29,15 +41,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    audit_log_writer.start()
+    scheduler.start()
     print("Aplicación iniciada - Conectado a MongoDB y PostgreSQL")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    scheduler.shutdown()
+    audit_log_writer.stop()
+    password_hasher.shutdown()
+    await engines.dispose_async()
+    engines.dispose()
     await close_mongo_connection()
     print("Aplicación cerrada - Conexiones cerradas")
 
@@ -48,6 +72,7 @@ app.include_router(tools.router, prefix="/api/tools", tags=["tools"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(hybrid.router, prefix="/api/hybrid", tags=["hybrid"])
 app.include_router(ratings.router, prefix="/api/ratings", tags=["ratings"])
+app.include_router(rentals.router, prefix="/api/rentals", tags=["rentals"])
 
 # Importar y registrar las rutas de admin
 from .routes import admin
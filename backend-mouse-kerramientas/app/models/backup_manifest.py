@@ -0,0 +1,43 @@
+"""
+Modelos para el seguimiento de las copias de seguridad.
+"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from ..database.database import Base
+
+
+class BackupManifest(Base):
+    """
+    Copia de seguridad generada. Las incrementales apuntan a la copia anterior
+    de su cadena (``parent_id``), que termina en una copia completa.
+    """
+    __tablename__ = "backup_manifests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(255), unique=True, nullable=False)
+    kind = Column(String(20), nullable=False)  # full, incremental o restore
+    parent_id = Column(Integer, ForeignKey("backup_manifests.id"), nullable=True)
+    config_id = Column(Integer, nullable=True, index=True)
+    # Marca de agua: los cambios posteriores van en la siguiente incremental
+    watermark_at = Column(DateTime, nullable=False)
+    state = Column(Text, nullable=False, default="{}")  # JSON: max_ids, tombstone_id
+    tables = Column(Text, nullable=False, default="{}")  # JSON: filas por tabla
+    size = Column(Integer, nullable=False, default=0)
+    duration_ms = Column(Float, nullable=True)
+    checksum = Column(String(64), nullable=True)  # SHA-256 del archivo
+    created_by = Column(String(50), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class BackupTombstone(Base):
+    """
+    Fila eliminada de una tabla incluida en las copias. La escriben triggers
+    de la base de datos para que las copias incrementales propaguen los borrados.
+    """
+    __tablename__ = "backup_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
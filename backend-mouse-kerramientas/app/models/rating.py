@@ -18,7 +18,7 @@ class Rating(Base):
     rating = Column(Float, nullable=False)
     comment = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), index=True)
 
     tool = relationship("Tool", back_populates="ratings")
     user = relationship("User", back_populates="ratings")
@@ -26,3 +26,27 @@ class Rating(Base):
     class Config:
         """Configuración del modelo."""
         orm_mode = True
+
+
+class ToolRatingSummary(Base):
+    """
+    Resumen de calificaciones por herramienta.
+
+    Se actualiza de forma incremental al crear, modificar o eliminar
+    calificaciones para que las estadísticas se lean por clave primaria.
+    """
+    __tablename__ = "tool_rating_summaries"
+
+    tool_id = Column(Integer, ForeignKey("tools.id", ondelete="CASCADE"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    class Config:
+        """Configuración del modelo."""
+        orm_mode = True
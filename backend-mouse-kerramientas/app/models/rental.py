@@ -2,7 +2,7 @@
 Modelo para los alquileres de herramientas.
 """
 import enum
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -21,6 +21,13 @@ class RentalStatus(str, enum.Enum):
 class Rental(Base):
     """Modelo para los alquileres de herramientas."""
     __tablename__ = "rentals"
+    __table_args__ = (
+        # Índice de cobertura para las estadísticas agrupadas por estado
+        Index("ix_rentals_status_total_price", "status", "total_price"),
+        # Búsqueda de alquileres que se solapan con un rango de fechas; con el
+        # estado, solo se recorren los que bloquean (no el histórico cerrado)
+        Index("ix_rentals_tool_status_period", "tool_id", "status", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tool_id = Column(Integer, ForeignKey("tools.id"), nullable=False)
@@ -32,7 +39,7 @@ class Rental(Base):
     status = Column(Enum(RentalStatus), default=RentalStatus.PENDING)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), index=True)
 
     tool = relationship("Tool", back_populates="rentals")
     user = relationship("User", back_populates="rentals")
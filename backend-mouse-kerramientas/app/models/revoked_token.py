@@ -0,0 +1,20 @@
+"""
+Modelo de refresh tokens revocados
+"""
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from ..database.database import Base
+
+
+class RevokedToken(Base):
+    """
+    Refresh token ya usado (al rotarlo) o revocado (logout). Se guarda hasta
+    que el token expira; después ya no hace falta para rechazarlo.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,18 @@
+"""
+Modelo para los bloqueos de las tareas programadas.
+"""
+from sqlalchemy import Column, DateTime, String
+
+from ..database.database import Base
+
+
+class SchedulerLock(Base):
+    """
+    Arrendamiento (lease) que garantiza que una tarea programada se ejecute
+    en un solo proceso cuando hay varios workers.
+    """
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
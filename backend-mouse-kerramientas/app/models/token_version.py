@@ -0,0 +1,21 @@
+"""
+Modelo de versiones de token por usuario
+"""
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.sql import func
+
+from ..database.database import Base
+
+
+class TokenVersion(Base):
+    """
+    Versión actual de los tokens de un usuario. Solo hay fila para los usuarios
+    cuyos tokens se han invalidado alguna vez (la versión inicial es 0); los
+    tokens con otra versión se rechazan. No tiene clave foránea para conservar
+    la versión de los usuarios eliminados.
+    """
+    __tablename__ = "token_versions"
+
+    user_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
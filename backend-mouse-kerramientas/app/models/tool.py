@@ -2,8 +2,9 @@
 Modelo para las herramientas en la base de datos.
 """
 import enum
-from sqlalchemy import Boolean, Column, Enum, Float, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, Integer, String, Text
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import Date
 from ..database.database import Base
 
@@ -32,6 +33,8 @@ class Tool(Base):
     condition = Column(Enum(ToolCondition), default=ToolCondition.GOOD)
     is_available = Column(Boolean, default=True)
     image_url = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), index=True)
     # owner_id = Column(Integer, ForeignKey("users.id"))  # Comentado temporalmente
     
     # Relaciones comentadas temporalmente
@@ -39,6 +42,7 @@ class Tool(Base):
     # category = relationship("Category", back_populates="tools")
     rentals = relationship("Rental", back_populates="tool")
     ratings = relationship("Rating", back_populates="tool")
+    rating_summary = relationship("ToolRatingSummary", uselist=False, cascade="all, delete-orphan")
 
     class Config:
         """Configuración del modelo."""
@@ -1,73 +1,46 @@
-import json
 import os
-from datetime import datetime, timedelta
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..crud import admin as crud_admin, user as crud_user
-from ..crud.tool import get_tools
-from ..database.database import get_db
-from ..dependencies import get_current_admin_user
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.pagination import CURSOR_DESCRIPTION, set_next_cursor
+from ..crud import admin as crud_admin
+from ..database.database import get_async_db, get_db
+from ..database.engines import engines
+from ..dependencies import get_current_admin_user, get_token_admin_user
 from ..models.admin_log import AdminLog
+from ..models.backup_manifest import BackupManifest
 from ..models.tool import Tool, ToolCondition
 from ..models.user import User
 from ..schemas.admin import (
     AdminDashboard, AdminLog as AdminLogSchema, AdminLogCreate,
-    BackupConfig, BackupConfigCreate, BackupConfigUpdate,
-    ToolStats, UserStats
+    BackupConfig, BackupConfigCreate, BackupConfigUpdate
 )
+from ..schemas.token import TokenUser
+from ..services.admin_dashboard import dashboard_cache, get_dashboard_stats
+from ..services.audit_log import audit_log_writer
+from ..services.backup import (
+    BACKUP_SUFFIX, BackupFormatError, backup_chain, backup_policy, run_backup,
+    restore_backup as restore_backup_file
+)
+from ..services.scheduler import scheduler
 
 router = APIRouter()
 
 
 @router.get("/dashboard", response_model=AdminDashboard)
 async def get_admin_dashboard(
-    current_admin: Annotated[User, Depends(get_current_admin_user)],
-    db: Session = Depends(get_db)
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)],
+    db: AsyncSession = Depends(get_async_db)
 ):
-    
-    tool_count = db.query(Tool).count()
-    available_tools = db.query(Tool).filter(Tool.is_available == True).count()
-    rented_tools = tool_count - available_tools
-    
-    tools_by_category = dict(
-        db.query(Tool.category, func.count(Tool.id))
-        .group_by(Tool.category)
-        .all()
-    )
-    
-    tools_by_condition = dict(
-        db.query(Tool.condition, func.count(Tool.id))
-        .group_by(Tool.condition)
-        .all()
-    )
-    
-    user_count = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    admin_users = db.query(User).filter(User.is_superuser == True).count()
-    
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_registrations = db.query(User).filter(User.created_at >= week_ago).count()
-    
-    recent_logs = crud_admin.get_admin_logs(db, limit=10)
-    
-    tool_stats = ToolStats(
-        total_tools=tool_count,
-        available_tools=available_tools,
-        rented_tools=rented_tools,
-        tools_by_category=tools_by_category,
-        tools_by_condition=tools_by_condition
-    )
-    
-    user_stats = UserStats(
-        total_users=user_count,
-        active_users=active_users,
-        admin_users=admin_users,
-        recent_registrations=recent_registrations
-    )
+    tool_stats, user_stats = await db.run_sync(get_dashboard_stats)
+    recent_logs = await db.run_sync(crud_admin.get_admin_logs, limit=10)
     
     return AdminDashboard(
         tool_stats=tool_stats,
@@ -76,18 +49,40 @@ async def get_admin_dashboard(
     )
 
 
+@router.get("/metrics")
+async def get_metrics(
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)]
+):
+    return {
+        **metrics.snapshot(),
+        "db_pools": engines.pool_status(),
+        "jobs": {
+            name: {
+                "interval_seconds": job.interval,
+                "last_run": job.last_run.isoformat() if job.last_run else None,
+                "last_result": job.last_result
+            }
+            for name, job in scheduler.jobs.items()
+        }
+    }
+
+
 @router.get("/logs", response_model=List[AdminLogSchema])
 async def get_logs(
-    current_admin: Annotated[User, Depends(get_current_admin_user)],
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)],
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return crud_admin.get_admin_logs(db, skip=skip, limit=limit)
+    logs = await db.run_sync(crud_admin.get_admin_logs, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, logs)
+    return logs
 
 
 @router.post("/logs", response_model=AdminLogSchema)
-async def create_log(
+def create_log(
     log: AdminLogCreate,
     request: Request,
     current_admin: Annotated[User, Depends(get_current_admin_user)],
@@ -105,16 +100,16 @@ async def create_log(
 
 @router.get("/backup-configs", response_model=List[BackupConfig])
 async def get_backup_configs(
-    current_admin: Annotated[User, Depends(get_current_admin_user)],
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)],
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return crud_admin.get_backup_configs(db, skip=skip, limit=limit)
+    return await db.run_sync(crud_admin.get_backup_configs, skip=skip, limit=limit)
 
 
 @router.post("/backup-configs", response_model=BackupConfig)
-async def create_backup_config(
+def create_backup_config(
     config: BackupConfigCreate,
     request: Request,
     current_admin: Annotated[User, Depends(get_current_admin_user)],
@@ -129,7 +124,7 @@ async def create_backup_config(
         details=f"Created backup config: {config.name}"
     )
     client_ip = request.client.host if request.client else None
-    crud_admin.create_admin_log(
+    audit_log_writer.record(
         db=db,
         log=log,
         admin_id=current_admin.id,
@@ -141,7 +136,7 @@ async def create_backup_config(
 
 
 @router.put("/backup-configs/{config_id}", response_model=BackupConfig)
-async def update_backup_config(
+def update_backup_config(
     config_id: int,
     config_update: BackupConfigUpdate,
     request: Request,
@@ -159,7 +154,7 @@ async def update_backup_config(
         details=f"Updated backup config: {db_config.name}"
     )
     client_ip = request.client.host if request.client else None
-    crud_admin.create_admin_log(
+    audit_log_writer.record(
         db=db,
         log=log,
         admin_id=current_admin.id,
@@ -170,8 +165,40 @@ async def update_backup_config(
     return db_config
 
 
+@router.get("/backup-configs/{config_id}/status")
+async def get_backup_config_status(
+    config_id: int,
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)],
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_config = await db.run_sync(crud_admin.get_backup_config, config_id)
+    if not db_config:
+        raise HTTPException(status_code=404, detail="Backup config not found")
+    
+    result = await db.execute(
+        select(BackupManifest).where(
+            BackupManifest.config_id == config_id,
+            BackupManifest.kind.in_(["full", "incremental"])
+        ).order_by(BackupManifest.id.desc()).limit(1)
+    )
+    last = result.scalars().first()
+    
+    return {
+        "config_id": config_id,
+        "is_active": db_config.is_active,
+        "policy": backup_policy(db_config),
+        "last_backup": {
+            "filename": last.filename,
+            "kind": last.kind,
+            "size": last.size,
+            "duration_ms": last.duration_ms,
+            "created_at": last.created_at
+        } if last else None
+    }
+
+
 @router.delete("/backup-configs/{config_id}")
-async def delete_backup_config(
+def delete_backup_config(
     config_id: int,
     request: Request,
     current_admin: Annotated[User, Depends(get_current_admin_user)],
@@ -188,7 +215,7 @@ async def delete_backup_config(
         details="Deleted backup config"
     )
     client_ip = request.client.host if request.client else None
-    crud_admin.create_admin_log(
+    audit_log_writer.record(
         db=db,
         log=log,
         admin_id=current_admin.id,
@@ -203,32 +230,28 @@ async def delete_backup_config(
 async def create_backup(
     request: Request,
     current_admin: Annotated[User, Depends(get_current_admin_user)],
+    config_id: Optional[int] = Query(None, description="Configuración cuya política (completa o incremental) se aplica"),
     db: Session = Depends(get_db)
 ):
     try:
-        backup_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "created_by": current_admin.username,
-            "tools": [tool.__dict__ for tool in get_tools(db)],
-            "users": [user.__dict__ for user in crud_user.get_users(db)],
-            "backup_configs": [config.__dict__ for config in crud_admin.get_backup_configs(db)]
-        }
-        
-        backup_filename = f"backup_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-        backup_path = f"backups/{backup_filename}"
+        config = None
+        if config_id is not None:
+            config = crud_admin.get_backup_config(db, config_id=config_id)
+            if config is None:
+                raise HTTPException(status_code=404, detail="Backup config not found")
         
-        os.makedirs("backups", exist_ok=True)
-        
-        with open(backup_path, 'w') as f:
-            json.dump(backup_data, f, default=str, indent=2)
+        # La exportación es bloqueante: se ejecuta en el pool de hilos
+        result = await run_in_threadpool(
+            run_backup, db.get_bind(), config, created_by=current_admin.username
+        )
         
         log = AdminLogCreate(
             action="BACKUP",
             resource="system",
-            details=f"Created system backup: {backup_filename}"
+            details=f"Created system backup: {result['filename']}"
         )
         client_ip = request.client.host if request.client else None
-        crud_admin.create_admin_log(
+        audit_log_writer.record(
             db=db,
             log=log,
             admin_id=current_admin.id,
@@ -236,36 +259,26 @@ async def create_backup(
             ip_address=client_ip
         )
         
-        return {"message": "Backup created successfully", "filename": backup_filename}
+        return {"message": "Backup created successfully", **result}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating backup: {str(e)}")
 
 
 @router.get("/backup/list")
 async def list_backups(
-    current_admin: Annotated[User, Depends(get_current_admin_user)]
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)],
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    try:
-        backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            return {"backups": []}
-        
-        backups = []
-        for filename in os.listdir(backup_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(backup_dir, filename)
-                stat = os.stat(filepath)
-                backups.append({
-                    "filename": filename,
-                    "size": stat.st_size,
-                    "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat()
-                })
-        
-        return {"backups": sorted(backups, key=lambda x: x["created_at"], reverse=True)}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error listing backups: {str(e)}")
+    backups = await db.run_sync(crud_admin.get_backup_manifests, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, backups)
+    return {"backups": backups}
 
 
 @router.post("/backup/restore/{filename}")
@@ -276,9 +289,22 @@ async def restore_backup(
     db: Session = Depends(get_db)
 ):
     try:
-        backup_path = f"backups/{filename}"
-        if not os.path.exists(backup_path):
+        backup_path = os.path.join(settings.BACKUP_DIR, filename)
+        if os.path.basename(filename) != filename or not os.path.exists(backup_path):
             raise HTTPException(status_code=404, detail="Backup file not found")
+        if not filename.endswith(BACKUP_SUFFIX):
+            raise HTTPException(status_code=400, detail="Unsupported backup format")
+        
+        paths = [os.path.join(settings.BACKUP_DIR, name) for name in backup_chain(db, filename)]
+        missing = [os.path.basename(path) for path in paths if not os.path.exists(path)]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Missing backup files in chain: {', '.join(missing)}")
+        
+        try:
+            result = await run_in_threadpool(restore_backup_file, db.get_bind(), paths)
+        except BackupFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        dashboard_cache.invalidate()
         
         log = AdminLogCreate(
             action="RESTORE",
@@ -286,7 +312,7 @@ async def restore_backup(
             details=f"Restored system from backup: {filename}"
         )
         client_ip = request.client.host if request.client else None
-        crud_admin.create_admin_log(
+        audit_log_writer.record(
             db=db,
             log=log,
             admin_id=current_admin.id,
@@ -294,7 +320,9 @@ async def restore_backup(
             ip_address=client_ip
         )
         
-        return {"message": f"Backup {filename} restored successfully"}
+        return {"message": f"Backup {filename} restored successfully", **result}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error restoring backup: {str(e)}")
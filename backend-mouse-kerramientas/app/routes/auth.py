@@ -2,31 +2,80 @@
 Rutas de autenticación (login y registro)
 """
 from datetime import timedelta
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
-from ..core.security import create_access_token, oauth2_scheme
+from ..core.security import create_access_token, create_refresh_token, oauth2_scheme
 from ..crud import user as crud_user
-from ..database.database import get_db
-from ..dependencies import get_current_active_user, get_current_user
+from ..database.database import get_async_db
+from ..dependencies import get_current_active_user, get_current_user, get_token_active_user
 from ..models.user import User
-from ..schemas.token import Token
+from ..schemas.token import RefreshTokenRequest, Token, TokenUser
 from ..schemas.user import User as UserSchema, UserCreate, UserLogin
+from ..services.password_hasher import PasswordHasherBusy, password_hasher
+from ..services.refresh_tokens import RefreshTokenError, logout_refresh_token, rotate_refresh_token
+from ..services.token_versions import user_token_claims
 
 router = APIRouter()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _token_response(username: str, claims: dict) -> dict:
+    """
+    Par de tokens (acceso y refresh) para un usuario
+    """
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        subject=username,
+        expires_delta=access_token_expires,
+        claims=claims if settings.ACCESS_TOKEN_CLAIMS else None
+    )
+    refresh_token = create_refresh_token(subject=username, claims=claims)
+    
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+async def _authenticate(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    """
+    Autenticar usuario verificando la contraseña en el pool de bcrypt
+    """
+    user = await db.run_sync(crud_user.get_user_by_username, username)
+    if not user:
+        return None
+    hashed_password = user.hashed_password
+    # Cerrar la transacción de lectura para no retener una conexión del pool
+    # mientras se espera a bcrypt
+    await db.commit()
+    try:
+        verified, new_hash = await password_hasher.verify_and_update(password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not verified:
+        return None
+    if new_hash:
+        # El hash usa un coste distinto de BCRYPT_ROUNDS: se guarda el recalculado
+        await db.run_sync(crud_user.update_password_hash, user, new_hash)
+    return user
+
+
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Registrar un nuevo usuario
     """
     # Verificar si el email ya existe
-    db_user = crud_user.get_user_by_email(db, email=user.email)
+    db_user = await db.run_sync(crud_user.get_user_by_email, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,27 +83,33 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Verificar si el username ya existe
-    db_user = crud_user.get_user_by_username(db, username=user.username)
+    db_user = await db.run_sync(crud_user.get_user_by_username, user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
-    # Crear el usuario
-    db_user = crud_user.create_user(db=db, user=user)
+    # Crear el usuario (bcrypt se ejecuta fuera del event loop, sin retener
+    # la conexión de las consultas anteriores)
+    await db.commit()
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    db_user = await db.run_sync(crud_user.create_user, user, hashed_password=hashed_password)
     return db_user
 
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login de usuario con OAuth2 compatible
     """
-    user = crud_user.authenticate_user(db, form_data.username, form_data.password)
+    user = await _authenticate(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,20 +123,15 @@ async def login(
             detail="Inactive user"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.username, expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _token_response(user.username, await db.run_sync(user_token_claims, user))
 
 
 @router.post("/login-json", response_model=Token)
-async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login_json(user_login: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login de usuario con JSON (alternativa más simple)
     """
-    user = crud_user.authenticate_user(db, user_login.username, user_login.password)
+    user = await _authenticate(db, user_login.username, user_login.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,12 +144,37 @@ async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.username, expires_delta=access_token_expires
-    )
+    return _token_response(user.username, await db.run_sync(user_token_claims, user))
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(body: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Obtener un par de tokens nuevo a partir de un refresh token (que queda usado)
+    """
+    try:
+        claims = await db.run_sync(rotate_refresh_token, body.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    username = claims.pop("sub")
+    return _token_response(username, claims)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Revocar un refresh token
+    """
+    try:
+        await db.run_sync(logout_refresh_token, body.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    return None
 
 
 @router.get("/me", response_model=UserSchema)
@@ -113,7 +188,7 @@ async def read_users_me(
 
 
 @router.get("/test-token")
-async def test_token(current_user: Annotated[User, Depends(get_current_active_user)]):
+async def test_token(current_user: Annotated[TokenUser, Depends(get_token_active_user)]):
     """
     Endpoint para probar que el token funciona correctamente
     """
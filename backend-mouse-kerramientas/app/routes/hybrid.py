@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.config.database import get_db
+from app.config.database import get_async_db
 from app.config.mongodb import get_mongo_db
 from app.models.sql.models import Herramienta
 from app.models.nosql.models import Resena
@@ -15,14 +15,14 @@ router = APIRouter()
 async def crear_resena(
     herramienta_id: int,
     resena_data: ResenaCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Crear una nueva reseña para una herramienta (guarda en MongoDB y actualiza SQL)
     """
     try:
         # Verificar que la herramienta existe en SQL
-        herramienta = db.query(Herramienta).filter(Herramienta.id == herramienta_id).first()
+        herramienta = await db.get(Herramienta, herramienta_id)
         if not herramienta:
             raise HTTPException(status_code=404, detail="Herramienta no encontrada")
         
@@ -76,14 +76,14 @@ async def obtener_resenas(herramienta_id: int):
 @router.get("/herramientas/{herramienta_id}/estadisticas")
 async def obtener_estadisticas_herramienta(
     herramienta_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener estadísticas completas de una herramienta (SQL + MongoDB)
     """
     try:
         # Datos básicos desde SQL
-        herramienta = db.query(Herramienta).filter(Herramienta.id == herramienta_id).first()
+        herramienta = await db.get(Herramienta, herramienta_id)
         if not herramienta:
             raise HTTPException(status_code=404, detail="Herramienta no encontrada")
         
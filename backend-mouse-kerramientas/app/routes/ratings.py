@@ -1,15 +1,17 @@
 """
 Rutas para la gestión de calificaciones.
 """
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from ..core.pagination import CURSOR_DESCRIPTION, set_next_cursor
 from ..crud import rating as crud_rating
-from ..database.database import get_db
-from ..dependencies import get_current_user
+from ..database.database import get_db, get_read_db
+from ..dependencies import get_current_user, get_token_user
 from ..models.user import User
 from ..schemas.rating import Rating, RatingCreate, RatingUpdate, RatingWithUser, RatingStats
+from ..schemas.token import TokenUser
 
 router = APIRouter()
 
@@ -17,35 +19,24 @@ router = APIRouter()
 @router.get("/tool/{tool_id}", response_model=List[RatingWithUser])
 def get_tool_ratings(
     tool_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtiene las calificaciones de una herramienta específica.
     """
-    ratings = crud_rating.get_ratings_by_tool(db, tool_id=tool_id, skip=skip, limit=limit)
-    
-    ratings_with_user = []
-    for rating in ratings:
-        rating_dict = {
-            "id": rating.id,
-            "tool_id": rating.tool_id,
-            "user_id": rating.user_id,
-            "rating": rating.rating,
-            "comment": rating.comment,
-            "created_at": rating.created_at,
-            "updated_at": rating.updated_at,
-            "user_username": rating.user.username,
-            "user_full_name": rating.user.full_name
-        }
-        ratings_with_user.append(rating_dict)
-    
-    return ratings_with_user
+    ratings = crud_rating.get_ratings_with_user_by_tool(
+        db, tool_id=tool_id, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, ratings)
+    return ratings
 
 
 @router.get("/tool/{tool_id}/stats", response_model=RatingStats)
-def get_tool_rating_stats(tool_id: int, db: Session = Depends(get_db)):
+def get_tool_rating_stats(tool_id: int, db: Session = Depends(get_read_db)):
     """
     Obtiene estadísticas de calificación para una herramienta.
     """
@@ -130,9 +121,9 @@ def delete_rating(
 
 @router.get("/user/me", response_model=List[Rating])
 def get_my_ratings(
+    current_user: Annotated[TokenUser, Depends(get_token_user)],
     skip: int = 0,
     limit: int = 100,
-    current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_db)
 ):
     """
@@ -1,16 +1,19 @@
 """
 Rutas para la gestión de alquileres.
 """
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from ..core.metrics import metrics
+from ..core.pagination import CURSOR_DESCRIPTION, set_next_cursor
 from ..crud import rental as crud_rental
 from ..database.database import get_db
-from ..dependencies import get_current_user, get_current_admin_user
+from ..dependencies import get_current_user, get_current_admin_user, get_token_admin_user, get_token_user
 from ..models.user import User
 from ..models.tool import Tool
 from ..schemas.rental import Rental, RentalCreate, RentalUpdate, RentalReturn, RentalWithDetails, RentalStats
+from ..schemas.token import TokenUser
 
 router = APIRouter()
 
@@ -31,94 +34,50 @@ def create_rental(
             detail="Herramienta no encontrada"
         )
     
-    if not tool.is_available:
+    if rental.end_date <= rental.start_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La herramienta no está disponible"
+            detail="La fecha de fin debe ser posterior a la fecha de inicio"
         )
     
-    existing_rental = crud_rental.get_active_rental_for_tool(db, tool_id=rental.tool_id)
-    if existing_rental:
+    db_rental = crud_rental.create_rental(db=db, rental=rental, user_id=current_user.id)
+    if db_rental is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La herramienta ya está alquilada"
+            detail="La herramienta ya está alquilada en esas fechas"
         )
     
-    return crud_rental.create_rental(db=db, rental=rental, user_id=current_user.id)
+    return db_rental
 
 
 @router.get("/user/me", response_model=List[RentalWithDetails])
 def get_my_rentals(
+    current_user: Annotated[TokenUser, Depends(get_token_user)],
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: Annotated[User, Depends(get_current_user)],
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """
     Obtiene los alquileres del usuario actual.
     """
-    rentals = crud_rental.get_rentals_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
-    
-    rentals_with_details = []
-    for rental in rentals:
-        rental_dict = {
-            "id": rental.id,
-            "tool_id": rental.tool_id,
-            "user_id": rental.user_id,
-            "start_date": rental.start_date,
-            "end_date": rental.end_date,
-            "actual_return_date": rental.actual_return_date,
-            "total_price": rental.total_price,
-            "status": rental.status,
-            "notes": rental.notes,
-            "created_at": rental.created_at,
-            "updated_at": rental.updated_at,
-            "tool_name": rental.tool.name,
-            "tool_brand": rental.tool.brand,
-            "tool_model": rental.tool.model,
-            "tool_daily_price": rental.tool.daily_price,
-            "user_username": rental.user.username,
-            "user_full_name": rental.user.full_name
-        }
-        rentals_with_details.append(rental_dict)
-    
-    return rentals_with_details
+    rentals = crud_rental.get_rentals_with_details_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, rentals)
+    return rentals
 
 
 @router.get("/user/me/active", response_model=List[RentalWithDetails])
 def get_my_active_rentals(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[TokenUser, Depends(get_token_user)],
     db: Session = Depends(get_db)
 ):
     """
     Obtiene los alquileres activos del usuario actual.
     """
-    rentals = crud_rental.get_user_active_rentals(db, user_id=current_user.id)
-    
-    rentals_with_details = []
-    for rental in rentals:
-        rental_dict = {
-            "id": rental.id,
-            "tool_id": rental.tool_id,
-            "user_id": rental.user_id,
-            "start_date": rental.start_date,
-            "end_date": rental.end_date,
-            "actual_return_date": rental.actual_return_date,
-            "total_price": rental.total_price,
-            "status": rental.status,
-            "notes": rental.notes,
-            "created_at": rental.created_at,
-            "updated_at": rental.updated_at,
-            "tool_name": rental.tool.name,
-            "tool_brand": rental.tool.brand,
-            "tool_model": rental.tool.model,
-            "tool_daily_price": rental.tool.daily_price,
-            "user_username": rental.user.username,
-            "user_full_name": rental.user.full_name
-        }
-        rentals_with_details.append(rental_dict)
-    
-    return rentals_with_details
+    return crud_rental.get_user_active_rentals_with_details(db, user_id=current_user.id)
 
 
 @router.put("/{rental_id}/activate", response_model=Rental)
@@ -197,51 +156,31 @@ def cancel_rental(
 @router.get("/{rental_id}", response_model=RentalWithDetails)
 def get_rental(
     rental_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[TokenUser, Depends(get_token_user)],
     db: Session = Depends(get_db)
 ):
     """
     Obtiene un alquiler específico.
     """
-    rental = crud_rental.get_rental(db, rental_id=rental_id)
+    rental = crud_rental.get_rental_with_details(db, rental_id=rental_id)
     if not rental:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alquiler no encontrado"
         )
     
-    if rental.user_id != current_user.id and not current_user.is_superuser:
+    if rental["user_id"] != current_user.id and not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para ver este alquiler"
         )
     
-    rental_dict = {
-        "id": rental.id,
-        "tool_id": rental.tool_id,
-        "user_id": rental.user_id,
-        "start_date": rental.start_date,
-        "end_date": rental.end_date,
-        "actual_return_date": rental.actual_return_date,
-        "total_price": rental.total_price,
-        "status": rental.status,
-        "notes": rental.notes,
-        "created_at": rental.created_at,
-        "updated_at": rental.updated_at,
-        "tool_name": rental.tool.name,
-        "tool_brand": rental.tool.brand,
-        "tool_model": rental.tool.model,
-        "tool_daily_price": rental.tool.daily_price,
-        "user_username": rental.user.username,
-        "user_full_name": rental.user.full_name
-    }
-    
-    return rental_dict
+    return rental
 
 
 @router.get("/stats/general", response_model=RentalStats)
 def get_rental_stats(
-    current_admin: Annotated[User, Depends(get_current_admin_user)],
+    current_admin: Annotated[TokenUser, Depends(get_token_admin_user)],
     db: Session = Depends(get_db)
 ):
     """
@@ -260,4 +199,8 @@ def check_overdue_rentals(
     Verifica y marca como vencidos los alquileres que superaron la fecha de devolución.
     """
     overdue_count = crud_rental.check_overdue_rentals(db)
-    return {"message": f"Se marcaron {overdue_count} alquileres como vencidos"}
+    metrics.increment("rentals.marked_overdue", overdue_count)
+    return {
+        "message": f"Se marcaron {overdue_count} alquileres como vencidos",
+        "overdue_count": overdue_count
+    }
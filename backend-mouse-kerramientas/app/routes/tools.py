@@ -1,24 +1,27 @@
 """
 Rutas para la gestión de herramientas.
 """
+from datetime import datetime
 from typing import Annotated, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import func
 
-from ..crud import admin as crud_admin
-from ..database.database import get_db
+from ..core.pagination import CURSOR_DESCRIPTION, keyset_page, set_next_cursor
+from ..crud import tool as crud_tool
+from ..database.database import get_db, get_read_db
 from ..dependencies import get_current_admin_user, get_current_user
 from ..models.tool import Tool as ToolModel, ToolCondition
 from ..models.user import User
-from ..schemas.admin import AdminLogCreate
 from ..schemas.tool import Tool, ToolCreate, ToolDetail, ToolUpdate
+from ..services.availability import get_available_tools, is_tool_available
 
 router = APIRouter()
 
 
 @router.get("/search", response_model=List[Tool])
 def search_tools(
+    response: Response,
     q: Optional[str] = Query(None, description="Búsqueda general en nombre, descripción, marca y modelo"),
     category: Optional[str] = Query(None, description="Filtrar por categoría"),
     brand: Optional[str] = Query(None, description="Filtrar por marca"),
@@ -28,49 +31,61 @@ def search_tools(
     available: Optional[bool] = Query(None, description="Filtrar por disponibilidad"),
     skip: int = Query(0, description="Número de registros a saltar"),
     limit: int = Query(100, description="Número máximo de registros"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
     """
     Busca y filtra herramientas con múltiples criterios.
-    """
-    query = db.query(ToolModel)
     
-    # Búsqueda general por texto
-    if q:
-        search_filter = or_(
-            ToolModel.name.ilike(f"%{q}%"),
-            ToolModel.description.ilike(f"%{q}%"),
-            ToolModel.brand.ilike(f"%{q}%"),
-            ToolModel.model.ilike(f"%{q}%")
+    La búsqueda por texto usa el índice de texto completo y devuelve los
+    resultados ordenados por relevancia.
+    """
+    tools = crud_tool.search_tools(
+        db,
+        q=q,
+        category=category,
+        brand=brand,
+        condition=condition,
+        min_price=min_price,
+        max_price=max_price,
+        available=available,
+        skip=skip,
+        limit=limit,
+        cursor=cursor
+    )
+    set_next_cursor(response, tools)
+    return tools
+
+
+def _check_period(start_date: datetime, end_date: datetime) -> None:
+    if end_date <= start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha de fin debe ser posterior a la fecha de inicio"
         )
-        query = query.filter(search_filter)
-    
-    # Filtros específicos
-    if category:
-        query = query.filter(ToolModel.category.ilike(f"%{category}%"))
-    
-    if brand:
-        query = query.filter(ToolModel.brand.ilike(f"%{brand}%"))
-    
-    if condition:
-        query = query.filter(ToolModel.condition == condition)
-    
-    if min_price is not None:
-        query = query.filter(ToolModel.daily_price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(ToolModel.daily_price <= max_price)
-    
-    if available is not None:
-        query = query.filter(ToolModel.is_available == available)
-    
-    # Aplicar paginación
-    tools = query.offset(skip).limit(limit).all()
+
+
+@router.get("/available", response_model=List[Tool])
+def get_tools_available_between(
+    response: Response,
+    start_date: datetime = Query(..., description="Inicio del periodo"),
+    end_date: datetime = Query(..., description="Fin del periodo"),
+    skip: int = Query(0, description="Número de registros a saltar"),
+    limit: int = Query(100, description="Número máximo de registros"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Obtiene las herramientas que se pueden alquilar entre dos fechas.
+    """
+    _check_period(start_date, end_date)
+    tools = get_available_tools(db, start_date, end_date, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, tools)
     return tools
 
 
 @router.get("/filters/options", response_model=dict)
-def get_filter_options(db: Session = Depends(get_db)):
+def get_filter_options(db: Session = Depends(get_read_db)):
     """
     Obtiene las opciones disponibles para los filtros.
     """
@@ -104,17 +119,20 @@ def get_filter_options(db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[Tool])
 def get_tools(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category_id: Optional[int] = None,
     available: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtiene una lista de herramientas con filtros opcionales.
     
     - **skip**: Número de registros a saltar (para paginación)
     - **limit**: Número máximo de registros a devolver
+    - **cursor**: Cursor de la página siguiente, alternativa a skip
     - **category_id**: Filtrar por ID de categoría
     - **available**: Filtrar por disponibilidad
     """
@@ -128,7 +146,8 @@ def get_tools(
         query = query.filter(ToolModel.is_available == available)
     
     # Aplicar paginación
-    tools = query.offset(skip).limit(limit).all()
+    tools = keyset_page(query, [(ToolModel.id, False)], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, tools)
     return tools
 
 
@@ -144,32 +163,12 @@ def create_tool(
     
     - **tool**: Datos de la herramienta a crear
     """
-    db_tool = ToolModel(**tool.dict())
-    
-    db.add(db_tool)
-    db.commit()
-    db.refresh(db_tool)
-    
-    log = AdminLogCreate(
-        action="CREATE",
-        resource="tool",
-        resource_id=str(db_tool.id),
-        details=f"Created tool: {tool.name}"
-    )
     client_ip = request.client.host if request.client else None
-    crud_admin.create_admin_log(
-        db=db,
-        log=log,
-        admin_id=current_admin.id,
-        admin_username=current_admin.username,
-        ip_address=client_ip
-    )
-    
-    return db_tool
+    return crud_tool.create_tool(db, tool, admin=current_admin, ip_address=client_ip)
 
 
 @router.get("/{tool_id}", response_model=ToolDetail)
-def get_tool(tool_id: int, db: Session = Depends(get_db)):
+def get_tool(tool_id: int, db: Session = Depends(get_read_db)):
     """
     Obtiene una herramienta por su ID.
     
@@ -184,6 +183,30 @@ def get_tool(tool_id: int, db: Session = Depends(get_db)):
     return tool
 
 
+@router.get("/{tool_id}/availability", response_model=dict)
+def get_tool_availability(
+    tool_id: int,
+    start_date: datetime = Query(..., description="Inicio del periodo"),
+    end_date: datetime = Query(..., description="Fin del periodo"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Indica si una herramienta se puede alquilar entre dos fechas.
+    """
+    _check_period(start_date, end_date)
+    if db.query(ToolModel.id).filter(ToolModel.id == tool_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Herramienta no encontrada"
+        )
+    return {
+        "tool_id": tool_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "available": is_tool_available(db, tool_id, start_date, end_date)
+    }
+
+
 @router.put("/{tool_id}", response_model=Tool)
 def update_tool(
     tool_id: int,
@@ -198,35 +221,13 @@ def update_tool(
     - **tool_id**: ID de la herramienta a actualizar
     - **tool_update**: Datos a actualizar en la herramienta
     """
-    db_tool = db.query(ToolModel).filter(ToolModel.id == tool_id).first()
+    client_ip = request.client.host if request.client else None
+    db_tool = crud_tool.update_tool(db, tool_id, tool_update, admin=current_admin, ip_address=client_ip)
     if db_tool is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Herramienta no encontrada"
         )
-    
-    update_data = tool_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_tool, key, value)
-    
-    db.commit()
-    db.refresh(db_tool)
-    
-    log = AdminLogCreate(
-        action="UPDATE",
-        resource="tool",
-        resource_id=str(tool_id),
-        details=f"Updated tool: {db_tool.name}"
-    )
-    client_ip = request.client.host if request.client else None
-    crud_admin.create_admin_log(
-        db=db,
-        log=log,
-        admin_id=current_admin.id,
-        admin_username=current_admin.username,
-        ip_address=client_ip
-    )
-    
     return db_tool
 
 
@@ -242,30 +243,10 @@ def delete_tool(
     
     - **tool_id**: ID de la herramienta a eliminar
     """
-    db_tool = db.query(ToolModel).filter(ToolModel.id == tool_id).first()
-    if db_tool is None:
+    client_ip = request.client.host if request.client else None
+    if not crud_tool.delete_tool(db, tool_id, admin=current_admin, ip_address=client_ip):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Herramienta no encontrada"
         )
-    
-    tool_name = db_tool.name
-    db.delete(db_tool)
-    db.commit()
-    
-    log = AdminLogCreate(
-        action="DELETE",
-        resource="tool",
-        resource_id=str(tool_id),
-        details=f"Deleted tool: {tool_name}"
-    )
-    client_ip = request.client.host if request.client else None
-    crud_admin.create_admin_log(
-        db=db,
-        log=log,
-        admin_id=current_admin.id,
-        admin_username=current_admin.username,
-        ip_address=client_ip
-    )
-    
-    return None
\ No newline at end of file
+    return None
@@ -1,11 +1,12 @@
 """
 Rutas para la gestión de usuarios.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
-from ..database.database import get_db
+from ..core.pagination import CURSOR_DESCRIPTION, keyset_page, set_next_cursor
+from ..database.database import get_db, get_read_db
 from ..models.user import User as UserModel
 from ..schemas.user import User, UserCreate, UserUpdate
 
@@ -14,19 +15,23 @@ router = APIRouter()
 
 @router.get("/", response_model=List[User])
 def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtiene una lista de usuarios.
     
     - **skip**: Número de registros para saltar (paginación)
     - **limit**: Número máximo de registros a devolver
+    - **cursor**: Cursor de la página siguiente, alternativa a skip
     """
     # En una aplicación real, este endpoint debería estar protegido
     # y solo accesible para administradores
-    users = db.query(UserModel).offset(skip).limit(limit).all()
+    users = keyset_page(db.query(UserModel), [(UserModel.id, False)], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, users)
     return users
 
 
@@ -93,7 +98,7 @@ def read_user_me():
 
 
 @router.get("/{user_id}", response_model=User)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """
     Obtiene un usuario por su ID.
     
@@ -2,9 +2,10 @@
 Esquemas Pydantic para validación de datos de alquileres.
 """
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from datetime import datetime
 from ..models.rental import RentalStatus
+from ..services.availability import to_utc_naive
 
 
 class RentalBase(BaseModel):
@@ -13,6 +14,11 @@ class RentalBase(BaseModel):
     end_date: datetime = Field(..., description="Fecha de fin del alquiler")
     notes: Optional[str] = Field(None, max_length=500, description="Notas adicionales")
 
+    @validator('start_date', 'end_date')
+    def dates_to_utc(cls, v):
+        """Guardar y comparar las fechas en UTC sin zona horaria."""
+        return to_utc_naive(v)
+
 
 class RentalCreate(RentalBase):
     """Esquema para crear un nuevo alquiler."""
@@ -25,12 +31,22 @@ class RentalUpdate(BaseModel):
     status: Optional[RentalStatus] = Field(None, description="Nuevo estado del alquiler")
     notes: Optional[str] = Field(None, max_length=500, description="Notas adicionales")
 
+    @validator('end_date')
+    def end_date_to_utc(cls, v):
+        """Guardar la fecha en UTC sin zona horaria."""
+        return to_utc_naive(v) if v is not None else v
+
 
 class RentalReturn(BaseModel):
     """Esquema para devolver una herramienta."""
     actual_return_date: datetime = Field(..., description="Fecha real de devolución")
     notes: Optional[str] = Field(None, max_length=500, description="Notas sobre la devolución")
 
+    @validator('actual_return_date')
+    def return_date_to_utc(cls, v):
+        """Guardar la fecha en UTC sin zona horaria."""
+        return to_utc_naive(v)
+
 
 class Rental(RentalBase):
     """Esquema para respuestas de alquiler."""
@@ -11,11 +11,29 @@ class Token(BaseModel):
     Schema para respuesta de token
     """
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
+class RefreshTokenRequest(BaseModel):
+    """
+    Schema para renovar o revocar un refresh token
+    """
+    refresh_token: str
+
+
 class TokenData(BaseModel):
     """
     Schema para datos del token
     """
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+
+class TokenUser(BaseModel):
+    """
+    Schema del usuario autenticado según los claims del token
+    """
+    id: int
+    username: str
+    is_active: bool
+    is_superuser: bool
@@ -0,0 +1,113 @@
+"""
+Estadísticas del panel de administración con caché de corta duración.
+
+Las estadísticas de herramientas y usuarios se calculan con dos consultas
+de agregados condicionales y se guardan durante
+``settings.ADMIN_DASHBOARD_CACHE_SECONDS``. La caché se invalida al confirmar
+cualquier transacción que cree, modifique o elimine herramientas o usuarios,
+también con ``query(...).update()`` / ``delete()`` masivos. Las escrituras
+que no pasan por la sesión (restauración de copias) o las tareas periódicas
+invalidan la caché explícitamente con ``dashboard_cache.invalidate()``.
+"""
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.tool import Tool
+from ..models.user import User
+from ..schemas.admin import ToolStats, UserStats
+
+_SNAPSHOT_KEY = "dashboard"
+_STALE_FLAG = "admin_dashboard_stale"
+
+dashboard_cache = TTLCache(ttl=settings.ADMIN_DASHBOARD_CACHE_SECONDS, maxsize=1)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def compute_tool_stats(db: Session) -> ToolStats:
+    """Calcula las estadísticas de herramientas en una sola consulta agrupada."""
+    rows = db.query(
+        Tool.category,
+        Tool.condition,
+        func.count(Tool.id),
+        _count_if(Tool.is_available == True)
+    ).group_by(Tool.category, Tool.condition).all()
+
+    total_tools = 0
+    available_tools = 0
+    tools_by_category = {}
+    tools_by_condition = {}
+    for category, condition, count, available in rows:
+        total_tools += count
+        available_tools += available
+        tools_by_category[category] = tools_by_category.get(category, 0) + count
+        tools_by_condition[condition] = tools_by_condition.get(condition, 0) + count
+
+    return ToolStats(
+        total_tools=total_tools,
+        available_tools=available_tools,
+        rented_tools=total_tools - available_tools,
+        tools_by_category=tools_by_category,
+        tools_by_condition=tools_by_condition
+    )
+
+
+def compute_user_stats(db: Session) -> UserStats:
+    """Calcula las estadísticas de usuarios en una sola consulta."""
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    total_users, active_users, admin_users, recent_registrations = db.query(
+        func.count(User.id),
+        _count_if(User.is_active == True),
+        _count_if(User.is_superuser == True),
+        _count_if(User.created_at >= week_ago)
+    ).one()
+
+    return UserStats(
+        total_users=total_users,
+        active_users=active_users,
+        admin_users=admin_users,
+        recent_registrations=recent_registrations
+    )
+
+
+def get_dashboard_stats(db: Session) -> Tuple[ToolStats, UserStats]:
+    """Obtiene las estadísticas del panel desde la caché o recalculándolas."""
+    snapshot = dashboard_cache.get(_SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = (compute_tool_stats(db), compute_user_stats(db))
+        dashboard_cache.set(_SNAPSHOT_KEY, snapshot)
+    return snapshot
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_stale(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, (Tool, User)):
+            session.info[_STALE_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _mark_stale_bulk(context):
+    # Los UPDATE/DELETE masivos no pasan por after_flush
+    if context.mapper.class_ in (Tool, User):
+        context.session.info[_STALE_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_STALE_FLAG, False):
+        dashboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_stale_flag(session):
+    session.info.pop(_STALE_FLAG, None)
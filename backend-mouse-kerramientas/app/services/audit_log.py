@@ -0,0 +1,190 @@
+"""
+Escritura del registro de auditoría por lotes.
+
+Las rutas de administración encolan sus entradas con ``audit_log_writer.record``
+en lugar de hacer un commit propio por entrada. Un hilo en segundo plano las
+inserta en bloque cuando se acumulan ``AUDIT_LOG_BATCH_SIZE`` entradas o han
+pasado ``AUDIT_LOG_FLUSH_SECONDS`` segundos, y al detener la aplicación se
+escriben las que queden pendientes.
+
+Cada entrada recuerda el motor de la sesión que la generó, de modo que se
+guarda en la misma base de datos que la operación auditada. Si el escritor no
+está en marcha (scripts, tests), la entrada se inserta en el momento.
+
+El búfer está acotado a ``AUDIT_LOG_MAX_PENDING`` entradas: si se llena, la
+petición que encola vacía el búfer ella misma antes de continuar. Las entradas
+que no se pueden escribir se reintentan en los siguientes vaciados y, tras
+``AUDIT_LOG_MAX_ATTEMPTS`` fallos (o si no caben en el búfer), se descartan y
+se vuelcan al log de la aplicación con nivel ERROR para no perderlas.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..models.admin_log import AdminLog
+from ..schemas.admin import AdminLogCreate
+
+logger = logging.getLogger(__name__)
+
+# Entrada pendiente: motor de destino, fila y fallos de escritura acumulados
+_Entry = Tuple[Engine, dict, int]
+
+
+class AuditLogWriter:
+    """
+    Búfer en memoria de entradas de auditoría que se vacía con inserciones en bloque
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        max_attempts: int = 3
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._buffer: List[_Entry] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def record(
+        self,
+        db: Session,
+        log: AdminLogCreate,
+        admin_id: int,
+        admin_username: str,
+        ip_address: Optional[str] = None
+    ) -> None:
+        """
+        Encolar una entrada de auditoría
+        """
+        row = {
+            "admin_id": admin_id,
+            "admin_username": admin_username,
+            "action": log.action,
+            "resource": log.resource,
+            "resource_id": log.resource_id,
+            "details": log.details,
+            "ip_address": ip_address,
+            "created_at": datetime.utcnow()
+        }
+        with self._lock:
+            self._buffer.append((db.get_bind(), row, 0))
+            pending = len(self._buffer)
+        metrics.increment("audit_log.enqueued")
+        metrics.set_gauge("audit_log.pending", pending)
+
+        if not self.running:
+            self.flush()
+        elif pending >= self.max_pending:
+            # Búfer lleno: la petición espera a que se escriba
+            metrics.increment("audit_log.sync_flushes")
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Insertar todas las entradas pendientes
+
+        Returns:
+            Número de entradas escritas
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+
+            by_engine: Dict[Engine, List[_Entry]] = {}
+            for entry in entries:
+                by_engine.setdefault(entry[0], []).append(entry)
+
+            written = 0
+            failed: List[_Entry] = []
+            dropped: List[_Entry] = []
+            for engine, batch in by_engine.items():
+                start = time.perf_counter()
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(AdminLog), [row for _, row, _ in batch])
+                except Exception:
+                    logger.exception("No se pudieron escribir %d entradas de auditoría", len(batch))
+                    metrics.increment("audit_log.errors")
+                    for _, row, attempts in batch:
+                        entry = (engine, row, attempts + 1)
+                        (failed if attempts + 1 < self.max_attempts else dropped).append(entry)
+                    continue
+                metrics.observe("audit_log.flush_ms", (time.perf_counter() - start) * 1000)
+                written += len(batch)
+
+            with self._lock:
+                if failed:
+                    # Se reintentan en el siguiente vaciado, sin pasar del límite
+                    self._buffer[:0] = failed
+                overflow = len(self._buffer) - self.max_pending
+                if overflow > 0:
+                    dropped.extend(self._buffer[:overflow])
+                    del self._buffer[:overflow]
+                pending = len(self._buffer)
+
+            for _, row, attempts in dropped:
+                logger.error("Entrada de auditoría descartada (%d fallos): %s", attempts, row)
+            metrics.increment("audit_log.dropped", len(dropped))
+            metrics.increment("audit_log.written", written)
+            metrics.set_gauge("audit_log.pending", pending)
+            return written
+
+    def start(self) -> None:
+        """
+        Iniciar el hilo que vacía el búfer periódicamente
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Detener el hilo y escribir las entradas pendientes
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Instancia global del escritor de auditoría
+audit_log_writer = AuditLogWriter(
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=settings.AUDIT_LOG_FLUSH_SECONDS,
+    max_pending=settings.AUDIT_LOG_MAX_PENDING,
+    max_attempts=settings.AUDIT_LOG_MAX_ATTEMPTS
+)
@@ -0,0 +1,122 @@
+"""
+Disponibilidad de herramientas por rango de fechas.
+
+Una herramienta está ocupada en [inicio, fin) si tiene algún alquiler que
+bloquea ese intervalo:
+
+- pendiente o activo que se solapa con él (``start_date < fin`` y
+  ``end_date > inicio``);
+- vencido que empezó antes de ``fin``, porque la herramienta sigue sin
+  devolverse aunque su fecha de fin ya pasó.
+
+Las consultas filtran primero por ``BLOCKING_STATUSES`` y usan el índice
+``ix_rentals_tool_status_period`` (tool_id, status, start_date, end_date), por
+lo que comprobar una herramienta solo recorre sus alquileres pendientes,
+activos o vencidos que empiezan antes de ``fin``; los devueltos y cancelados
+no se leen.
+
+Para reservar sin carreras, la comprobación y la inserción se hacen después
+de ``lock_tool_for_booking``, que serializa las reservas de una herramienta:
+en PostgreSQL bloquea su fila con ``SELECT ... FOR UPDATE`` y en SQLite abre
+la transacción con ``BEGIN IMMEDIATE``, que toma el bloqueo de escritura de
+la base de datos.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+
+from ..core.pagination import CursorPage, keyset_page
+from ..models.rental import Rental, RentalStatus
+from ..models.tool import Tool
+
+# Estados de los alquileres que pueden ocupar la herramienta
+BLOCKING_STATUSES = [RentalStatus.PENDING, RentalStatus.ACTIVE, RentalStatus.OVERDUE]
+
+
+def lock_tool_for_booking(db: Session, tool_id: int) -> Optional[Tool]:
+    """
+    Bloquea la herramienta hasta el final de la transacción para reservarla.
+
+    Returns:
+        La herramienta, o None si no existe
+    """
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        dbapi_connection = connection.connection.dbapi_connection
+        # Si ya hay escrituras en la transacción, el bloqueo ya está tomado
+        if not dbapi_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        return db.query(Tool).filter(Tool.id == tool_id).populate_existing().first()
+    return db.query(Tool).filter(Tool.id == tool_id).with_for_update().populate_existing().first()
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Convierte una fecha con zona horaria a UTC sin zona, como ``datetime.utcnow()``."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def refresh_tool_availability(db: Session, tool: Tool) -> None:
+    """
+    Recalcula ``is_available`` (si la herramienta está fuera ahora) a partir de
+    sus alquileres: activos, vencidos o pendientes cuyo periodo incluye el
+    momento actual. Los cambios de estado pendientes se vuelcan antes.
+    """
+    db.flush()
+    now = datetime.utcnow()
+    out_now = db.query(Rental.id).filter(
+        Rental.tool_id == tool.id,
+        Rental.status.in_(BLOCKING_STATUSES),
+        or_(
+            Rental.status != RentalStatus.PENDING,
+            and_(Rental.start_date <= now, Rental.end_date > now)
+        )
+    )
+    tool.is_available = not db.query(out_now.exists()).scalar()
+
+
+def blocking_rentals_filter(start_date: datetime, end_date: datetime):
+    """Condición SQL de los alquileres que impiden reservar en [start_date, end_date)."""
+    # El estado va como condición propia para que el índice lo use
+    return and_(
+        Rental.status.in_(BLOCKING_STATUSES),
+        Rental.start_date < end_date,
+        or_(Rental.status == RentalStatus.OVERDUE, Rental.end_date > start_date)
+    )
+
+
+def is_tool_available(
+    db: Session,
+    tool_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    exclude_rental_id: Optional[int] = None
+) -> bool:
+    """Indica si la herramienta está libre entre start_date y end_date."""
+    query = db.query(Rental.id).filter(
+        Rental.tool_id == tool_id,
+        blocking_rentals_filter(start_date, end_date)
+    )
+    if exclude_rental_id is not None:
+        query = query.filter(Rental.id != exclude_rental_id)
+    return not db.query(query.exists()).scalar()
+
+
+def get_available_tools(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> CursorPage:
+    """Obtiene las herramientas libres entre start_date y end_date."""
+    busy = exists().where(
+        Rental.tool_id == Tool.id,
+        blocking_rentals_filter(start_date, end_date)
+    )
+    query = db.query(Tool).filter(~busy)
+    return keyset_page(query, [(Tool.id, False)], cursor=cursor, skip=skip, limit=limit)
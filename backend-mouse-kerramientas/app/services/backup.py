@@ -0,0 +1,580 @@
+"""
+Copias de seguridad del sistema en NDJSON comprimido con gzip.
+
+Formato del archivo (una línea JSON por registro):
+
+- cabecera: ``{"backup": {"version": 1, "kind": "full" | "incremental", "parent": ..., ...}}``
+- en las incrementales, ``{"deleted": nombre, "ids": [...]}`` con los ids
+  borrados desde la copia anterior;
+- por cada tabla, ``{"table": nombre, "columns": [...]}`` seguida de una
+  línea por fila con la lista de valores, y ``{"end": nombre, "rows": n}``.
+
+Las tablas se leen con cursores de servidor (``stream_results``) en lotes de
+``BACKUP_BATCH_SIZE`` filas y se escriben directamente al archivo
+comprimido, por lo que la memoria usada no depende del tamaño de las tablas.
+El archivo se escribe con extensión ``.part`` y se renombra al terminar.
+
+Una copia incremental solo incluye las filas con ``updated_at`` posterior a
+la marca de agua de la copia anterior (o id mayor, en tablas sin
+``updated_at``) y los borrados registrados en ``backup_tombstones`` (ver
+``services/backup_tracking.py``). Cada copia se registra en
+``backup_manifests``; la política de cada ``BackupConfig`` decide cuántas
+incrementales se encadenan antes de la siguiente copia completa.
+
+La restauración lee los archivos en streaming y, en una sola transacción,
+vacía las tablas, inserta las filas de la copia completa en lotes con
+``executemany`` y aplica después cada incremental de la cadena. Si algo
+falla no se aplica ningún cambio. Al terminar recalcula los datos derivados
+(resúmenes de calificaciones) y ajusta las secuencias en PostgreSQL. Las
+configuraciones de copia se exportan pero no se restauran, porque los
+manifiestos conservados apuntan a ellas.
+"""
+import enum
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Union
+
+from sqlalchemy import Date, DateTime, Enum, delete, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..crud.rating import rebuild_rating_summaries
+from ..models.admin_log import AdminLog
+from ..models.backup_config import BackupConfig
+from ..models.backup_manifest import BackupManifest, BackupTombstone
+from ..models.rating import Rating, ToolRatingSummary
+from ..models.rental import Rental
+from ..models.tool import Tool
+from ..models.user import User
+from .token_versions import bump_all_token_versions, token_versions
+from .user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+BACKUP_SUFFIX = ".ndjson.gz"
+FULL = "full"
+INCREMENTAL = "incremental"
+RESTORE = "restore"
+
+# Margen al comparar con la marca de agua: cubre transacciones que
+# confirmaron justo después de tomarla. Repetir filas es inocuo al restaurar.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+# Valores por defecto de la política de una configuración
+DEFAULT_FULL_EVERY = 6
+DEFAULT_INTERVAL_HOURS = 24
+DEFAULT_KEEP_FULL = 7
+
+# Tablas incluidas, en orden de dependencias (las referenciadas primero)
+BACKUP_TABLES = [
+    User.__table__,
+    Tool.__table__,
+    BackupConfig.__table__,
+    Rental.__table__,
+    Rating.__table__,
+    AdminLog.__table__,
+]
+
+# Tablas que sustituye la restauración. Las configuraciones de copia, como
+# los manifiestos, describen las copias que siguen en disco y se conservan
+RESTORE_TABLES = [table for table in BACKUP_TABLES if table is not BackupConfig.__table__]
+
+ProgressCallback = Callable[[str, int], None]
+
+
+class BackupFormatError(ValueError):
+    """El archivo no es una copia de seguridad válida"""
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _write_line(stream, data) -> None:
+    stream.write(_encoder.encode(data))
+    stream.write("\n")
+
+
+class _HashingFile:
+    """Archivo de escritura que calcula el SHA-256 de lo que se escribe."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def backup_filename(kind: str = FULL, now: Optional[datetime] = None) -> str:
+    now = now or datetime.utcnow()
+    return f"backup_{now.strftime('%Y%m%d_%H%M%S')}_{now.microsecond // 1000:03d}_{kind}{BACKUP_SUFFIX}"
+
+
+def _changed_rows_filter(table, since: dict):
+    if "updated_at" in table.c:
+        watermark = datetime.fromisoformat(since["watermark_at"]) - WATERMARK_OVERLAP
+        return table.c.updated_at >= watermark
+    return table.c.id > since["max_ids"].get(table.name, 0)
+
+
+def export_backup(
+    engine: Engine,
+    path: str,
+    created_by: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    since: Optional[dict] = None
+) -> Dict:
+    """
+    Exportar las tablas a ``path``
+
+    Args:
+        since: Estado de la copia anterior (``filename``, ``watermark_at``,
+            ``max_ids``, ``tombstone_id``) para una copia incremental;
+            copia completa si es None
+
+    Returns:
+        Nombre y tamaño del archivo, duración, filas exportadas por tabla y
+        el estado que servirá de punto de partida a la siguiente incremental
+    """
+    start = time.perf_counter()
+    batch_size = settings.BACKUP_BATCH_SIZE
+    kind = INCREMENTAL if since else FULL
+    counts: Dict[str, int] = {}
+    partial_path = f"{path}.part"
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    raw = _HashingFile(partial_path)
+    try:
+        with gzip.open(raw, "wt", encoding="utf-8", compresslevel=6) as stream, \
+                engine.connect() as connection:
+            # Marca de agua con el reloj de la base de datos, el mismo que rellena updated_at
+            watermark_at = connection.execute(select(func.now())).scalar()
+            tombstone_id = connection.execute(select(func.max(BackupTombstone.id))).scalar() or 0
+            max_ids = {
+                table.name: connection.execute(select(func.max(table.c.id))).scalar() or 0
+                for table in BACKUP_TABLES if "updated_at" not in table.c
+            }
+
+            _write_line(stream, {"backup": {
+                "version": FORMAT_VERSION,
+                "kind": kind,
+                "parent": since["filename"] if since else None,
+                "created_at": datetime.utcnow().isoformat(),
+                "created_by": created_by,
+            }})
+
+            if since:
+                # Borrados desde la copia anterior, hijas primero
+                for table in reversed(BACKUP_TABLES):
+                    query = select(BackupTombstone.row_id).where(
+                        BackupTombstone.table_name == table.name,
+                        BackupTombstone.id > since["tombstone_id"],
+                        BackupTombstone.id <= tombstone_id
+                    ).order_by(BackupTombstone.id)
+                    result = connection.execution_options(stream_results=True).execute(query)
+                    for batch in result.partitions(batch_size):
+                        _write_line(stream, {"deleted": table.name, "ids": [row[0] for row in batch]})
+
+            for table in BACKUP_TABLES:
+                columns = [column.name for column in table.columns]
+                _write_line(stream, {"table": table.name, "columns": columns})
+
+                query = select(table).order_by(*table.primary_key.columns)
+                if since:
+                    query = query.where(_changed_rows_filter(table, since))
+                result = connection.execution_options(stream_results=True).execute(query)
+                rows = 0
+                for batch in result.partitions(batch_size):
+                    # Un solo write por lote
+                    stream.write("".join(
+                        _encoder.encode([_encode(value) for value in row]) + "\n" for row in batch
+                    ))
+                    rows += len(batch)
+                    metrics.set_gauge(f"backup.progress.{table.name}", rows)
+                    if on_progress:
+                        on_progress(table.name, rows)
+
+                _write_line(stream, {"end": table.name, "rows": rows})
+                counts[table.name] = rows
+                logger.info("Copia de seguridad %s: %s (%d filas)", kind, table.name, rows)
+        raw.close()
+        os.replace(partial_path, path)
+    except Exception:
+        raw.close()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        metrics.increment("backup.errors")
+        raise
+
+    duration_ms = (time.perf_counter() - start) * 1000
+    size = os.path.getsize(path)
+    metrics.increment("backup.runs")
+    metrics.observe("backup.duration_ms", duration_ms)
+    metrics.set_gauge("backup.last_size_bytes", size)
+    return {
+        "filename": os.path.basename(path),
+        "kind": kind,
+        "size": size,
+        "checksum": raw.sha256.hexdigest(),
+        "duration_ms": round(duration_ms, 1),
+        "tables": counts,
+        "state": {
+            "watermark_at": watermark_at.isoformat(),
+            "max_ids": max_ids,
+            "tombstone_id": tombstone_id,
+            "chain_length": since["chain_length"] + 1 if since else 0,
+        },
+    }
+
+
+def backup_policy(config: Optional[BackupConfig]) -> dict:
+    """
+    Política de copias de una configuración, leída de ``config_data`` (JSON):
+
+    - ``mode``: ``"full"`` (por defecto) o ``"incremental"``
+    - ``full_every``: incrementales encadenadas antes de la siguiente completa
+    - ``interval_hours``: horas entre copias programadas
+    - ``keep_full``: copias completas (con sus incrementales) que se conservan
+    """
+    try:
+        data = json.loads(config.config_data) if config and config.config_data else {}
+    except ValueError:
+        logger.warning("config_data no es JSON válido en la configuración %s", config.id)
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    return {
+        "mode": INCREMENTAL if data.get("mode") == INCREMENTAL else FULL,
+        "full_every": int(data.get("full_every", DEFAULT_FULL_EVERY)),
+        "interval_hours": float(data.get("interval_hours", DEFAULT_INTERVAL_HOURS)),
+        "keep_full": max(int(data.get("keep_full", DEFAULT_KEEP_FULL)), 1),
+    }
+
+
+def _chain_tip(db: Session, config_id: Optional[int]) -> Optional[BackupManifest]:
+    """Última copia de la cadena de una configuración, si sigue siendo válida."""
+    latest = db.query(BackupManifest).filter(
+        BackupManifest.config_id == config_id,
+        BackupManifest.kind.in_([FULL, INCREMENTAL])
+    ).order_by(BackupManifest.id.desc()).first()
+    if latest is None:
+        return None
+    # Tras una restauración los datos ya no continúan la cadena anterior
+    restored = db.query(func.max(BackupManifest.id)).filter(BackupManifest.kind == RESTORE).scalar()
+    if restored and restored > latest.id:
+        return None
+    return latest
+
+
+def _prune_tombstones(db: Session) -> None:
+    """Elimina los borrados que ya recogieron las últimas copias de todas las cadenas."""
+    latest_ids = db.query(func.max(BackupManifest.id)).filter(
+        BackupManifest.kind.in_([FULL, INCREMENTAL])
+    ).group_by(BackupManifest.config_id)
+    states = db.query(BackupManifest.state).filter(BackupManifest.id.in_(latest_ids)).all()
+    if states:
+        oldest = min(json.loads(state)["tombstone_id"] for (state,) in states)
+        db.query(BackupTombstone).filter(BackupTombstone.id <= oldest).delete(synchronize_session=False)
+
+
+def run_backup(
+    engine: Engine,
+    config: Optional[BackupConfig] = None,
+    created_by: Optional[str] = None
+) -> Dict:
+    """
+    Generar la siguiente copia de una configuración (o una completa sin
+    configuración) y registrarla en ``backup_manifests``
+    """
+    policy = backup_policy(config)
+    config_id = config.id if config else None
+
+    with Session(bind=engine) as db:
+        parent = None
+        if policy["mode"] == INCREMENTAL:
+            parent = _chain_tip(db, config_id)
+        since = None
+        if parent is not None:
+            since = {"filename": parent.filename, **json.loads(parent.state)}
+            if since["chain_length"] >= policy["full_every"]:
+                parent, since = None, None
+
+        path = os.path.join(settings.BACKUP_DIR, backup_filename(INCREMENTAL if since else FULL))
+        result = export_backup(engine, path, created_by=created_by, since=since)
+
+        db.add(BackupManifest(
+            filename=result["filename"],
+            kind=result["kind"],
+            parent_id=parent.id if parent else None,
+            config_id=config_id,
+            watermark_at=datetime.fromisoformat(result["state"]["watermark_at"]).replace(tzinfo=None),
+            state=json.dumps(result["state"]),
+            tables=json.dumps(result["tables"]),
+            size=result["size"],
+            duration_ms=result["duration_ms"],
+            checksum=result["checksum"],
+            created_by=created_by
+        ))
+        db.flush()
+        _prune_tombstones(db)
+        db.commit()
+
+    result["parent"] = since["filename"] if since else None
+    return result
+
+
+def is_backup_due(db: Session, config: BackupConfig, now: Optional[datetime] = None) -> bool:
+    """Indica si ya pasaron ``interval_hours`` desde la última copia de la configuración."""
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=backup_policy(config)["interval_hours"])
+    recent = db.query(BackupManifest.id).filter(
+        BackupManifest.config_id == config.id,
+        BackupManifest.kind.in_([FULL, INCREMENTAL]),
+        BackupManifest.created_at > cutoff
+    ).first()
+    return recent is None
+
+
+def prune_backups(db: Session, config: BackupConfig) -> int:
+    """
+    Elimina archivos y registros de las copias que exceden la retención: se
+    conservan las ``keep_full`` últimas copias completas con sus incrementales
+
+    Returns:
+        Número de copias eliminadas
+    """
+    keep_full = backup_policy(config)["keep_full"]
+    fulls = db.query(BackupManifest.id).filter(
+        BackupManifest.config_id == config.id, BackupManifest.kind == FULL
+    ).order_by(BackupManifest.id.desc()).offset(keep_full - 1).first()
+    if fulls is None:
+        return 0
+
+    # Las incrementales de una cadena se crean después de su completa y antes
+    # de la siguiente, así que todo lo anterior a la completa más antigua que
+    # se conserva pertenece a cadenas expiradas
+    expired = db.query(BackupManifest).filter(
+        BackupManifest.config_id == config.id,
+        BackupManifest.kind.in_([FULL, INCREMENTAL]),
+        BackupManifest.id < fulls.id
+    ).order_by(BackupManifest.id.desc()).all()
+    for manifest in expired:
+        path = os.path.join(settings.BACKUP_DIR, manifest.filename)
+        if os.path.exists(path):
+            os.remove(path)
+        db.delete(manifest)
+        db.flush()
+    db.commit()
+    return len(expired)
+
+
+def backup_chain(db: Session, filename: str) -> List[str]:
+    """
+    Archivos a restaurar para llegar a ``filename``: su copia completa y las
+    incrementales intermedias, en orden
+    """
+    manifest = db.query(BackupManifest).filter(BackupManifest.filename == filename).first()
+    if manifest is None:
+        # Copias anteriores al registro de copias: solo pueden ser completas
+        return [filename]
+    chain = [manifest.filename]
+    while manifest.parent_id is not None:
+        manifest = db.query(BackupManifest).get(manifest.parent_id)
+        chain.append(manifest.filename)
+    return list(reversed(chain))
+
+
+def _decoder(column):
+    """Función que convierte un valor del archivo al tipo de la columna."""
+    if isinstance(column.type, DateTime):
+        return lambda value: None if value is None else datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return lambda value: None if value is None else date.fromisoformat(value)
+    enum_class = getattr(column.type, "enum_class", None) if isinstance(column.type, Enum) else None
+    if enum_class is not None:
+        return lambda value: None if value is None else enum_class[value]
+    return None
+
+
+def _reset_sequences(connection: Connection) -> None:
+    """En PostgreSQL, continúa las secuencias de id tras insertar ids explícitos."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table in BACKUP_TABLES:
+        if "id" not in table.c:
+            continue
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE(MAX(id), 0) + 1, false) FROM {table.name}"
+        ))
+
+
+def _upsert(connection: Connection, table, batch: list) -> None:
+    """
+    Inserta el lote sustituyendo las filas que ya existan (``ON CONFLICT (id)
+    DO UPDATE``). No borra las filas, así no rompe las claves foráneas de sus hijas.
+    """
+    dialect = connection.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        connection.execute(delete(table).where(table.c.id.in_([row["id"] for row in batch])))
+        connection.execute(table.insert(), batch)
+        return
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(table)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={name: statement.excluded[name] for name in batch[0] if name != "id"}
+    ), batch)
+
+
+def _apply_backup_file(
+    connection: Connection,
+    path: str,
+    first: bool,
+    counts: Dict[str, int],
+    on_progress: Optional[ProgressCallback]
+) -> None:
+    """Aplica un archivo de la cadena dentro de la transacción de ``connection``."""
+    batch_size = settings.BACKUP_BATCH_SIZE
+    tables = {table.name: table for table in RESTORE_TABLES}
+
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        header = json.loads(next(stream, "null") or "null")
+        if not isinstance(header, dict) or header.get("backup", {}).get("version") != FORMAT_VERSION:
+            raise BackupFormatError("Formato de copia de seguridad no soportado")
+        incremental = header["backup"].get("kind") == INCREMENTAL
+        if first and incremental:
+            raise BackupFormatError("La restauración debe empezar por una copia completa")
+
+        if not incremental:
+            # Hijas primero para no violar claves foráneas
+            for table in reversed(RESTORE_TABLES):
+                connection.execute(delete(table))
+
+        table = None
+        columns: list = []
+        decoders: list = []
+        batch: list = []
+        rows = 0
+
+        def flush():
+            nonlocal rows
+            if batch:
+                if incremental:
+                    _upsert(connection, table, batch)
+                else:
+                    connection.execute(table.insert(), batch)
+                rows += len(batch)
+                batch.clear()
+                metrics.set_gauge(f"restore.progress.{table.name}", counts.get(table.name, 0) + rows)
+                if on_progress:
+                    on_progress(table.name, counts.get(table.name, 0) + rows)
+
+        for line in stream:
+            record = json.loads(line)
+            if isinstance(record, list):
+                if table is not None:
+                    batch.append({
+                        name: decode(value) if decode else value
+                        for name, decode, value in zip(columns, decoders, record) if name
+                    })
+                    if len(batch) >= batch_size:
+                        flush()
+            elif "table" in record:
+                # Tablas desconocidas se ignoran; columnas desconocidas también
+                table = tables.get(record["table"])
+                if table is not None:
+                    columns = [name if name in table.c else None for name in record["columns"]]
+                    decoders = [_decoder(table.c[name]) if name else None for name in columns]
+                rows = 0
+            elif "end" in record:
+                if table is not None:
+                    flush()
+                    if rows != record["rows"]:
+                        raise BackupFormatError(f"Copia incompleta en la tabla {table.name}")
+                    counts[table.name] = counts.get(table.name, 0) + rows
+                table = None
+            elif "deleted" in record and record["deleted"] in tables:
+                deleted_table = tables[record["deleted"]]
+                connection.execute(delete(deleted_table).where(deleted_table.c.id.in_(record["ids"])))
+
+
+def restore_backup(
+    engine: Engine,
+    paths: Union[str, List[str]],
+    on_progress: Optional[ProgressCallback] = None
+) -> Dict:
+    """
+    Reemplazar el contenido de las tablas por el de una copia
+
+    Args:
+        paths: Archivo de una copia completa, o la cadena completa seguida de
+            sus incrementales en orden (ver ``backup_chain``)
+
+    Returns:
+        Duración y filas restauradas por tabla
+
+    Raises:
+        BackupFormatError: si algún archivo no tiene el formato esperado
+    """
+    start = time.perf_counter()
+    paths = [paths] if isinstance(paths, str) else paths
+    counts: Dict[str, int] = {}
+
+    with engine.begin() as connection:
+        # Ids de usuario que pueden aparecer en tokens emitidos antes de restaurar
+        user_ids = set(connection.execute(select(User.id)).scalars())
+        # Los resúmenes referencian tools: se borran antes y se recalculan al final
+        connection.execute(delete(ToolRatingSummary.__table__))
+        for index, path in enumerate(paths):
+            _apply_backup_file(connection, path, index == 0, counts, on_progress)
+
+        _reset_sequences(connection)
+        # users se reemplaza sin pasar por el ORM: los tokens emitidos antes
+        # pueden llevar permisos de otra versión o un id que ahora es de otro usuario
+        user_ids.update(connection.execute(select(User.id)).scalars())
+        bump_all_token_versions(connection, user_ids)
+        db = Session(bind=connection)
+        rebuild_rating_summaries(db, commit=False)
+        # Los borrados hechos al restaurar no son cambios que deban copiarse,
+        # y las cadenas anteriores dejan de valer: la próxima copia será completa
+        db.query(BackupTombstone).delete(synchronize_session=False)
+        restored_at = datetime.utcnow()
+        db.add(BackupManifest(
+            filename=f"restore_{restored_at.strftime('%Y%m%d_%H%M%S_%f')}",
+            kind=RESTORE,
+            watermark_at=restored_at,
+            state=json.dumps({"source": os.path.basename(paths[-1])})
+        ))
+        db.flush()
+        db.close()
+
+    user_cache.invalidate()
+    token_versions.clear()
+    duration_ms = (time.perf_counter() - start) * 1000
+    metrics.increment("restore.runs")
+    metrics.observe("restore.duration_ms", duration_ms)
+    return {"duration_ms": round(duration_ms, 1), "tables": counts}
@@ -0,0 +1,95 @@
+"""
+Seguimiento de cambios para las copias de seguridad incrementales.
+
+- Las tablas con ``updated_at`` lo rellenan al insertar y al actualizar, con
+  un índice para encontrar las filas cambiadas desde una marca de agua.
+- Las tablas sin ``updated_at`` (``admin_logs``) solo crecen; se usa su id.
+- Los borrados los registran triggers en ``backup_tombstones``, también los
+  hechos con ``DELETE`` masivos o fuera del ORM.
+"""
+import logging
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from ..database.database import Base
+from ..models.backup_manifest import BackupTombstone
+from .backup import BACKUP_TABLES
+
+logger = logging.getLogger(__name__)
+
+_POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION backup_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO backup_tombstones (table_name, row_id, deleted_at) VALUES (TG_TABLE_NAME, OLD.id, now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Columnas añadidas después de crear la tabla en bases de datos existentes
+_ADDED_COLUMNS = {
+    "tools": ["created_at", "updated_at"],
+    "backup_manifests": ["duration_ms", "checksum"],
+}
+
+
+def _add_missing_columns(connection: Connection, inspector) -> None:
+    for table_name, column_names in _ADDED_COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        table = Base.metadata.tables[table_name]
+        for name in column_names:
+            if name not in existing:
+                column_type = table.c[name].type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+
+
+def _create_tracking(connection: Connection) -> None:
+    """Crea (si no existen) columnas, índices y triggers de seguimiento."""
+    dialect = connection.dialect.name
+    inspector = inspect(connection)
+    if not inspector.has_table(BackupTombstone.__tablename__):
+        return
+    tables = [table for table in BACKUP_TABLES if inspector.has_table(table.name)]
+    _add_missing_columns(connection, inspector)
+
+    for table in tables:
+        if "updated_at" in table.c:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table.name}_updated_at ON {table.name} (updated_at)"
+            ))
+
+    if dialect == "sqlite":
+        for table in tables:
+            connection.execute(text(f"""
+                CREATE TRIGGER IF NOT EXISTS {table.name}_backup_tombstone AFTER DELETE ON {table.name} BEGIN
+                    INSERT INTO backup_tombstones (table_name, row_id, deleted_at)
+                    VALUES ('{table.name}', old.id, CURRENT_TIMESTAMP);
+                END
+            """))
+    elif dialect == "postgresql":
+        connection.execute(text(_POSTGRES_FUNCTION))
+        for table in tables:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {table.name}_backup_tombstone ON {table.name}"))
+            connection.execute(text(
+                f"CREATE TRIGGER {table.name}_backup_tombstone AFTER DELETE ON {table.name} "
+                "FOR EACH ROW EXECUTE FUNCTION backup_record_tombstone()"
+            ))
+    else:
+        logger.warning("Sin triggers de borrado para %s: las copias incrementales no propagan borrados", dialect)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _on_metadata_created(target, connection, **kw):
+    _create_tracking(connection)
+
+
+def ensure_backup_tracking(engine: Engine) -> None:
+    """
+    Crea el seguimiento de cambios en bases de datos existentes.
+
+    Igual que el índice de búsqueda, se llama al iniciar la aplicación porque
+    ``create_all`` no modifica las tablas que ya existían.
+    """
+    with engine.begin() as connection:
+        _create_tracking(connection)
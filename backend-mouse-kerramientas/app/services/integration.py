@@ -1,11 +1,10 @@
-from app.config.database import SessionLocal
+from app.config.database import AsyncSessionLocal
 from app.config.mongodb import get_mongo_db
 from app.models.sql.models import Herramienta
 
 async def actualizar_calificacion_herramienta(herramienta_id: int):
     try:
         db_mongo = get_mongo_db()
-        db_sql = SessionLocal()
         
         # Obtener todas las reseñas de la herramienta desde MongoDB
         resenas_cursor = db_mongo.resenas.find({"herramienta_sql_id": herramienta_id})
@@ -17,13 +16,12 @@ async def actualizar_calificacion_herramienta(herramienta_id: int):
         promedio = suma_calificaciones / total_calificaciones if total_calificaciones > 0 else 0
         
         # Actualizar la herramienta en SQL
-        herramienta = db_sql.query(Herramienta).filter(Herramienta.id == herramienta_id).first()
-        if herramienta:
-            herramienta.calificacion_promedio = round(promedio, 2)
-            herramienta.cantidad_resenas = total_calificaciones
-            db_sql.commit()
-        
-        db_sql.close()
+        async with AsyncSessionLocal() as db_sql:
+            herramienta = await db_sql.get(Herramienta, herramienta_id)
+            if herramienta:
+                herramienta.calificacion_promedio = round(promedio, 2)
+                herramienta.cantidad_resenas = total_calificaciones
+                await db_sql.commit()
         
         return {
             "promedio": round(promedio, 2),
@@ -0,0 +1,77 @@
+"""
+Tareas periódicas de la aplicación.
+"""
+import logging
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..crud import rental as crud_rental
+from ..models.backup_config import BackupConfig
+from .backup import is_backup_due, prune_backups, run_backup
+from .refresh_tokens import prune_revoked_tokens
+from .scheduler import PeriodicJob, Scheduler
+
+logger = logging.getLogger(__name__)
+
+# Arrendamiento de la tarea de copias: debe cubrir la copia más larga
+BACKUP_LEASE_SECONDS = 3600
+
+
+def mark_overdue_rentals(db: Session) -> dict:
+    """Marca como vencidos los alquileres activos cuya fecha de fin ya pasó."""
+    return {"marked_overdue": crud_rental.check_overdue_rentals(db)}
+
+
+def run_scheduled_backups(db: Session) -> dict:
+    """
+    Ejecuta las copias de las configuraciones activas que toca hacer y
+    aplica su política de retención.
+
+    Se ejecuta en el hilo de la tarea, fuera de los workers de la API.
+    """
+    backups = pruned = failed = 0
+    configs = db.query(BackupConfig).filter(BackupConfig.is_active == True).all()
+    for config in configs:
+        if not is_backup_due(db, config):
+            continue
+        try:
+            result = run_backup(db.get_bind(), config, created_by="scheduler")
+        except Exception:
+            failed += 1
+            logger.exception("Error en la copia programada de la configuración %s", config.id)
+            continue
+        backups += 1
+        metrics.set_gauge(f"backup.config.{config.id}.last_duration_ms", result["duration_ms"])
+        metrics.set_gauge(f"backup.config.{config.id}.last_size_bytes", result["size"])
+        pruned += prune_backups(db, config)
+    return {"backups": backups, "pruned": pruned, "failed": failed}
+
+
+def prune_expired_revocations(db: Session) -> dict:
+    """Elimina las revocaciones de refresh tokens que ya han expirado."""
+    return {"pruned": prune_revoked_tokens(db)}
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    """Registra en el planificador las tareas habilitadas en la configuración."""
+    if settings.OVERDUE_SWEEP_INTERVAL_SECONDS > 0:
+        scheduler.add_job(PeriodicJob(
+            "overdue_rentals",
+            settings.OVERDUE_SWEEP_INTERVAL_SECONDS,
+            mark_overdue_rentals
+        ))
+    if settings.BACKUP_CHECK_INTERVAL_SECONDS > 0:
+        scheduler.add_job(PeriodicJob(
+            "scheduled_backups",
+            settings.BACKUP_CHECK_INTERVAL_SECONDS,
+            run_scheduled_backups,
+            lease_seconds=BACKUP_LEASE_SECONDS
+        ))
+    if settings.REVOKED_TOKEN_SWEEP_INTERVAL_SECONDS > 0:
+        scheduler.add_job(PeriodicJob(
+            "revoked_tokens",
+            settings.REVOKED_TOKEN_SWEEP_INTERVAL_SECONDS,
+            prune_expired_revocations
+        ))
@@ -0,0 +1,125 @@
+"""
+Hasheo y verificación de contraseñas fuera del event loop.
+
+bcrypt tarda cientos de milisegundos por operación a propósito. Las rutas de
+autenticación son ``async def``, así que llamarlo directamente bloquearía todas
+las demás peticiones mientras dura. ``password_hasher`` ejecuta esas operaciones
+en un pool de hilos propio de ``PASSWORD_HASH_WORKERS`` hilos (bcrypt libera el
+GIL) y admite como mucho ``PASSWORD_HASH_MAX_PENDING`` operaciones en cola o en
+curso; por encima de ese límite rechaza la petición con ``PasswordHasherBusy``
+en lugar de acumular trabajo, para que una avalancha de logins no retrase el
+resto del tráfico.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.security import get_password_hash, verify_and_update_password, verify_password
+
+
+class PasswordHasherBusy(Exception):
+    """
+    La cola de operaciones de contraseñas está llena
+    """
+
+
+class PasswordHasher:
+    """
+    Pool acotado de hilos para las operaciones de bcrypt
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+            return self._executor
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            pending = self._pending
+        metrics.set_gauge("password_hasher.pending", pending)
+
+    async def _run(self, operation: str, func: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.increment("password_hasher.rejected")
+                raise PasswordHasherBusy("Demasiadas operaciones de contraseña pendientes")
+            self._pending += 1
+            pending = self._pending
+        metrics.set_gauge("password_hasher.pending", pending)
+        metrics.increment(f"password_hasher.{operation}")
+
+        queued_at = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            metrics.observe("password_hasher.wait_ms", (started - queued_at) * 1000)
+            try:
+                return func(*args)
+            finally:
+                metrics.observe(
+                    f"password_hasher.{operation}_ms", (time.perf_counter() - started) * 1000
+                )
+
+        try:
+            future = self._get_executor().submit(task)
+        except BaseException:
+            self._release(None)
+            raise
+        # El contador se libera al terminar el trabajo, aunque el cliente se desconecte antes
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashear una contraseña en el pool
+        """
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verificar una contraseña contra su hash en el pool
+        """
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verificar una contraseña en el pool y obtener su nuevo hash si el coste cambió
+        """
+        return await self._run("verify", verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """
+        Detener el pool esperando a las operaciones en curso
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Instancia global usada por las rutas de autenticación
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
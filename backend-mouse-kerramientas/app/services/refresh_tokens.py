@@ -0,0 +1,179 @@
+"""
+Refresh tokens con rotación y lista de revocados en memoria.
+
+El login devuelve, junto al token de acceso, un refresh token JWT con los
+mismos claims del usuario, un identificador único (``jti``) y una validez de
+``REFRESH_TOKEN_EXPIRE_DAYS`` días. ``POST /api/auth/refresh`` lo cambia por un
+par nuevo sin verificar la contraseña: comprueba la firma, la versión de los
+tokens del usuario y que el ``jti`` no esté revocado, y relee el usuario por
+clave primaria. Los claims nuevos salen de la fila actual del usuario, no del
+token anterior, así que un cambio de permisos o una desactivación se aplican
+en la siguiente rotación aunque no hayan pasado por el ORM.
+
+Cada refresh token se puede usar una sola vez: al rotarlo se guarda su ``jti``
+en ``revoked_tokens``. La inserción por clave primaria garantiza que solo una
+petición lo consume aunque lleguen varias a la vez o a procesos distintos. Si
+se presenta un refresh token ya usado, se considera robado y se invalidan
+todos los tokens del usuario.
+
+Cada proceso guarda en memoria los ``jti`` revocados y aún no expirados y los
+recarga cada ``TOKEN_VERSION_REFRESH_SECONDS`` segundos; las filas expiradas se
+eliminan periódicamente.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Set
+
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.security import REFRESH_TOKEN_TYPE, decode_token
+from ..models.revoked_token import RevokedToken
+from ..models.user import User
+from .token_versions import revoke_user_tokens, token_versions, user_token_claims
+
+# Claims del usuario que debe llevar un refresh token
+USER_CLAIMS = ("uid", "act", "su", "ver")
+
+
+class RefreshTokenError(Exception):
+    """
+    Refresh token inválido, expirado, revocado o ya usado
+    """
+
+
+class RevokedTokenSet:
+    """
+    Copia en memoria de los ``jti`` revocados y aún no expirados
+    """
+
+    def __init__(self, refresh_seconds: float = 5.0):
+        self.refresh_seconds = refresh_seconds
+        self._jtis: Set[str] = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def contains(self, db: Session, jti: str) -> bool:
+        """
+        Comprobar si un ``jti`` está revocado
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.refresh_seconds:
+            self.load(db)
+        return jti in self._jtis
+
+    def load(self, db: Session) -> None:
+        """
+        Recargar los ``jti`` revocados no expirados desde la base de datos
+        """
+        jtis = {
+            jti for (jti,) in db.query(RevokedToken.jti)
+            .filter(RevokedToken.expires_at > datetime.utcnow())
+        }
+        with self._lock:
+            self._jtis = jtis
+            self._loaded_at = time.monotonic()
+        metrics.set_gauge("refresh_tokens.revoked", len(jtis))
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            self._jtis.add(jti)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jtis = set()
+            self._loaded_at = None
+
+
+revoked_tokens = RevokedTokenSet(refresh_seconds=settings.TOKEN_VERSION_REFRESH_SECONDS)
+
+
+def _decode_refresh_token(db: Session, token: str) -> dict:
+    payload = decode_token(token)
+    if (
+        payload is None
+        or payload.get("typ") != REFRESH_TOKEN_TYPE
+        or not payload.get("jti")
+        or any(claim not in payload for claim in USER_CLAIMS)
+    ):
+        raise RefreshTokenError("Invalid refresh token")
+    if payload["ver"] != token_versions.current(db, payload["uid"]):
+        raise RefreshTokenError("Refresh token revoked")
+    return payload
+
+
+def revoke_refresh_token(db: Session, payload: dict) -> bool:
+    """
+    Marcar un refresh token como usado y confirmar la transacción
+
+    Returns:
+        False si ya estaba revocado
+    """
+    try:
+        db.execute(insert(RevokedToken).values(
+            jti=payload["jti"],
+            user_id=payload["uid"],
+            expires_at=datetime.utcfromtimestamp(payload["exp"])
+        ))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        revoked_tokens.add(payload["jti"])
+        return False
+    revoked_tokens.add(payload["jti"])
+    return True
+
+
+def _reject_reuse(db: Session, payload: dict) -> None:
+    revoke_user_tokens(db, payload["uid"])
+    db.commit()
+    metrics.increment("refresh_tokens.reused")
+    raise RefreshTokenError("Refresh token already used")
+
+
+def rotate_refresh_token(db: Session, token: str) -> dict:
+    """
+    Consumir un refresh token para emitir un par nuevo
+
+    Returns:
+        Claims actuales del usuario (``sub`` y ``USER_CLAIMS``) para los tokens nuevos
+
+    Raises:
+        RefreshTokenError: si el token no es válido, ya se había usado o el
+            usuario no existe o está desactivado
+    """
+    payload = _decode_refresh_token(db, token)
+    if revoked_tokens.contains(db, payload["jti"]) or not revoke_refresh_token(db, payload):
+        _reject_reuse(db, payload)
+
+    user = db.get(User, payload["uid"])
+    if user is None or not user.is_active:
+        raise RefreshTokenError("Inactive or unknown user")
+    claims = user_token_claims(db, user)
+    db.commit()
+    metrics.increment("refresh_tokens.rotated")
+    return {"sub": user.username, **claims}
+
+
+def logout_refresh_token(db: Session, token: str) -> None:
+    """
+    Revocar un refresh token (logout)
+    """
+    payload = _decode_refresh_token(db, token)
+    revoke_refresh_token(db, payload)
+
+
+def prune_revoked_tokens(db: Session) -> int:
+    """
+    Eliminar las revocaciones de tokens ya expirados
+
+    Returns:
+        Número de filas eliminadas
+    """
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
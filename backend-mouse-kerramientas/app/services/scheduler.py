@@ -0,0 +1,182 @@
+"""
+Planificador de tareas periódicas dentro del proceso.
+
+Cada tarea se ejecuta en un hilo propio. Antes de cada ejecución se renueva
+un arrendamiento en la tabla ``scheduler_locks``; solo el proceso que lo
+posee ejecuta la tarea, de modo que con varios workers (o varias réplicas
+sobre la misma base de datos) cada tarea corre en un único proceso. Si ese
+proceso termina, otro toma el arrendamiento cuando expira.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.metrics import metrics
+from ..database.database import SessionLocal
+from ..models.scheduler_lock import SchedulerLock
+
+logger = logging.getLogger(__name__)
+
+# Identificador de este proceso como propietario de los arrendamientos
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(db: Session, name: str, ttl_seconds: float, owner: str = WORKER_ID) -> bool:
+    """
+    Adquirir o renovar el arrendamiento de una tarea
+
+    Returns:
+        True si este proceso posee el arrendamiento hasta ``now + ttl_seconds``
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    updated = db.query(SchedulerLock).filter(
+        SchedulerLock.name == name,
+        or_(SchedulerLock.owner == owner, SchedulerLock.expires_at < now)
+    ).update({"owner": owner, "expires_at": expires_at}, synchronize_session=False)
+
+    if not updated:
+        if db.query(SchedulerLock.name).filter(SchedulerLock.name == name).first():
+            db.rollback()
+            return False
+        db.add(SchedulerLock(name=name, owner=owner, expires_at=expires_at))
+        try:
+            db.flush()
+        except IntegrityError:
+            # Otro proceso creó el arrendamiento al mismo tiempo
+            db.rollback()
+            return False
+
+    db.commit()
+    return True
+
+
+def release_lease(db: Session, name: str, owner: str = WORKER_ID) -> None:
+    """
+    Liberar el arrendamiento de una tarea si pertenece a este proceso
+    """
+    db.query(SchedulerLock).filter(
+        SchedulerLock.name == name, SchedulerLock.owner == owner
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+class PeriodicJob:
+    """
+    Tarea que se ejecuta cada ``interval`` segundos en un hilo en segundo plano
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[Session], Optional[dict]],
+        lease_seconds: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        # El arrendamiento dura más que el intervalo para que el propietario lo renueve a tiempo
+        self.lease_seconds = lease_seconds or max(interval * 2, 60)
+        self.session_factory = session_factory
+        self.last_run: Optional[datetime] = None
+        self.last_result: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Iniciar el hilo de la tarea
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Detener el hilo y liberar el arrendamiento
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        db = self.session_factory()
+        try:
+            release_lease(db, self.name)
+        except Exception:
+            logger.exception("No se pudo liberar el arrendamiento de %s", self.name)
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self) -> Optional[dict]:
+        """
+        Ejecutar la tarea si este proceso posee el arrendamiento
+
+        Returns:
+            El resultado de la tarea, o None si no se ejecutó
+        """
+        db = self.session_factory()
+        try:
+            if not acquire_lease(db, self.name, self.lease_seconds):
+                metrics.increment(f"jobs.{self.name}.skipped")
+                return None
+
+            start = time.perf_counter()
+            result = self.func(db)
+            metrics.observe(f"jobs.{self.name}.duration_ms", (time.perf_counter() - start) * 1000)
+            metrics.increment(f"jobs.{self.name}.runs")
+            for key, value in (result or {}).items():
+                if isinstance(value, (int, float)):
+                    metrics.increment(f"jobs.{self.name}.{key}", value)
+
+            self.last_run = datetime.utcnow()
+            self.last_result = result
+            return result
+        except Exception:
+            db.rollback()
+            metrics.increment(f"jobs.{self.name}.errors")
+            logger.exception("Error ejecutando la tarea %s", self.name)
+            return None
+        finally:
+            db.close()
+
+
+class Scheduler:
+    """
+    Conjunto de tareas periódicas que se inician y detienen con la aplicación
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+
+    def add_job(self, job: PeriodicJob) -> PeriodicJob:
+        self.jobs[job.name] = job
+        return job
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            job.start()
+
+    def shutdown(self) -> None:
+        for job in self.jobs.values():
+            job.stop()
+
+
+# Instancia global del planificador
+scheduler = Scheduler()
@@ -0,0 +1,167 @@
+"""
+Versiones de token en memoria para autorizar sin consultar ``users``.
+
+Los tokens de acceso con claims llevan el id del usuario, si está activo, si es
+administrador y la versión de sus tokens (``ver``). Un token solo es válido si
+su versión coincide con la de la tabla ``token_versions``, de la que cada
+proceso guarda una copia en memoria que se recarga entera cada
+``TOKEN_VERSION_REFRESH_SECONDS`` segundos (solo tiene filas para los usuarios
+cuyos tokens se han invalidado, así que es pequeña).
+
+La versión de un usuario se incrementa en la misma transacción en la que cambia
+alguno de los datos que van en el token (username, ``is_active``,
+``is_superuser``) o se elimina, de modo que sus tokens anteriores dejan de
+valer: al momento en este proceso y, como mucho, tras la siguiente recarga en
+los demás.
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..models.token_version import TokenVersion
+from ..models.user import User
+
+_PENDING_KEY = "token_versions_pending"
+# Atributos que viajan en el token: si cambian, los tokens emitidos quedan obsoletos
+_CLAIM_ATTRIBUTES = ("username", "is_active", "is_superuser")
+
+
+class TokenVersionRegistry:
+    """
+    Copia en memoria de la tabla ``token_versions``
+    """
+
+    def __init__(self, refresh_seconds: float = 5.0):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def current(self, db: Session, user_id: int) -> int:
+        """
+        Versión vigente de los tokens de un usuario
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.refresh_seconds:
+            self.load(db)
+        return self._versions.get(user_id, 0)
+
+    def load(self, db: Session) -> None:
+        """
+        Recargar todas las versiones desde la base de datos
+        """
+        versions = dict(db.query(TokenVersion.user_id, TokenVersion.version).all())
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+        metrics.increment("token_versions.reloads")
+        metrics.set_gauge("token_versions.size", len(versions))
+
+    def set(self, user_id: int, version: int) -> None:
+        """
+        Actualizar la versión de un usuario tras confirmar el cambio
+        """
+        with self._lock:
+            if version > self._versions.get(user_id, 0):
+                self._versions = {**self._versions, user_id: version}
+
+    def clear(self) -> None:
+        """
+        Olvidar las versiones cargadas (se recargan en la siguiente consulta)
+        """
+        with self._lock:
+            self._versions = {}
+            self._loaded_at = None
+
+
+token_versions = TokenVersionRegistry(refresh_seconds=settings.TOKEN_VERSION_REFRESH_SECONDS)
+
+
+def user_token_claims(db: Session, user: User) -> dict:
+    """
+    Claims del usuario para sus tokens: id, estado y versión vigente
+    """
+    # Al emitir se lee la versión de la base de datos, no de la copia en memoria,
+    # para no firmar un token con una versión ya superada en otro proceso
+    version = db.query(TokenVersion.version).filter(TokenVersion.user_id == user.id).scalar() or 0
+    token_versions.set(user.id, version)
+    return {
+        "uid": user.id,
+        "act": bool(user.is_active),
+        "su": bool(user.is_superuser),
+        "ver": version
+    }
+
+
+def bump_token_version(connection: Connection, user_id: int) -> int:
+    """
+    Incrementar la versión de los tokens de un usuario
+
+    Returns:
+        Nueva versión
+    """
+    result = connection.execute(
+        update(TokenVersion)
+        .where(TokenVersion.user_id == user_id)
+        .values(version=TokenVersion.version + 1)
+        .returning(TokenVersion.version)
+    ).first()
+    if result is not None:
+        return result[0]
+    connection.execute(insert(TokenVersion).values(user_id=user_id, version=1))
+    return 1
+
+
+def bump_all_token_versions(connection: Connection, user_ids: Iterable[int]) -> None:
+    """
+    Invalidar los tokens de todos los usuarios con fila en ``token_versions`` y
+    de ``user_ids``, para cambios masivos de ``users`` que no pasan por el ORM
+    (restauración de copias de seguridad)
+    """
+    connection.execute(update(TokenVersion).values(version=TokenVersion.version + 1))
+    existing = set(connection.execute(select(TokenVersion.user_id)).scalars())
+    missing = [{"user_id": user_id, "version": 1} for user_id in set(user_ids) - existing]
+    if missing:
+        connection.execute(insert(TokenVersion), missing)
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """
+    Invalidar todos los tokens emitidos para un usuario. La nueva versión se
+    aplica en memoria al confirmar la transacción.
+
+    Returns:
+        Nueva versión
+    """
+    version = bump_token_version(db.connection(), user_id)
+    db.info.setdefault(_PENDING_KEY, {})[user_id] = version
+    return version
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_users(session, flush_context):
+    for instance in (*session.dirty, *session.deleted):
+        if not isinstance(instance, User) or instance.id is None:
+            continue
+        state = inspect(instance)
+        if instance in session.deleted or any(
+            state.attrs[name].history.has_changes() for name in _CLAIM_ATTRIBUTES
+        ):
+            revoke_user_tokens(session, instance.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session):
+    for user_id, version in session.info.pop(_PENDING_KEY, {}).items():
+        token_versions.set(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,181 @@
+"""
+Índice de búsqueda de texto completo para herramientas.
+
+En SQLite se usa una tabla virtual FTS5 (``tools_fts``) de contenido externo
+sincronizada con ``tools`` mediante triggers; en PostgreSQL una columna
+``tsvector`` generada con índice GIN. En ambos casos el índice se mantiene
+dentro de la misma transacción que crea, actualiza o elimina la herramienta.
+"""
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import column, event, func, inspect, literal_column, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query
+
+from ..models.tool import Tool
+
+FTS_TABLE = "tools_fts"
+
+# Pesos de relevancia por columna: name, description, brand, model
+_BM25_WEIGHTS = (10.0, 1.0, 5.0, 5.0)
+
+_SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, brand, model,
+        content='tools', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tools_fts_ai AFTER INSERT ON tools BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, brand, model)
+        VALUES (new.id, new.name, new.description, new.brand, new.model);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tools_fts_ad AFTER DELETE ON tools BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, brand, model)
+        VALUES ('delete', old.id, old.name, old.description, old.brand, old.model);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tools_fts_au AFTER UPDATE OF name, description, brand, model ON tools BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, brand, model)
+        VALUES ('delete', old.id, old.name, old.description, old.brand, old.model);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, brand, model)
+        VALUES (new.id, new.name, new.description, new.brand, new.model);
+    END
+    """,
+]
+
+_POSTGRES_CREATE = [
+    """
+    ALTER TABLE tools ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(brand, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(model, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tools_search_vector ON tools USING GIN (search_vector)",
+]
+
+# Motores en los que el índice ya fue verificado o creado
+_indexed_engines = set()
+
+
+def _tokens(q: str) -> list:
+    """Extrae los términos de búsqueda descartando la sintaxis propia de FTS."""
+    return re.findall(r"\w+", q.lower(), re.UNICODE)
+
+
+def _create_index(connection: Connection) -> None:
+    """Crea (si no existe) el índice correspondiente al dialecto de la conexión."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+        for statement in _SQLITE_CREATE:
+            connection.execute(text(statement))
+        if not exists:
+            # Indexar las filas que ya existían antes de crear la tabla FTS
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_CREATE:
+            connection.execute(text(statement))
+    else:
+        return
+    _indexed_engines.add(connection.engine)
+
+
+def _drop_index(connection: Connection) -> None:
+    """Elimina la tabla FTS de SQLite junto con la tabla ``tools``."""
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _indexed_engines.discard(connection.engine)
+
+
+@event.listens_for(Tool.__table__, "after_create")
+def _on_tools_created(target, connection, **kw):
+    _create_index(connection)
+
+
+@event.listens_for(Tool.__table__, "before_drop")
+def _on_tools_dropped(target, connection, **kw):
+    _drop_index(connection)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Crea el índice de búsqueda en bases de datos existentes.
+
+    ``create_all`` no vuelve a emitir ``after_create`` si la tabla ``tools``
+    ya existe, por lo que se llama también al iniciar la aplicación.
+    """
+    if not inspect(engine).has_table(Tool.__tablename__):
+        return
+    with engine.begin() as connection:
+        _create_index(connection)
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """Reconstruye por completo el índice de búsqueda a partir de ``tools``."""
+    with engine.begin() as connection:
+        if connection.dialect.name == "sqlite":
+            _create_index(connection)
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif connection.dialect.name == "postgresql":
+            _create_index(connection)
+            connection.execute(text("REINDEX INDEX ix_tools_search_vector"))
+
+
+def apply_text_search(query: Query, q: str) -> Tuple[Query, Optional[object]]:
+    """
+    Aplica la búsqueda de texto completo a una consulta sobre ``Tool``.
+
+    Cada término se busca como prefijo (búsqueda mientras se escribe) y todos
+    deben aparecer en alguno de los campos indexados.
+
+    Returns:
+        La consulta filtrada y la expresión de relevancia; valores menores de la
+        expresión indican mayor relevancia. Si el motor no tiene índice se recurre
+        a ILIKE y la expresión es None.
+    """
+    tokens = _tokens(q)
+    if not tokens:
+        return query, None
+
+    bind = query.session.get_bind()
+    engine = bind.engine if hasattr(bind, "engine") else bind
+    dialect = engine.dialect.name
+
+    if dialect == "sqlite" and engine in _indexed_engines:
+        match = " ".join(f'"{token}"*' for token in tokens)
+        fts = table(FTS_TABLE, column("rowid"))
+        fts_column = literal_column(FTS_TABLE)
+        query = (
+            query.join(fts, fts.c.rowid == Tool.id)
+            .filter(fts_column.op("MATCH")(match))
+        )
+        return query, func.bm25(fts_column, *_BM25_WEIGHTS)
+
+    if dialect == "postgresql" and engine in _indexed_engines:
+        tsquery = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+        vector = literal_column("tools.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))
+        return query, -func.ts_rank(vector, tsquery)
+
+    for token in tokens:
+        pattern = f"%{token}%"
+        query = query.filter(
+            Tool.name.ilike(pattern)
+            | Tool.description.ilike(pattern)
+            | Tool.brand.ilike(pattern)
+            | Tool.model.ilike(pattern)
+        )
+    return query, None
@@ -0,0 +1,72 @@
+"""
+Caché del usuario autenticado.
+
+``get_current_user`` se ejecuta en cada petición autenticada. En lugar de
+consultar ``users`` cada vez, guarda los datos del usuario (por el ``sub`` del
+token, es decir, su username) durante ``AUTH_USER_CACHE_SECONDS`` y en los
+aciertos devuelve una instancia desvinculada de la sesión construida con ellos.
+
+La entrada de un usuario se invalida al confirmar cualquier transacción que lo
+modifique o elimine (``crud_user.update_user``, desactivaciones, cambios de
+contraseña...). Con varios workers, el cambio hecho en otro proceso se ve como
+mucho ``AUTH_USER_CACHE_SECONDS`` después.
+"""
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..crud import user as crud_user
+from ..models.user import User
+
+_STALE_KEY = "auth_user_cache_stale"
+_COLUMNS = [column.key for column in User.__table__.columns]
+
+user_cache = TTLCache(ttl=settings.AUTH_USER_CACHE_SECONDS, maxsize=settings.AUTH_USER_CACHE_SIZE)
+
+
+def _detached_user(data: dict) -> User:
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+def get_cached_user(db: Session, username: str) -> Optional[User]:
+    """
+    Obtener el usuario por username desde la caché o la base de datos
+    """
+    data = user_cache.get(username)
+    if data is not None:
+        metrics.increment("auth_user_cache.hits")
+        return _detached_user(data)
+
+    metrics.increment("auth_user_cache.misses")
+    user = crud_user.get_user_by_username(db, username=username)
+    if user is not None:
+        user_cache.set(username, {key: getattr(user, key) for key in _COLUMNS})
+    return user
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_users(session, flush_context):
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            stale = session.info.setdefault(_STALE_KEY, set())
+            # Username actual y, si ha cambiado, el anterior
+            history = inspect(instance).attrs.username.history
+            stale.update(history.deleted or ())
+            stale.add(instance.username)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for username in session.info.pop(_STALE_KEY, ()):
+        user_cache.invalidate(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_stale_users(session):
+    session.info.pop(_STALE_KEY, None)
@@ -0,0 +1,111 @@
+"""
+Benchmark de transacciones por escritura de administración sobre herramientas.
+
+Compara el flujo anterior (commit de la herramienta, refresh y commit aparte
+de la entrada de auditoría) con ``crud_tool.create_tool`` / ``update_tool``,
+que guardan ambos en un único commit. En SQLite cada commit es un fsync del
+journal, así que el número de commits es el número de fsyncs.
+"""
+import sys
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import admin as crud_admin, tool as crud_tool
+from app.database.database import Base
+from app.models.admin_log import AdminLog  # noqa: F401 (crea la tabla admin_logs)
+from app.models.rating import Rating  # noqa: F401 (necesario para las relaciones de User)
+from app.models.rental import Rental  # noqa: F401 (necesario para las relaciones de Tool)
+from app.models.tool import Tool
+from app.models.user import User
+from app.schemas.admin import AdminLogCreate
+from app.schemas.tool import ToolCreate, ToolUpdate
+
+OPERATIONS = 200
+
+
+def legacy_write(db, admin, number):
+    """Flujo anterior: dos transacciones y un refresh por operación."""
+    db_tool = Tool(**tool_data(number).dict())
+    db.add(db_tool)
+    db.commit()
+    db.refresh(db_tool)
+    log = AdminLogCreate(action="CREATE", resource="tool", resource_id=str(db_tool.id),
+                         details=f"Created tool: {db_tool.name}")
+    crud_admin.create_admin_log(db, log, admin_id=admin.id, admin_username=admin.username)
+
+    setattr(db_tool, "daily_price", 20.0)
+    db.commit()
+    db.refresh(db_tool)
+    log = AdminLogCreate(action="UPDATE", resource="tool", resource_id=str(db_tool.id),
+                         details=f"Updated tool: {db_tool.name}")
+    crud_admin.create_admin_log(db, log, admin_id=admin.id, admin_username=admin.username)
+
+
+def unit_of_work_write(db, admin, number):
+    """Flujo actual: herramienta y auditoría en un único commit."""
+    created = crud_tool.create_tool(db, tool_data(number), admin=admin)
+    crud_tool.update_tool(db, created["id"], ToolUpdate(daily_price=20.0), admin=admin)
+
+
+def tool_data(number: int) -> ToolCreate:
+    return ToolCreate(name=f"Taladro {number}", description="Taladro de prueba", brand="DeWalt",
+                      model="DCD777", category="Eléctricas", daily_price=25.0)
+
+
+def measure(path: str, write) -> tuple:
+    """Ejecuta OPERATIONS altas y modificaciones y devuelve (commits, consultas, milisegundos)."""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = session_factory()
+    admin = User(email="admin@example.com", username="admin", hashed_password="x",
+                 full_name="Administrador", is_superuser=True)
+    db.add(admin)
+    db.commit()
+    admin_id, admin_username = admin.id, admin.username
+    db.close()
+
+    counts = {"commits": 0, "statements": 0}
+
+    def on_commit(conn):
+        counts["commits"] += 1
+
+    def on_execute(*args, **kwargs):
+        counts["statements"] += 1
+
+    event.listen(engine, "commit", on_commit)
+    event.listen(engine, "before_cursor_execute", on_execute)
+    db = session_factory()
+    # Datos del administrador sin vincular a la sesión, como en una petición
+    admin = SimpleNamespace(id=admin_id, username=admin_username)
+    start = time.perf_counter()
+    for number in range(OPERATIONS):
+        write(db, admin, number)
+    elapsed = (time.perf_counter() - start) * 1000
+    db.close()
+    engine.dispose()
+    return counts["commits"], counts["statements"], elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            "anterior": measure(os.path.join(directory, "legacy.db"), legacy_write),
+            "unidad de trabajo": measure(os.path.join(directory, "uow.db"), unit_of_work_write),
+        }
+
+    print(f"{OPERATIONS} altas + {OPERATIONS} modificaciones")
+    print(f"{'flujo':>18} {'commits':>9} {'consultas':>10} {'ms':>9}")
+    for name, (commits, statements, elapsed) in results.items():
+        print(f"{name:>18} {commits:>9} {statements:>10} {elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark de handlers async con sesión síncrona frente a sesión asíncrona.
+
+Lanza ``STATS_REQUESTS`` peticiones a un endpoint que calcula las
+estadísticas del panel de administración (sin caché) con ``CONCURRENCY``
+clientes simultáneos. A la vez, un cliente consulta un endpoint ``/health`` sin
+base de datos cada ``PROBE_INTERVAL`` segundos. Con la sesión síncrona las
+consultas bloquean el event loop y ``/health`` espera a que terminen; con
+``get_async_db`` (aiosqlite) el event loop sigue atendiendo peticiones.
+"""
+import sys
+import os
+import asyncio
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database.database import Base, async_database_url
+from app.models.rating import Rating  # noqa: F401 (necesario para las relaciones de User)
+from app.models.rental import Rental  # noqa: F401 (necesario para las relaciones de Tool)
+from app.models.tool import Tool
+from app.models.user import User
+from app.services.admin_dashboard import compute_tool_stats, compute_user_stats
+
+TOOLS = 100000
+USERS = 20000
+STATS_REQUESTS = 40
+CONCURRENCY = 8
+PROBE_INTERVAL = 0.01
+
+
+def dashboard_stats(db: Session) -> dict:
+    return {"tools": compute_tool_stats(db).total_tools, "users": compute_user_stats(db).total_users}
+
+
+def build_app(url: str) -> FastAPI:
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(async_database_url(url))
+    async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/sync")
+    async def sync_stats(db: Session = Depends(get_db)):
+        # Flujo anterior: sesión síncrona dentro de un handler async
+        return dashboard_stats(db)
+
+    @app.get("/async")
+    async def async_stats(db: AsyncSession = Depends(get_async_db)):
+        return await db.run_sync(dashboard_stats)
+
+    return app
+
+
+async def measure(app: FastAPI, path: str) -> tuple:
+    """Devuelve (estadísticas por segundo, /health por segundo, p50 y p99 de /health en ms)."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    probes = []
+    done = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def stats():
+            async with semaphore:
+                (await client.get(path)).raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probes.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(stats() for _ in range(STATS_REQUESTS)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    percentiles = statistics.quantiles(probes, n=100)
+    return STATS_REQUESTS / elapsed, len(probes) / elapsed, percentiles[49], percentiles[98]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'async.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(insert(Tool), [
+                {"name": f"Herramienta {number}", "category": f"Categoría {number % 12}",
+                 "daily_price": 10.0, "is_available": number % 3 != 0}
+                for number in range(TOOLS)
+            ])
+            connection.execute(insert(User), [
+                {"email": f"user{number}@example.com", "username": f"user{number}",
+                 "hashed_password": "x", "is_active": number % 10 != 0}
+                for number in range(USERS)
+            ])
+        engine.dispose()
+
+        app = build_app(url)
+        print(f"{STATS_REQUESTS} peticiones de estadísticas, {CONCURRENCY} clientes "
+              f"({TOOLS} herramientas, {USERS} usuarios)")
+        print(f"{'sesión':>8} {'stats/s':>9} {'health/s':>9} {'health p50':>11} {'health p99':>11}")
+        for name, path in (("síncrona", "/sync"), ("async", "/async")):
+            throughput, health, p50, p99 = asyncio.run(measure(app, path))
+            print(f"{name:>8} {throughput:>9.1f} {health:>9.1f} {p50:>9.1f}ms {p99:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark de latencia de login según el coste de bcrypt.
+
+Para cada coste lanza ``LOGINS`` peticiones a ``POST /api/auth/login-json`` con
+``CONCURRENCY`` clientes simultáneos y muestra la latencia p50/p99 y los logins
+por segundo que admite el pool de ``PASSWORD_HASH_WORKERS`` hilos. Sirve para
+elegir ``BCRYPT_ROUNDS`` y dimensionar la capacidad de autenticación.
+
+Uso:
+    python scripts/benchmark_login_latency.py [coste ...]   (por defecto 10 11 12 13)
+"""
+import sys
+import os
+import asyncio
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import security
+from app.core.config import settings
+from app.database.database import Base, get_db
+from app.models.rating import Rating  # noqa: F401 (necesario para las relaciones de User)
+from app.models.rental import Rental  # noqa: F401 (necesario para las relaciones de User)
+from app.models.user import User
+from app.routes import auth
+from app.services.password_hasher import password_hasher
+
+LOGINS = 64
+CONCURRENCY = 16
+PASSWORD = "benchmark-password"
+
+
+async def measure(app: FastAPI, rounds: int) -> tuple:
+    """Devuelve (p50 ms, p99 ms, logins por segundo) para un coste."""
+    # El contexto fija el coste exacto, así que los logins no rehashean
+    security.pwd_context = security.pwd_context.copy(
+        bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds
+    )
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def login(client: httpx.AsyncClient, number: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/auth/login-json",
+                json={"username": f"bench{rounds}_{number % 8}", "password": PASSWORD}
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(login(client, number) for number in range(LOGINS)))
+        elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return percentiles[49], percentiles[98], LOGINS / elapsed
+
+
+def main():
+    levels = [int(level) for level in sys.argv[1:]] or [10, 11, 12, 13]
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'login.db')}",
+            connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = session_factory()
+        for rounds in levels:
+            hashed_password = security.pwd_context.hash(PASSWORD, rounds=rounds)
+            for number in range(8):
+                db.add(User(email=f"bench{rounds}_{number}@example.com",
+                            username=f"bench{rounds}_{number}", hashed_password=hashed_password))
+        db.commit()
+        db.close()
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(auth.router, prefix="/api/auth")
+        app.dependency_overrides[get_db] = override_get_db
+
+        print(f"{LOGINS} logins, {CONCURRENCY} clientes, {settings.PASSWORD_HASH_WORKERS} hilos de bcrypt")
+        print(f"{'coste':>6} {'p50 ms':>9} {'p99 ms':>9} {'logins/s':>9}")
+        for rounds in levels:
+            p50, p99, throughput = asyncio.run(measure(app, rounds))
+            print(f"{rounds:>6} {p50:>9.1f} {p99:>9.1f} {throughput:>9.1f}")
+
+        password_hasher.shutdown()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
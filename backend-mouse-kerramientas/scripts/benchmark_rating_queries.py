@@ -0,0 +1,93 @@
+"""
+Benchmark del número de consultas al listar las calificaciones de una herramienta.
+
+Compara la carga perezosa de ``rating.user`` (una consulta por calificación)
+con la consulta unida de ``crud_rating.get_ratings_with_user_by_tool`` para
+distintos tamaños de página, sobre una base SQLite en memoria.
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud import rating as crud_rating
+from app.database.database import Base
+from app.models.rating import Rating
+from app.models.rental import Rental  # noqa: F401 (necesario para las relaciones de Tool y User)
+from app.models.tool import Tool
+from app.models.user import User
+
+PAGE_SIZES = [10, 100, 1000]
+
+
+def seed(db, total_ratings: int) -> int:
+    """Crea una herramienta con ``total_ratings`` calificaciones de usuarios distintos."""
+    tool = Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                model="DCD777", category="Eléctricas", daily_price=25.0)
+    db.add(tool)
+    db.flush()
+    for i in range(total_ratings):
+        user = User(email=f"user{i}@example.com", username=f"user{i}",
+                    hashed_password="x", full_name=f"Usuario {i}")
+        db.add(user)
+        db.flush()
+        db.add(Rating(tool_id=tool.id, user_id=user.id, rating=1 + i % 5, comment="ok"))
+    db.commit()
+    return tool.id
+
+
+def lazy_listing(db, tool_id: int, limit: int) -> list:
+    """Listado anterior: carga perezosa del usuario de cada calificación."""
+    ratings = crud_rating.get_ratings_by_tool(db, tool_id=tool_id, limit=limit)
+    return [(rating.id, rating.user.username, rating.user.full_name) for rating in ratings]
+
+
+def joined_listing(db, tool_id: int, limit: int) -> list:
+    """Listado con la consulta unida."""
+    ratings = crud_rating.get_ratings_with_user_by_tool(db, tool_id=tool_id, limit=limit)
+    return [(r["id"], r["user_username"], r["user_full_name"]) for r in ratings]
+
+
+def measure(session_factory, engine, listing, tool_id: int, limit: int):
+    """Ejecuta un listado con una sesión nueva y devuelve (consultas, milisegundos)."""
+    statements = []
+
+    def count(*args, **kwargs):
+        statements.append(1)
+
+    db = session_factory()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        listing(db, tool_id, limit)
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        db.close()
+    return len(statements), elapsed
+
+
+def main():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = session_factory()
+    tool_id = seed(db, max(PAGE_SIZES))
+    db.close()
+
+    print(f"{'página':>8} {'perezosa (consultas)':>22} {'unida (consultas)':>19} {'perezosa (ms)':>15} {'unida (ms)':>12}")
+    for limit in PAGE_SIZES:
+        lazy_queries, lazy_ms = measure(session_factory, engine, lazy_listing, tool_id, limit)
+        joined_queries, joined_ms = measure(session_factory, engine, joined_listing, tool_id, limit)
+        print(f"{limit:>8} {lazy_queries:>22} {joined_queries:>19} {lazy_ms:>15.1f} {joined_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark de lecturas concurrentes con escrituras en SQLite.
+
+Durante ``DURATION`` segundos, ``READERS`` hilos (como el threadpool de
+FastAPI en los GET) buscan herramientas por categoría y un hilo escritor
+actualiza herramientas, con una transacción por operación. Se compara SQLite
+sin configurar (journal por defecto, un solo pool) con el perfil de producción
+(``SQLITE_PRODUCTION_PROFILE``: WAL, pragmas y pool de solo lectura). Sin WAL
+las lecturas esperan a que termine cada escritura.
+"""
+import sys
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import exc, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud import tool as crud_tool
+from app.database.database import Base
+from app.database.engines import EngineRegistry
+from app.models.rating import Rating  # noqa: F401 (necesario para las relaciones de User)
+from app.models.rental import Rental  # noqa: F401 (necesario para las relaciones de Tool)
+from app.models.tool import Tool
+from app.models.user import User  # noqa: F401 (necesario para las relaciones de Rental)
+
+TOOLS = 50000
+CATEGORIES = 12
+READERS = 8
+DURATION = 5.0
+WRITE_ROWS = 5000
+
+
+def prepare(url: str) -> None:
+    registry = EngineRegistry()
+    registry.register("bench", url)
+    engine = registry.engine("bench")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Tool), [
+            {"name": f"Herramienta {number}", "category": f"Categoría {number % CATEGORIES}",
+             "daily_price": 10.0, "is_available": True}
+            for number in range(TOOLS)
+        ])
+    registry.dispose()
+
+
+def run(url: str, profile: bool) -> dict:
+    settings.SQLITE_PRODUCTION_PROFILE = profile
+    settings.DB_POOL_SIZE = READERS + 1
+    registry = EngineRegistry()
+    registry.register("bench", url)
+    WriteSession = sessionmaker(autocommit=False, autoflush=False, bind=registry.engine("bench"))
+    ReadSession = sessionmaker(autocommit=False, autoflush=False, bind=registry.read_engine("bench"))
+
+    stop = threading.Event()
+    latencies, writes, errors = [], [0], [0]
+    lock = threading.Lock()
+
+    def reader(seed: int):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with ReadSession() as db:
+                    crud_tool.search_tools(db, category=f"Categoría {rng.randrange(CATEGORIES)}", limit=50)
+            except exc.OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    def writer():
+        rng = random.Random(0)
+        while not stop.is_set():
+            first = rng.randrange(TOOLS - WRITE_ROWS) + 1
+            try:
+                with WriteSession() as db:
+                    db.query(Tool).filter(Tool.id.between(first, first + WRITE_ROWS)).update(
+                        {"daily_price": rng.uniform(5, 50)}, synchronize_session=False
+                    )
+                    db.commit()
+            except exc.OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(number,)) for number in range(READERS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    registry.dispose()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "reads": len(latencies) / DURATION,
+        "writes": writes[0] / DURATION,
+        "p50": percentiles[49],
+        "p99": percentiles[98],
+        "errors": errors[0],
+    }
+
+
+def main():
+    print(f"{READERS} lectores y 1 escritor durante {DURATION:.0f}s ({TOOLS} herramientas)")
+    print(f"{'perfil':>11} {'lecturas/s':>11} {'escrituras/s':>13} {'p50':>9} {'p99':>9} {'errores':>8}")
+    for name, profile in (("por defecto", False), ("producción", True)):
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'profile.db')}"
+            prepare(url)
+            result = run(url, profile)
+        print(f"{name:>11} {result['reads']:>11.1f} {result['writes']:>13.1f} "
+              f"{result['p50']:>7.1f}ms {result['p99']:>7.1f}ms {result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
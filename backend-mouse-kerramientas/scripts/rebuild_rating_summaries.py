@@ -0,0 +1,35 @@
+"""
+Script para recalcular los resúmenes de calificaciones por herramienta.
+
+Uso:
+    python scripts/rebuild_rating_summaries.py [tool_id]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crud.rating import rebuild_rating_summaries
+from app.database.database import Base, SessionLocal, engine
+from app.models.rating import ToolRatingSummary
+from app.models.rental import Rental  # noqa: F401 (necesario para las relaciones de Tool y User)
+from app.models.tool import Tool  # noqa: F401
+from app.models.user import User  # noqa: F401
+
+
+def main():
+    tool_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    Base.metadata.create_all(bind=engine, tables=[ToolRatingSummary.__table__])
+
+    db = SessionLocal()
+    try:
+        total = rebuild_rating_summaries(db, tool_id=tool_id)
+        print(f"Resúmenes de calificaciones recalculados: {total}")
+    except Exception as e:
+        print(f"Error al recalcular los resúmenes: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Script para reconstruir el índice de búsqueda de texto completo de herramientas.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.database import engine
+from app.services.tool_search import rebuild_search_index
+
+
+if __name__ == "__main__":
+    try:
+        rebuild_search_index(engine)
+        print("Índice de búsqueda reconstruido exitosamente!")
+    except Exception as e:
+        print(f"Error al reconstruir el índice de búsqueda: {e}")
@@ -4,10 +4,13 @@ Configuración de pytest para tests
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.database.database import get_db, Base
+from app.database.database import async_database_url, get_async_db, get_db, get_read_db, Base
+from app.services.scheduler import scheduler
 
 # Base de datos en memoria para tests
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test_temp.db"
@@ -18,6 +21,16 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Motor asíncrono sobre la misma base de datos de test (sin pool: cada
+# TestClient usa su propio event loop)
+async_engine = create_async_engine(
+    async_database_url(SQLALCHEMY_TEST_DATABASE_URL), poolclass=NullPool
+)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 def override_get_db():
     """Override de la función get_db para usar base de datos de test"""
@@ -28,6 +41,12 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Override de la función get_async_db para usar base de datos de test"""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def test_db():
     """Fixture que crea una base de datos limpia para cada test"""
@@ -36,6 +55,8 @@ def test_db():
 
     # Override de la dependencia
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     yield TestingSessionLocal()
 
@@ -47,7 +68,10 @@ def test_db():
 
 
 @pytest.fixture(scope="function")
-def client(test_db):
+def client(test_db, monkeypatch):
     """Fixture del cliente de testing"""
+    # El arranque inicia el planificador global: sus tareas usan la base de datos de test
+    for job in scheduler.jobs.values():
+        monkeypatch.setattr(job, "session_factory", TestingSessionLocal)
     with TestClient(app) as test_client:
         yield test_client
\ No newline at end of file
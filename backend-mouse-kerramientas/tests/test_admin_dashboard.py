@@ -0,0 +1,39 @@
+"""
+Tests para la caché de estadísticas del panel de administración
+"""
+from datetime import datetime, timedelta
+
+from app.crud.rental import check_overdue_rentals
+from app.models.rental import Rental, RentalStatus
+from app.models.user import User
+from app.services.admin_dashboard import dashboard_cache, get_dashboard_stats
+
+
+class TestDashboardCache:
+    """Tests para la invalidación de la caché del panel"""
+
+    def setup_method(self):
+        dashboard_cache.invalidate()
+
+    def test_bulk_update_invalidates_cache(self, test_db):
+        """Test para invalidar la caché con un UPDATE masivo de usuarios"""
+        test_db.add(User(email="user@example.com", username="user", hashed_password="x", is_active=True))
+        test_db.commit()
+        assert get_dashboard_stats(test_db)[1].active_users == 1
+
+        test_db.query(User).update({User.is_active: False}, synchronize_session=False)
+        test_db.commit()
+
+        assert get_dashboard_stats(test_db)[1].active_users == 0
+
+    def test_overdue_sweep_invalidates_cache(self, test_db):
+        """Test para invalidar la caché tras marcar alquileres vencidos"""
+        now = datetime.utcnow()
+        test_db.add(Rental(tool_id=1, user_id=1, start_date=now - timedelta(days=5),
+                           end_date=now - timedelta(days=1), total_price=10.0, status=RentalStatus.ACTIVE))
+        test_db.commit()
+        get_dashboard_stats(test_db)
+        assert len(dashboard_cache) == 1
+
+        assert check_overdue_rentals(test_db) == 1
+        assert len(dashboard_cache) == 0
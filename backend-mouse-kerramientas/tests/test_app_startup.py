@@ -0,0 +1,24 @@
+"""
+Tests de arranque de la aplicación
+"""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestAppStartup:
+    """Tests para la importación de la aplicación en un proceso limpio"""
+
+    def test_import_app_main(self):
+        """app.main se importa sin depender del orden de imports de los tests"""
+        result = subprocess.run(
+            [sys.executable, "-c", "import app.main"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+
+        assert result.returncode == 0, result.stderr
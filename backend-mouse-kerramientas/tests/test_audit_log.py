@@ -0,0 +1,74 @@
+"""
+Tests para la escritura por lotes del registro de auditoría
+"""
+import logging
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.metrics import metrics
+from app.models.admin_log import AdminLog
+from app.schemas.admin import AdminLogCreate
+from app.services.audit_log import AuditLogWriter
+
+
+class TestAuditLogWriter:
+    """Tests para el búfer de entradas de auditoría"""
+
+    def _record(self, writer, db, number):
+        log = AdminLogCreate(action="UPDATE", resource="tool", resource_id=str(number))
+        writer.record(db=db, log=log, admin_id=1, admin_username="admin")
+
+    def test_entries_are_buffered_until_flush(self, test_db):
+        """Test para escribir las entradas en bloque al vaciar el búfer"""
+        writer = AuditLogWriter(batch_size=1000, flush_interval=3600)
+        writer.start()
+        try:
+            for number in range(5):
+                self._record(writer, test_db, number)
+            assert test_db.query(AdminLog).count() == 0
+        finally:
+            writer.stop()
+
+        resource_ids = [log.resource_id for log in test_db.query(AdminLog).order_by(AdminLog.id)]
+        assert resource_ids == ["0", "1", "2", "3", "4"]
+
+    def test_entries_are_written_inline_when_stopped(self, test_db):
+        """Test para escribir en el momento si el escritor no está en marcha"""
+        writer = AuditLogWriter()
+        self._record(writer, test_db, 1)
+        assert test_db.query(AdminLog).count() == 1
+
+    def test_failed_entries_are_dropped_after_max_attempts(self, tmp_path, caplog):
+        """Test para reintentar las entradas fallidas y descartarlas tras varios fallos"""
+        # Base de datos sin tablas: todas las inserciones fallan
+        broken = Session(bind=create_engine(f"sqlite:///{tmp_path / 'broken.db'}"))
+        writer = AuditLogWriter(max_attempts=2)
+        metrics.reset()
+
+        with caplog.at_level(logging.ERROR, logger="app.services.audit_log"):
+            self._record(writer, broken, 1)
+            assert len(writer._buffer) == 1
+            writer.flush()
+
+        assert writer._buffer == []
+        assert metrics.snapshot()["counters"]["audit_log.dropped"] == 1
+        assert any("descartada" in record.message and "'resource_id': '1'" in record.message
+                   for record in caplog.records)
+
+    def test_full_buffer_is_written_by_the_caller(self, test_db, tmp_path):
+        """Test para acotar el búfer: lleno, la petición escribe y descarta lo que no cabe"""
+        writer = AuditLogWriter(batch_size=1000, flush_interval=3600, max_pending=3)
+        writer.start()
+        try:
+            for number in range(3):
+                self._record(writer, test_db, number)
+            assert test_db.query(AdminLog).count() == 3
+
+            broken = Session(bind=create_engine(f"sqlite:///{tmp_path / 'broken.db'}"))
+            for number in range(10):
+                self._record(writer, broken, number)
+                assert len(writer._buffer) <= 3
+        finally:
+            writer._buffer.clear()
+            writer.stop()
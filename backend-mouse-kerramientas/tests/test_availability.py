@@ -0,0 +1,111 @@
+"""
+Tests para la disponibilidad de herramientas por rango de fechas
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.crud.rental import cancel_rental, return_rental
+from app.models.rental import Rental, RentalStatus
+from app.models.tool import Tool
+from app.schemas.rental import RentalReturn
+from app.services.availability import (
+    blocking_rentals_filter, get_available_tools, is_tool_available, to_utc_naive
+)
+
+
+class TestAvailability:
+    """Tests para la detección de solapamientos entre alquileres"""
+
+    def _tool(self, db, name):
+        tool = Tool(name=name, description="Herramienta de prueba", brand="Bosch",
+                    model="X1", category="Eléctricas", daily_price=10.0)
+        db.add(tool)
+        db.commit()
+        return tool
+
+    def _rental(self, db, tool, start, end, status=RentalStatus.PENDING):
+        db.add(Rental(tool_id=tool.id, user_id=1, start_date=start, end_date=end,
+                      total_price=10.0, status=status))
+        db.commit()
+
+    def test_overlapping_periods(self, test_db):
+        """Test para que solo los periodos solapados bloqueen la herramienta"""
+        day = datetime(2030, 1, 10)
+        tool = self._tool(test_db, "Taladro")
+        self._rental(test_db, tool, day, day + timedelta(days=3))
+
+        assert not is_tool_available(test_db, tool.id, day + timedelta(days=1), day + timedelta(days=5))
+        assert not is_tool_available(test_db, tool.id, day - timedelta(days=2), day + timedelta(days=1))
+        assert is_tool_available(test_db, tool.id, day + timedelta(days=3), day + timedelta(days=5))
+        assert is_tool_available(test_db, tool.id, day - timedelta(days=2), day)
+
+    def test_finished_and_overdue_rentals(self, test_db):
+        """Test para ignorar alquileres cerrados y bloquear los vencidos"""
+        day = datetime(2030, 1, 10)
+        returned = self._tool(test_db, "Sierra")
+        overdue = self._tool(test_db, "Lijadora")
+        self._rental(test_db, returned, day, day + timedelta(days=3), RentalStatus.RETURNED)
+        self._rental(test_db, overdue, day, day + timedelta(days=3), RentalStatus.OVERDUE)
+
+        later = (day + timedelta(days=10), day + timedelta(days=12))
+        assert is_tool_available(test_db, returned.id, *later)
+        assert not is_tool_available(test_db, overdue.id, *later)
+        assert [tool.id for tool in get_available_tools(test_db, *later)] == [returned.id]
+
+    def test_cancel_keeps_tool_out_while_another_rental_is_active(self, test_db):
+        """Test para que cancelar o devolver no libere una herramienta que sigue fuera"""
+        now = datetime.utcnow()
+        tool = self._tool(test_db, "Martillo")
+        self._rental(test_db, tool, now - timedelta(days=1), now + timedelta(days=1), RentalStatus.ACTIVE)
+        self._rental(test_db, tool, now + timedelta(days=5), now + timedelta(days=7))
+        active, future = test_db.query(Rental).order_by(Rental.id).all()
+        tool.is_available = False
+        test_db.commit()
+
+        cancel_rental(test_db, future.id)
+        assert tool.is_available is False
+
+        return_rental(test_db, active.id, RentalReturn(actual_return_date=now))
+        assert tool.is_available is True
+
+    def test_blocking_query_uses_status_index(self, test_db):
+        """Test para que la comprobación busque por herramienta y estado en el índice"""
+        day = datetime(2030, 1, 10)
+        query = test_db.query(Rental.id).filter(
+            Rental.tool_id == 1, blocking_rentals_filter(day, day + timedelta(days=3))
+        )
+        compiled = query.statement.compile(
+            bind=test_db.get_bind(), compile_kwargs={"render_postcompile": True}
+        )
+        plan = test_db.connection().exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", tuple(None for _ in compiled.positiontup)
+        ).all()
+
+        assert "ix_rentals_tool_status_period (tool_id=? AND status=? AND start_date<?)" in plan[0][-1]
+
+    def test_to_utc_naive_converts_offset(self):
+        """Test para convertir las fechas con zona horaria a UTC en lugar de descartar la zona"""
+        local = datetime(2030, 1, 10, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+
+        assert to_utc_naive(local) == datetime(2030, 1, 10, 10, 0)
+        assert to_utc_naive(datetime(2030, 1, 10, 12, 0)) == datetime(2030, 1, 10, 12, 0)
+
+    def test_create_rental_with_mixed_timezones(self, client, test_db):
+        """Test para reservar con una fecha con zona horaria y otra sin ella"""
+        tool = self._tool(test_db, "Taladro")
+        client.post("/api/auth/register", json={
+            "email": "renter@example.com", "username": "renter", "full_name": "Renter",
+            "password": "testpassword123", "password_confirm": "testpassword123"
+        })
+        token = client.post(
+            "/api/auth/login", data={"username": "renter", "password": "testpassword123"}
+        ).json()["access_token"]
+
+        response = client.post("/api/rentals/", headers={"Authorization": f"Bearer {token}"}, json={
+            "tool_id": tool.id,
+            "start_date": "2030-01-10T12:00:00+02:00",
+            "end_date": "2030-01-12T10:00:00"
+        })
+
+        assert response.status_code == 201, response.text
+        rental = test_db.query(Rental).one()
+        assert (rental.start_date, rental.end_date) == (datetime(2030, 1, 10, 10, 0), datetime(2030, 1, 12, 10, 0))
@@ -0,0 +1,255 @@
+"""
+Tests para las copias de seguridad en streaming
+"""
+import gzip
+import hashlib
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.admin import get_backup_manifests
+from app.crud.rating import rebuild_rating_summaries
+from app.database.database import Base
+from app.models.admin_log import AdminLog
+from app.models.backup_config import BackupConfig
+from app.models.rating import Rating, ToolRatingSummary
+from app.models.rental import Rental, RentalStatus
+from app.models.tool import Tool
+from app.models.user import User
+from app.services.token_versions import token_versions, user_token_claims
+from app.services.user_cache import get_cached_user, user_cache
+from app.services.backup import (
+    BACKUP_TABLES, BackupFormatError, backup_chain, export_backup, restore_backup, run_backup
+)
+
+
+def _fk_engine(tmp_path):
+    """Motor SQLite en fichero con las claves foráneas activas"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fk.db'}")
+    event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+class TestBackupExport:
+    """Tests para la exportación NDJSON comprimida"""
+
+    def test_export_writes_every_table(self, test_db, tmp_path):
+        """Test para exportar todas las tablas con sus filas"""
+        tool = Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                    model="DCD777", category="Eléctricas", daily_price=25.0)
+        test_db.add(tool)
+        test_db.flush()
+        test_db.add(Rental(tool_id=tool.id, user_id=1, start_date=datetime(2030, 1, 1),
+                           end_date=datetime(2030, 1, 3), total_price=75.0, status=RentalStatus.ACTIVE))
+        test_db.add(AdminLog(admin_id=1, admin_username="admin", action="CREATE", resource="tool"))
+        test_db.commit()
+
+        path = tmp_path / "backup.ndjson.gz"
+        result = export_backup(test_db.get_bind(), str(path), created_by="admin")
+
+        with gzip.open(path, "rt", encoding="utf-8") as stream:
+            lines = [json.loads(line) for line in stream]
+
+        assert lines[0]["backup"]["kind"] == "full"
+        tables = [line["table"] for line in lines if isinstance(line, dict) and "table" in line]
+        assert tables == [table.name for table in BACKUP_TABLES]
+        assert result["tables"]["tools"] == 1
+        assert result["tables"]["rentals"] == 1
+        assert result["tables"]["admin_logs"] == 1
+
+        rental_header = lines.index({"table": "rentals", "columns": [c.name for c in Rental.__table__.columns]})
+        rental_row = dict(zip(lines[rental_header]["columns"], lines[rental_header + 1]))
+        assert rental_row["status"] == "ACTIVE"
+        assert rental_row["start_date"] == "2030-01-01T00:00:00"
+
+
+class TestBackupRestore:
+    """Tests para la restauración en streaming"""
+
+    def test_restore_replaces_data(self, test_db, tmp_path):
+        """Test para recuperar las filas de la copia y descartar las posteriores"""
+        tool = Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                    model="DCD777", category="Eléctricas", daily_price=25.0)
+        test_db.add(tool)
+        test_db.flush()
+        test_db.add(Rental(tool_id=tool.id, user_id=1, start_date=datetime(2030, 1, 1),
+                           end_date=datetime(2030, 1, 3), total_price=75.0, status=RentalStatus.ACTIVE))
+        test_db.commit()
+
+        path = str(tmp_path / "backup.ndjson.gz")
+        engine = test_db.get_bind()
+        export_backup(engine, path)
+
+        test_db.query(Rental).delete()
+        test_db.add(Tool(name="Sierra", description="Sierra de prueba", brand="Bosch",
+                         model="GKS", category="Eléctricas", daily_price=30.0))
+        test_db.commit()
+
+        result = restore_backup(engine, path)
+        test_db.expire_all()
+
+        assert result["tables"]["tools"] == 1
+        assert [t.name for t in test_db.query(Tool)] == ["Taladro"]
+        rental = test_db.query(Rental).one()
+        assert rental.status == RentalStatus.ACTIVE
+        assert rental.start_date == datetime(2030, 1, 1)
+
+    def test_restore_with_foreign_keys_keeps_configs(self, test_db, tmp_path):
+        """Test para restaurar con claves foráneas activas y conservar las configuraciones"""
+        engine = _fk_engine(tmp_path)
+        with Session(engine) as db:
+            db.add(User(email="fk@example.com", username="fkuser", hashed_password="x"))
+            db.add(Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                        model="DCD777", category="Eléctricas", daily_price=25.0))
+            db.flush()
+            db.add(Rating(tool_id=1, user_id=1, rating=5))
+            db.commit()
+            rebuild_rating_summaries(db)
+            path = str(tmp_path / "backup.ndjson.gz")
+            export_backup(engine, path)
+            db.add(BackupConfig(name="Diaria", config_data="{}", created_by=1))
+            db.commit()
+
+            restore_backup(engine, path)
+
+            assert db.query(BackupConfig).count() == 1
+            assert db.query(ToolRatingSummary).one().rating_count == 1
+        engine.dispose()
+
+    def test_restore_revokes_tokens_and_cached_users(self, test_db, tmp_path):
+        """Test para invalidar los tokens y la caché de usuarios al restaurar"""
+        user = User(email="restore@example.com", username="restoreuser", hashed_password="x")
+        test_db.add(user)
+        test_db.commit()
+        assert user_token_claims(test_db, user)["ver"] == 0
+        get_cached_user(test_db, "restoreuser")
+        path = str(tmp_path / "backup.ndjson.gz")
+        export_backup(test_db.get_bind(), path)
+
+        restore_backup(test_db.get_bind(), path)
+
+        assert len(user_cache) == 0
+        assert token_versions.current(test_db, user.id) == 1
+
+    def test_truncated_backup_is_rejected(self, test_db, tmp_path):
+        """Test para no aplicar cambios si la copia está incompleta"""
+        test_db.add(Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                         model="DCD777", category="Eléctricas", daily_price=25.0))
+        test_db.commit()
+        path = tmp_path / "backup.ndjson.gz"
+        export_backup(test_db.get_bind(), str(path))
+
+        with gzip.open(path, "rt", encoding="utf-8") as stream:
+            lines = stream.readlines()
+        with gzip.open(path, "wt", encoding="utf-8") as stream:
+            stream.writelines(line for line in lines if not line.startswith('[1,"Taladro"'))
+
+        with pytest.raises(BackupFormatError):
+            restore_backup(test_db.get_bind(), str(path))
+        assert test_db.query(Tool).count() == 1
+
+
+class TestIncrementalBackup:
+    """Tests para las copias incrementales encadenadas"""
+
+    def test_incremental_chain_restores_latest_state(self, test_db, tmp_path, monkeypatch):
+        """Test para copiar solo los cambios y restaurar la cadena completa"""
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path))
+        engine = test_db.get_bind()
+        config = BackupConfig(name="Diaria", config_data=json.dumps({"mode": "incremental", "full_every": 3}),
+                              created_by=1)
+        tools = [Tool(name=f"Herramienta {i}", description="Herramienta de prueba", brand="Bosch",
+                      model="X1", category="Eléctricas", daily_price=10.0,
+                      updated_at=datetime(2020, 1, 1)) for i in range(5)]
+        test_db.add_all([config, *tools])
+        test_db.commit()
+
+        full = run_backup(engine, config)
+        assert full["kind"] == "full"
+
+        tools[0].daily_price = 99.0
+        test_db.delete(tools[1])
+        test_db.commit()
+
+        incremental = run_backup(engine, config)
+        assert incremental["kind"] == "incremental"
+        assert incremental["parent"] == full["filename"]
+        assert incremental["tables"]["tools"] == 1
+
+        test_db.query(Tool).delete()
+        test_db.commit()
+
+        chain = backup_chain(test_db, incremental["filename"])
+        assert chain == [full["filename"], incremental["filename"]]
+        restore_backup(engine, [str(tmp_path / name) for name in chain])
+        test_db.expire_all()
+
+        prices = {tool.name: tool.daily_price for tool in test_db.query(Tool)}
+        assert prices == {"Herramienta 0": 99.0, "Herramienta 2": 10.0,
+                          "Herramienta 3": 10.0, "Herramienta 4": 10.0}
+        # Después de restaurar, la siguiente copia de la cadena vuelve a ser completa
+        assert run_backup(engine, config)["kind"] == "full"
+
+
+    def test_incremental_chain_with_foreign_keys(self, tmp_path, monkeypatch):
+        """Test para restaurar cambios de filas referenciadas sin romper las claves foráneas"""
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path))
+        engine = _fk_engine(tmp_path)
+        with Session(engine) as db:
+            config = BackupConfig(name="Diaria", config_data=json.dumps({"mode": "incremental"}), created_by=1)
+            user = User(email="fk@example.com", username="fkuser", hashed_password="x",
+                        updated_at=datetime(2020, 1, 1))
+            tool = Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt", model="DCD777",
+                        category="Eléctricas", daily_price=25.0, updated_at=datetime(2020, 1, 1))
+            db.add_all([config, user, tool])
+            db.flush()
+            db.add(Rental(tool_id=tool.id, user_id=user.id, start_date=datetime(2030, 1, 1),
+                          end_date=datetime(2030, 1, 3), total_price=75.0, status=RentalStatus.ACTIVE))
+            db.add(Rating(tool_id=tool.id, user_id=user.id, rating=5))
+            db.commit()
+            full = run_backup(engine, config)
+
+            tool.daily_price = 30.0
+            user.full_name = "Usuario FK"
+            db.commit()
+            incremental = run_backup(engine, config)
+            assert incremental["tables"]["tools"] == 1
+
+            chain = backup_chain(db, incremental["filename"])
+            restore_backup(engine, [str(tmp_path / name) for name in chain])
+            db.expire_all()
+
+            assert db.get(Tool, tool.id).daily_price == 30.0
+            assert db.get(User, user.id).full_name == "Usuario FK"
+            assert db.query(Rental).count() == 1
+            assert db.query(Rating).count() == 1
+        engine.dispose()
+
+
+class TestBackupCatalog:
+    """Tests para el catálogo de copias"""
+
+    def test_catalog_is_paginated_and_checksummed(self, test_db, tmp_path, monkeypatch):
+        """Test para listar las copias con su cadena y su checksum"""
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path))
+        config = BackupConfig(name="Diaria", config_data=json.dumps({"mode": "incremental"}), created_by=1)
+        test_db.add(config)
+        test_db.commit()
+        full = run_backup(test_db.get_bind(), config)
+        incremental = run_backup(test_db.get_bind(), config)
+
+        first_page = get_backup_manifests(test_db, limit=1)
+        assert [backup["filename"] for backup in first_page] == [incremental["filename"]]
+        assert first_page[0]["parent"] == full["filename"]
+        assert first_page.next_cursor
+
+        second_page = get_backup_manifests(test_db, limit=1, cursor=first_page.next_cursor)
+        assert [backup["kind"] for backup in second_page] == ["full"]
+        assert second_page[0]["tables"] == full["tables"]
+        digest = hashlib.sha256((tmp_path / full["filename"]).read_bytes()).hexdigest()
+        assert second_page[0]["checksum"] == digest
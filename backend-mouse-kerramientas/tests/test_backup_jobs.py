@@ -0,0 +1,41 @@
+"""
+Tests para las copias de seguridad programadas
+"""
+import json
+import os
+
+from app.core.config import settings
+from app.models.backup_config import BackupConfig
+from app.models.backup_manifest import BackupManifest
+from app.services.jobs import run_scheduled_backups
+
+
+class TestScheduledBackups:
+    """Tests para la ejecución y retención de las copias programadas"""
+
+    def test_due_configs_run_and_old_chains_are_pruned(self, test_db, tmp_path, monkeypatch):
+        """Test para ejecutar solo las configuraciones pendientes y aplicar la retención"""
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path))
+        config = BackupConfig(name="Cada hora", created_by=1,
+                              config_data=json.dumps({"interval_hours": 0, "keep_full": 2}))
+        inactive = BackupConfig(name="Inactiva", created_by=1, is_active=False,
+                                config_data=json.dumps({"interval_hours": 0}))
+        test_db.add_all([config, inactive])
+        test_db.commit()
+
+        results = [run_scheduled_backups(test_db) for _ in range(3)]
+
+        assert [result["backups"] for result in results] == [1, 1, 1]
+        assert results[-1]["pruned"] == 1
+        manifests = test_db.query(BackupManifest).filter(BackupManifest.config_id == config.id).all()
+        assert len(manifests) == 2
+        assert sorted(os.listdir(tmp_path)) == sorted(manifest.filename for manifest in manifests)
+
+    def test_configs_wait_for_their_interval(self, test_db, tmp_path, monkeypatch):
+        """Test para no repetir la copia antes de que pase el intervalo"""
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path))
+        test_db.add(BackupConfig(name="Diaria", created_by=1, config_data=json.dumps({"interval_hours": 24})))
+        test_db.commit()
+
+        assert run_scheduled_backups(test_db)["backups"] == 1
+        assert run_scheduled_backups(test_db)["backups"] == 0
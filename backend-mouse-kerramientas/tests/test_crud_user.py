@@ -2,8 +2,10 @@
 Tests para operaciones CRUD de usuarios
 """
 import pytest
+from passlib.hash import bcrypt
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.security import verify_password
 from app.crud.user import (
     authenticate_user,
@@ -112,4 +114,22 @@ class TestUserCRUD:
         # Intentar autenticar usuario que no existe
         authenticated_user = authenticate_user(test_db, "nonexistent", "password")
         
-        assert authenticated_user is None
\ No newline at end of file
+        assert authenticated_user is None
+
+    def test_authenticate_user_rehashes_other_cost(self, test_db):
+        """Un hash con un coste distinto de BCRYPT_ROUNDS se recalcula al autenticar"""
+        user_data = UserCreate(
+            email="rehash@example.com",
+            username="rehashuser",
+            password="testpassword123",
+            password_confirm="testpassword123"
+        )
+        old_hash = bcrypt.using(rounds=4).hash("testpassword123")
+        create_user(test_db, user_data, hashed_password=old_hash)
+        
+        authenticated_user = authenticate_user(test_db, "rehashuser", "testpassword123")
+        
+        assert authenticated_user is not None
+        assert authenticated_user.hashed_password != old_hash
+        assert bcrypt.from_string(authenticated_user.hashed_password).rounds == settings.BCRYPT_ROUNDS
+        assert verify_password("testpassword123", authenticated_user.hashed_password)
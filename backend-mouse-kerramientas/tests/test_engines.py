@@ -0,0 +1,122 @@
+"""
+Tests para el registro de motores SQL
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.database.database import Base, get_read_db
+from app.database.engines import EngineRegistry
+from app.main import app
+from app.models.tool import Tool
+
+
+class TestEngineRegistry:
+    """Tests para los pools y métricas del registro de motores"""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_engine_is_shared_and_pooled(self, tmp_path, monkeypatch):
+        """Cada base de datos tiene un único motor con el pool configurado"""
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+        registry = EngineRegistry()
+        registry.register("main", f"sqlite:///{tmp_path / 'main.db'}")
+
+        engine = registry.engine("main")
+        assert registry.engine("main") is engine
+        assert engine.pool.size() == 2
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            assert metrics.snapshot()["gauges"]["db.main.pool.checked_out"] == 1
+
+        snapshot = metrics.snapshot()
+        assert snapshot["gauges"]["db.main.pool.checked_out"] == 0
+        assert snapshot["timings"]["db.main.pool.wait_ms"]["count"] == 1
+        assert "main" in registry.pool_status()
+        registry.dispose()
+
+    def test_pool_timeout_is_counted(self, tmp_path, monkeypatch):
+        """Agotar el pool cuenta un timeout, también tras recrear el pool"""
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+        monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+        registry = EngineRegistry()
+        registry.register("main", f"sqlite:///{tmp_path / 'main.db'}")
+        engine = registry.engine("main")
+        engine.dispose()
+
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        assert metrics.snapshot()["counters"]["db.main.pool.timeouts"] == 1
+        registry.dispose()
+
+    def test_sqlite_production_profile(self, tmp_path, monkeypatch):
+        """SQLite en fichero usa WAL, pragmas y un pool de solo lectura"""
+        monkeypatch.setattr(settings, "SQLITE_PRODUCTION_PROFILE", True)
+        registry = EngineRegistry()
+        registry.register("main", f"sqlite:///{tmp_path / 'main.db'}")
+        engine = registry.engine("main")
+        with engine.begin() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            connection.execute(text("INSERT INTO items DEFAULT VALUES"))
+
+        read_engine = registry.read_engine("main")
+        assert read_engine is not engine
+        with read_engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM items")).scalar() == 1
+            with pytest.raises(exc.OperationalError):
+                connection.execute(text("INSERT INTO items DEFAULT VALUES"))
+        registry.dispose()
+
+    def test_read_engine_falls_back_without_profile(self, tmp_path, monkeypatch):
+        """Sin el perfil de producción los GET usan el motor normal"""
+        monkeypatch.setattr(settings, "SQLITE_PRODUCTION_PROFILE", False)
+        registry = EngineRegistry()
+        registry.register("main", f"sqlite:///{tmp_path / 'main.db'}")
+
+        assert registry.read_engine("main") is registry.engine("main")
+        with registry.engine("main").connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        registry.dispose()
+
+    def test_get_routes_through_read_engine(self, tmp_path, monkeypatch):
+        """Los GET del catálogo funcionan con el pool de solo lectura del perfil"""
+        monkeypatch.setattr(settings, "SQLITE_PRODUCTION_PROFILE", True)
+        registry = EngineRegistry()
+        registry.register("main", f"sqlite:///{tmp_path / 'main.db'}")
+        Base.metadata.create_all(bind=registry.engine("main"))
+        WriteSession = sessionmaker(autocommit=False, autoflush=False, bind=registry.engine("main"))
+        with WriteSession() as db:
+            db.add(Tool(name="Taladro", description="Taladro percutor", brand="Bosch",
+                        model="X1", category="Eléctricas", daily_price=10.0))
+            db.commit()
+
+        ReadSession = sessionmaker(autocommit=False, autoflush=False, bind=registry.read_engine("main"))
+
+        def read_db():
+            with ReadSession() as db:
+                yield db
+
+        app.dependency_overrides[get_read_db] = read_db
+        try:
+            client = TestClient(app)
+            tools = client.get("/api/tools/", params={"category": "Eléctricas"})
+            options = client.get("/api/tools/filters/options")
+        finally:
+            app.dependency_overrides.pop(get_read_db, None)
+            registry.dispose()
+
+        assert tools.status_code == 200, tools.text
+        assert [tool["name"] for tool in tools.json()] == ["Taladro"]
+        assert options.status_code == 200, options.text
+        assert options.json()["brands"] == ["Bosch"]
@@ -0,0 +1,80 @@
+"""
+Tests para la paginación por cursor
+"""
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_page, offset_page
+from app.models.admin_log import AdminLog
+
+
+@pytest.fixture
+def logs(test_db):
+    """Registros de auditoría de ejemplo"""
+    test_db.add_all([
+        AdminLog(admin_id=1, admin_username="admin", action="CREATE", resource="tool", resource_id=str(i))
+        for i in range(1, 8)
+    ])
+    test_db.commit()
+    return test_db
+
+
+class TestPagination:
+    """Tests para la paginación por cursor"""
+
+    def test_cursor_roundtrip(self):
+        """Test para codificar y decodificar un cursor"""
+        cursor = encode_cursor([-1.25, 42])
+
+        assert decode_cursor(cursor, 2) == [-1.25, 42]
+
+    def test_invalid_cursor(self):
+        """Test para cursores corruptos o de otro listado"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("no-es-un-cursor", 1)
+
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(encode_cursor([1, 2]), 1)
+
+    def test_keyset_pages_cover_all_rows(self, logs):
+        """Test para recorrer todas las páginas sin saltos ni duplicados"""
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_page(logs.query(AdminLog), [(AdminLog.id, True)], cursor=cursor, limit=3)
+            seen.extend(log.id for log in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_cursor_ignores_concurrent_inserts(self, logs):
+        """Test para que las inserciones nuevas no desplacen la página siguiente"""
+        first_page = keyset_page(logs.query(AdminLog), [(AdminLog.id, True)], limit=3)
+        logs.add(AdminLog(admin_id=1, admin_username="admin", action="DELETE", resource="tool"))
+        logs.commit()
+
+        second_page = keyset_page(
+            logs.query(AdminLog), [(AdminLog.id, True)], cursor=first_page.next_cursor, limit=3
+        )
+
+        assert [log.id for log in second_page] == [4, 3, 2]
+
+    def test_legacy_skip_limit(self, logs):
+        """Test para el modo heredado skip/limit"""
+        page = keyset_page(logs.query(AdminLog), [(AdminLog.id, True)], skip=5, limit=3)
+
+        assert [log.id for log in page] == [2, 1]
+        assert page.next_cursor is None
+
+    def test_offset_pages_cover_all_rows(self, logs):
+        """Test para recorrer por posición un orden que no sirve de cursor"""
+        order_by = [AdminLog.resource_id.desc(), AdminLog.id.asc()]
+        first_page = offset_page(logs.query(AdminLog), order_by, limit=4)
+        second_page = offset_page(logs.query(AdminLog), order_by, cursor=first_page.next_cursor, limit=4)
+
+        assert [log.resource_id for log in first_page + second_page] == ["7", "6", "5", "4", "3", "2", "1"]
+        assert second_page.next_cursor is None
+
+        with pytest.raises(InvalidCursorError):
+            offset_page(logs.query(AdminLog), order_by, cursor=encode_cursor([1.5, 3]))
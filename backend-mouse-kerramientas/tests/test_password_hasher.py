@@ -0,0 +1,80 @@
+"""
+Tests para el pool acotado de bcrypt
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.security import verify_password
+from app.services import password_hasher as hasher_module
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+class TestPasswordHasher:
+    """Tests para PasswordHasher"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        """El hash generado en el pool se verifica correctamente"""
+        hasher = PasswordHasher(max_workers=2, max_pending=4)
+        try:
+            hashed = await hasher.hash("testpassword123")
+            assert verify_password("testpassword123", hashed)
+            assert await hasher.verify("testpassword123", hashed) is True
+            assert await hasher.verify("wrongpassword", hashed) is False
+            assert hasher.pending == 0
+        finally:
+            hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """Mientras bcrypt trabaja, el event loop sigue atendiendo otras tareas"""
+        hasher = PasswordHasher(max_workers=2, max_pending=8)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        try:
+            await asyncio.gather(*(hasher.hash("testpassword123") for _ in range(4)))
+        finally:
+            task.cancel()
+            hasher.shutdown()
+        assert ticks > 10
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self, monkeypatch):
+        """Por encima de max_pending se rechaza en lugar de encolar"""
+        release = threading.Event()
+
+        def slow_hash(password):
+            release.wait(5)
+            return "hashed"
+
+        monkeypatch.setattr(hasher_module, "get_password_hash", slow_hash)
+        metrics.reset()
+        hasher = PasswordHasher(max_workers=1, max_pending=2)
+        try:
+            first = asyncio.ensure_future(hasher.hash("a"))
+            second = asyncio.ensure_future(hasher.hash("b"))
+            await asyncio.sleep(0)
+            assert hasher.pending == 2
+
+            with pytest.raises(PasswordHasherBusy):
+                await hasher.hash("c")
+
+            release.set()
+            assert await asyncio.gather(first, second) == ["hashed", "hashed"]
+            assert hasher.pending == 0
+            snapshot = metrics.snapshot()
+            assert snapshot["counters"]["password_hasher.rejected"] == 1
+            assert snapshot["gauges"]["password_hasher.pending"] == 0
+        finally:
+            release.set()
+            hasher.shutdown()
@@ -0,0 +1,120 @@
+"""
+Tests para el resumen incremental de calificaciones
+"""
+import pytest
+
+from app.crud.rating import (
+    _create_summary,
+    create_rating,
+    delete_rating,
+    get_tool_rating_stats,
+    rebuild_rating_summaries,
+    update_rating,
+)
+from app.models.rating import Rating, ToolRatingSummary
+from app.models.tool import Tool
+from app.models.user import User
+from app.schemas.rating import RatingCreate, RatingUpdate
+
+
+@pytest.fixture
+def tool_with_users(test_db):
+    """Herramienta y usuarios para calificarla"""
+    tool = Tool(name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                model="DCD777", category="Eléctricas", daily_price=25.0)
+    users = [
+        User(email=f"rater{i}@example.com", username=f"rater{i}", hashed_password="x")
+        for i in range(3)
+    ]
+    test_db.add(tool)
+    test_db.add_all(users)
+    test_db.commit()
+    return test_db, tool.id, [user.id for user in users]
+
+
+class TestRatingSummary:
+    """Tests para el resumen de calificaciones por herramienta"""
+
+    def test_stats_without_ratings(self, tool_with_users):
+        """Test para estadísticas de una herramienta sin calificaciones"""
+        db, tool_id, _ = tool_with_users
+
+        stats = get_tool_rating_stats(db, tool_id)
+
+        assert stats["total_ratings"] == 0
+        assert stats["average_rating"] == 0.0
+        assert stats["rating_distribution"] == {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+
+    def test_summary_follows_create_update_delete(self, tool_with_users):
+        """Test para mantener el resumen en cada operación"""
+        db, tool_id, user_ids = tool_with_users
+
+        first = create_rating(db, RatingCreate(tool_id=tool_id, rating=5.0), user_id=user_ids[0])
+        create_rating(db, RatingCreate(tool_id=tool_id, rating=4.5), user_id=user_ids[1])
+        create_rating(db, RatingCreate(tool_id=tool_id, rating=2.0), user_id=user_ids[2])
+
+        stats = get_tool_rating_stats(db, tool_id)
+        assert stats["total_ratings"] == 3
+        assert stats["average_rating"] == 3.83
+        assert stats["rating_distribution"] == {1: 0, 2: 1, 3: 0, 4: 1, 5: 1}
+
+        update_rating(db, first.id, RatingUpdate(rating=1.0))
+        stats = get_tool_rating_stats(db, tool_id)
+        assert stats["average_rating"] == 2.5
+        assert stats["rating_distribution"] == {1: 1, 2: 1, 3: 0, 4: 1, 5: 0}
+
+        delete_rating(db, first.id)
+        stats = get_tool_rating_stats(db, tool_id)
+        assert stats["total_ratings"] == 2
+        assert stats["average_rating"] == 3.25
+        assert stats["rating_distribution"] == {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}
+
+    def test_rebuild_repairs_summary(self, tool_with_users):
+        """Test para recalcular un resumen desincronizado"""
+        db, tool_id, user_ids = tool_with_users
+        db.add_all([
+            Rating(tool_id=tool_id, user_id=user_ids[0], rating=3.0),
+            Rating(tool_id=tool_id, user_id=user_ids[1], rating=5.0),
+        ])
+        db.commit()
+        assert db.query(ToolRatingSummary).count() == 0
+
+        assert rebuild_rating_summaries(db) == 1
+
+        stats = get_tool_rating_stats(db, tool_id)
+        assert stats["total_ratings"] == 2
+        assert stats["average_rating"] == 4.0
+        assert stats["rating_distribution"] == {1: 0, 2: 0, 3: 1, 4: 0, 5: 1}
+
+    def test_concurrent_first_rating_applies_delta(self, tool_with_users):
+        """Test para sumar la calificación si otra transacción creó el resumen a la vez"""
+        db, tool_id, user_ids = tool_with_users
+        # Resumen creado por otra transacción que no veía la segunda calificación
+        db.add(ToolRatingSummary(tool_id=tool_id, rating_count=1, rating_sum=5.0, stars_5=1))
+        db.add_all([
+            Rating(tool_id=tool_id, user_id=user_ids[0], rating=5.0),
+            Rating(tool_id=tool_id, user_id=user_ids[1], rating=3.0),
+        ])
+        db.flush()
+
+        _create_summary(db, tool_id, {
+            "rating_count": ToolRatingSummary.rating_count + 1,
+            "rating_sum": ToolRatingSummary.rating_sum + 3.0,
+            "stars_3": ToolRatingSummary.stars_3 + 1,
+        })
+        db.commit()
+
+        stats = get_tool_rating_stats(db, tool_id)
+        assert stats["total_ratings"] == 2
+        assert stats["rating_distribution"] == {1: 0, 2: 0, 3: 1, 4: 0, 5: 1}
+
+    def test_deleting_tool_deletes_summary(self, tool_with_users):
+        """Test para borrar el resumen junto con la herramienta"""
+        db, tool_id, user_ids = tool_with_users
+        rating = create_rating(db, RatingCreate(tool_id=tool_id, rating=4.0), user_id=user_ids[0])
+        delete_rating(db, rating.id)
+
+        db.delete(db.get(Tool, tool_id))
+        db.commit()
+
+        assert db.query(ToolRatingSummary).count() == 0
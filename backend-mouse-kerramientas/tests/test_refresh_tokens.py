@@ -0,0 +1,99 @@
+"""
+Tests para los refresh tokens con rotación
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import create_refresh_token, decode_token
+from app.crud.user import create_user
+from app.dependencies import get_token_user
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.services.refresh_tokens import (
+    RefreshTokenError, logout_refresh_token, prune_revoked_tokens, revoked_tokens,
+    rotate_refresh_token
+)
+from app.services.token_versions import token_versions, user_token_claims
+
+
+def _refresh_token(db):
+    user = create_user(db, UserCreate(
+        email="refresh@example.com",
+        username="refreshuser",
+        password="testpassword123",
+        password_confirm="testpassword123"
+    ))
+    return create_refresh_token(subject=user.username, claims=user_token_claims(db, user))
+
+
+class TestRefreshTokens:
+    """Tests para la rotación y revocación de refresh tokens"""
+
+    def setup_method(self):
+        token_versions.clear()
+        revoked_tokens.clear()
+
+    def test_rotation_consumes_token(self, test_db):
+        """Un refresh token solo se puede usar una vez"""
+        token = _refresh_token(test_db)
+
+        claims = rotate_refresh_token(test_db, token)
+
+        assert claims["sub"] == "refreshuser"
+        assert claims["ver"] == 0
+        assert test_db.query(RevokedToken).count() == 1
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(test_db, token)
+
+    def test_reuse_revokes_all_tokens(self, test_db):
+        """Reutilizar un refresh token invalida todos los tokens del usuario"""
+        token = _refresh_token(test_db)
+        claims = rotate_refresh_token(test_db, token)
+        new_token = create_refresh_token(subject=claims.pop("sub"), claims=claims)
+
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(test_db, token)
+
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(test_db, new_token)
+
+    def test_rotation_reads_current_user(self, test_db):
+        """Los tokens nuevos llevan los permisos actuales del usuario, aunque cambien sin el ORM"""
+        token = _refresh_token(test_db)
+        test_db.query(User).update({"is_superuser": True}, synchronize_session=False)
+        test_db.commit()
+
+        claims = rotate_refresh_token(test_db, token)
+        assert claims["su"] is True
+
+        test_db.query(User).update({"is_active": False}, synchronize_session=False)
+        test_db.commit()
+        new_token = create_refresh_token(subject=claims.pop("sub"), claims=claims)
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(test_db, new_token)
+
+    @pytest.mark.asyncio
+    async def test_refresh_token_is_not_an_access_token(self, test_db):
+        """Un refresh token no autoriza peticiones"""
+        token = _refresh_token(test_db)
+
+        with pytest.raises(HTTPException) as exc:
+            await get_token_user(token, test_db)
+        assert exc.value.status_code == 401
+
+    def test_logout_and_prune(self, test_db):
+        """El logout revoca el token y la limpieza borra las revocaciones expiradas"""
+        token = _refresh_token(test_db)
+        logout_refresh_token(test_db, token)
+
+        with pytest.raises(RefreshTokenError):
+            rotate_refresh_token(test_db, token)
+        assert prune_revoked_tokens(test_db) == 0
+
+        test_db.query(RevokedToken).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        test_db.commit()
+        assert prune_revoked_tokens(test_db) == 1
+        assert decode_token(token)["typ"] == "refresh"
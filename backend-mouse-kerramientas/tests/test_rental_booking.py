@@ -0,0 +1,62 @@
+"""
+Tests de concurrencia para la reserva de herramientas
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.rental import create_rental
+from app.database.database import Base
+from app.models.rental import Rental
+from app.models.tool import Tool
+from app.schemas.rental import RentalCreate
+
+ATTEMPTS = 300
+
+
+class TestConcurrentBooking:
+    """Tests para que las reservas simultáneas no se solapen"""
+
+    def test_no_double_booking(self, tmp_path):
+        """Test con cientos de reservas simultáneas sobre la misma herramienta"""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'booking.db'}",
+            connect_args={"check_same_thread": False, "timeout": 60},
+            pool_size=20
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = session_factory()
+        tool = Tool(name="Martillo", description="Martillo de prueba", brand="Stanley",
+                    model="M1", category="Manuales", daily_price=5.0)
+        db.add(tool)
+        db.commit()
+        tool_id = tool.id
+        db.close()
+
+        first_day = datetime(2030, 1, 1)
+
+        def book(attempt):
+            # Periodos de 3 días que se solapan con los de los intentos vecinos
+            start = first_day + timedelta(days=attempt % 30)
+            rental = RentalCreate(tool_id=tool_id, start_date=start, end_date=start + timedelta(days=3))
+            session = session_factory()
+            try:
+                return create_rental(session, rental, user_id=attempt) is not None
+            finally:
+                session.close()
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            booked = sum(executor.map(book, range(ATTEMPTS)))
+
+        db = session_factory()
+        rentals = db.query(Rental).order_by(Rental.start_date).all()
+        db.close()
+        engine.dispose()
+
+        assert booked == len(rentals) > 0
+        for previous, current in zip(rentals, rentals[1:]):
+            assert previous.end_date <= current.start_date
@@ -0,0 +1,79 @@
+"""
+Tests para los listados de alquileres con datos de herramienta y usuario
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.crud.rental import get_rentals_with_details_by_user, get_user_active_rentals_with_details
+from app.models.rental import Rental, RentalStatus
+from app.models.tool import Tool
+from app.models.user import User
+from app.schemas.rental import RentalWithDetails
+
+
+class TestRentalDetails:
+    """Tests para los listados unidos de alquileres"""
+
+    def _setup(self, db):
+        user = User(email="renter@example.com", username="renter", full_name="Renter", hashed_password="x")
+        other = User(email="other@example.com", username="other", hashed_password="x")
+        tools = [
+            Tool(name=f"Herramienta {number}", description="Herramienta de prueba", brand="Bosch",
+                 model=f"X{number}", category="Eléctricas", daily_price=10.0 + number)
+            for number in range(3)
+        ]
+        db.add_all([user, other, *tools])
+        db.commit()
+
+        day = datetime(2030, 1, 10)
+        statuses = [RentalStatus.ACTIVE, RentalStatus.RETURNED, RentalStatus.PENDING]
+        db.add_all([
+            Rental(tool_id=tool.id, user_id=user.id, start_date=day, end_date=day + timedelta(days=2),
+                   total_price=20.0, status=status)
+            for tool, status in zip(tools, statuses)
+        ])
+        db.add(Rental(tool_id=tools[0].id, user_id=other.id, start_date=day, end_date=day + timedelta(days=2),
+                      total_price=20.0, status=RentalStatus.ACTIVE))
+        db.commit()
+        user_id = user.id
+        # Sin objetos en la sesión: una carga perezosa contaría como consulta
+        db.expunge_all()
+        return user_id
+
+    def _count_statements(self, db, func, *args, **kwargs):
+        statements = []
+        listener = lambda *event_args: statements.append(event_args)  # noqa: E731
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            result = func(db, *args, **kwargs)
+            rows = [RentalWithDetails(**row) for row in result]
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        return rows, len(statements)
+
+    def test_user_rentals_in_one_query(self, test_db):
+        """Test para listar los alquileres de un usuario con sus detalles en una consulta"""
+        user_id = self._setup(test_db)
+
+        rows, queries = self._count_statements(test_db, get_rentals_with_details_by_user, user_id=user_id)
+
+        assert queries == 1
+        assert [(row.tool_name, row.tool_model, row.tool_daily_price) for row in rows] == [
+            ("Herramienta 0", "X0", 10.0), ("Herramienta 1", "X1", 11.0), ("Herramienta 2", "X2", 12.0)
+        ]
+        assert {(row.user_id, row.user_username, row.user_full_name) for row in rows} == {
+            (user_id, "renter", "Renter")
+        }
+
+    def test_active_rentals_in_one_query(self, test_db):
+        """Test para listar los alquileres activos de un usuario con sus detalles en una consulta"""
+        user_id = self._setup(test_db)
+
+        rows, queries = self._count_statements(test_db, get_user_active_rentals_with_details, user_id=user_id)
+
+        assert queries == 1
+        assert sorted((row.tool_name, row.status) for row in rows) == [
+            ("Herramienta 0", RentalStatus.ACTIVE), ("Herramienta 2", RentalStatus.PENDING)
+        ]
+        assert all(row.tool_brand == "Bosch" and row.user_username == "renter" for row in rows)
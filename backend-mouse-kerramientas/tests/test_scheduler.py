@@ -0,0 +1,67 @@
+"""
+Tests para las tareas programadas
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.rental import check_overdue_rentals
+from app.models.rental import Rental, RentalStatus
+from app.models.scheduler_lock import SchedulerLock
+from app.services.scheduler import PeriodicJob, Scheduler, acquire_lease, scheduler
+
+
+class TestScheduler:
+    """Tests para el planificador y la tarea de alquileres vencidos"""
+
+    def test_lease_has_single_owner(self, test_db):
+        """Test para que solo un worker posea el arrendamiento"""
+        assert acquire_lease(test_db, "overdue_rentals", 60, owner="worker-1") is True
+        assert acquire_lease(test_db, "overdue_rentals", 60, owner="worker-2") is False
+        assert acquire_lease(test_db, "overdue_rentals", 60, owner="worker-1") is True
+
+    def test_expired_lease_is_taken_over(self, test_db):
+        """Test para que otro worker tome un arrendamiento expirado"""
+        assert acquire_lease(test_db, "overdue_rentals", -1, owner="worker-1") is True
+        assert acquire_lease(test_db, "overdue_rentals", 60, owner="worker-2") is True
+
+    def test_check_overdue_rentals(self, test_db):
+        """Test para marcar como vencidos solo los alquileres activos atrasados"""
+        now = datetime.utcnow()
+        test_db.add_all([
+            Rental(tool_id=1, user_id=1, start_date=now - timedelta(days=5),
+                   end_date=now - timedelta(days=1), total_price=10.0, status=RentalStatus.ACTIVE),
+            Rental(tool_id=2, user_id=1, start_date=now - timedelta(days=5),
+                   end_date=now + timedelta(days=1), total_price=10.0, status=RentalStatus.ACTIVE),
+            Rental(tool_id=3, user_id=1, start_date=now - timedelta(days=5),
+                   end_date=now - timedelta(days=1), total_price=10.0, status=RentalStatus.PENDING),
+        ])
+        test_db.commit()
+
+        assert check_overdue_rentals(test_db) == 1
+        assert check_overdue_rentals(test_db) == 0
+
+        statuses = [rental.status for rental in test_db.query(Rental).order_by(Rental.id)]
+        assert statuses == [RentalStatus.OVERDUE, RentalStatus.ACTIVE, RentalStatus.PENDING]
+
+    def test_jobs_use_injected_session_factory(self, test_db):
+        """Test para ejecutar y detener las tareas con la fábrica de sesiones inyectada"""
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=test_db.get_bind())
+        local_scheduler = Scheduler()
+        job = local_scheduler.add_job(PeriodicJob(
+            "overdue_rentals", 3600, lambda db: {"marked_overdue": check_overdue_rentals(db)},
+            session_factory=session_factory
+        ))
+
+        local_scheduler.start()
+        assert job.run_once() == {"marked_overdue": 0}
+        assert test_db.query(SchedulerLock.name).all() == [("overdue_rentals",)]
+
+        local_scheduler.shutdown()
+        assert test_db.query(SchedulerLock).count() == 0
+
+    def test_client_jobs_use_test_database(self, client, test_db):
+        """Test para que el planificador global arrancado por el cliente use la base de datos de test"""
+        assert scheduler.jobs
+        for job in scheduler.jobs.values():
+            assert job.session_factory.kw["bind"] is test_db.get_bind()
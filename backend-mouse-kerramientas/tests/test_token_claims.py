@@ -0,0 +1,101 @@
+"""
+Tests para los tokens de acceso con claims y las versiones de token
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.core.security import create_access_token, decode_token
+from app.crud.user import create_user, update_user
+from app.dependencies import get_current_user, get_token_admin_user, get_token_user
+from app.models.token_version import TokenVersion
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.token_versions import user_token_claims, token_versions
+from app.services.user_cache import user_cache
+
+
+def _create(db, username="claimsuser", is_superuser=False):
+    user = create_user(db, UserCreate(
+        email=f"{username}@example.com",
+        username=username,
+        password="testpassword123",
+        password_confirm="testpassword123"
+    ))
+    if is_superuser:
+        user.is_superuser = True
+        db.commit()
+    return user
+
+
+def _token(db, user):
+    return create_access_token(subject=user.username, claims=user_token_claims(db, user))
+
+
+class TestTokenClaims:
+    """Tests para la autorización desde los claims del token"""
+
+    def setup_method(self):
+        token_versions.clear()
+        user_cache.invalidate()
+
+    @pytest.mark.asyncio
+    async def test_claims_authorize_without_queries(self, test_db):
+        """Un token con claims autoriza sin consultar la base de datos"""
+        admin = _create(test_db, "claimsadmin", is_superuser=True)
+        token = _token(test_db, admin)
+        payload = decode_token(token)
+        assert payload["uid"] == admin.id
+        assert payload["su"] is True
+        assert payload["ver"] == 1  # al hacerlo administrador se invalidaron sus tokens
+
+        token_versions.load(test_db)
+        statements = []
+        engine = test_db.get_bind()
+        listener = lambda connection, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            current = await get_token_admin_user(await get_token_user(token, test_db))
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert current.id == admin.id
+        assert current.is_superuser is True
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_deactivation_revokes_tokens(self, test_db):
+        """Desactivar al usuario invalida los tokens emitidos antes"""
+        user = _create(test_db)
+        token = _token(test_db, user)
+        assert (await get_token_user(token, test_db)).is_active is True
+
+        update_user(test_db, user.id, UserUpdate(is_active=False))
+
+        version = test_db.query(TokenVersion).filter(TokenVersion.user_id == user.id).one()
+        assert version.version == 1
+        for dependency in (get_token_user, get_current_user):
+            with pytest.raises(HTTPException) as exc:
+                await dependency(token, test_db)
+            assert exc.value.status_code == 401
+
+        new_token = _token(test_db, user)
+        assert (await get_token_user(new_token, test_db)).is_active is False
+
+    @pytest.mark.asyncio
+    async def test_token_without_claims(self, test_db):
+        """Los tokens que solo llevan el sujeto se resuelven con la base de datos"""
+        user = _create(test_db)
+        token = create_access_token(subject=user.username)
+
+        current = await get_token_user(token, test_db)
+
+        assert current.id == user.id
+        assert current.username == "claimsuser"
+
+    def test_unrelated_change_keeps_version(self, test_db):
+        """Cambiar datos que no van en el token no invalida los tokens"""
+        user = _create(test_db)
+
+        update_user(test_db, user.id, UserUpdate(full_name="Otro nombre"))
+
+        assert test_db.query(TokenVersion).count() == 0
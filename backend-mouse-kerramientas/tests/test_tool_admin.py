@@ -0,0 +1,54 @@
+"""
+Tests para las mutaciones de herramientas con auditoría
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app.crud import tool as crud_tool
+from app.models.admin_log import AdminLog
+from app.models.tool import Tool
+from app.schemas.tool import ToolCreate, ToolUpdate
+
+
+class TestToolMutations:
+    """Tests para guardar la herramienta y su auditoría en un solo commit"""
+
+    def test_tool_and_audit_share_one_commit(self, test_db):
+        """Test para crear, modificar y eliminar con un commit por operación"""
+        admin = SimpleNamespace(id=1, username="admin")
+        commits = []
+        engine = test_db.get_bind()
+        listener = lambda connection: commits.append(1)
+        event.listen(engine, "commit", listener)
+        try:
+            tool = crud_tool.create_tool(test_db, ToolCreate(
+                name="Taladro", description="Taladro de prueba", brand="DeWalt",
+                model="DCD777", category="Eléctricas", daily_price=25.0
+            ), admin=admin)
+            updated = crud_tool.update_tool(test_db, tool["id"], ToolUpdate(daily_price=30.0), admin=admin)
+            assert crud_tool.delete_tool(test_db, tool["id"], admin=admin)
+        finally:
+            event.remove(engine, "commit", listener)
+
+        assert len(commits) == 3
+        assert updated["daily_price"] == 30.0
+        assert test_db.query(Tool).count() == 0
+        actions = [log.action for log in test_db.query(AdminLog).order_by(AdminLog.id)]
+        assert actions == ["CREATE", "UPDATE", "DELETE"]
+
+    def test_update_returns_new_updated_at(self, test_db):
+        """Test para devolver el updated_at posterior a la modificación"""
+        admin = SimpleNamespace(id=1, username="admin")
+        tool = crud_tool.create_tool(test_db, ToolCreate(
+            name="Sierra", description="Sierra de prueba", brand="Bosch",
+            model="GKS", category="Eléctricas", daily_price=20.0
+        ), admin=admin)
+        test_db.query(Tool).filter(Tool.id == tool["id"]).update({"updated_at": datetime(2020, 1, 1)})
+        test_db.commit()
+
+        updated = crud_tool.update_tool(test_db, tool["id"], ToolUpdate(daily_price=22.0), admin=admin)
+
+        assert updated["updated_at"] > datetime(2020, 1, 1)
+        assert updated["updated_at"] == test_db.get(Tool, tool["id"]).updated_at
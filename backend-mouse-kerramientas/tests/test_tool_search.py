@@ -0,0 +1,78 @@
+"""
+Tests para la búsqueda de texto completo de herramientas
+"""
+import pytest
+
+from app.crud.tool import search_tools
+from app.models.tool import Tool
+
+
+@pytest.fixture
+def tools(test_db):
+    """Herramientas de ejemplo para las búsquedas"""
+    test_db.add_all([
+        Tool(name="Taladro Inalámbrico", description="Taladro eléctrico de 12V",
+             brand="DeWalt", model="DCD777", category="Eléctricas", daily_price=25.0),
+        Tool(name="Sierra Circular", description="Sierra para cortes rectos, compatible con taladro",
+             brand="Bosch", model="GKS 190", category="Eléctricas", daily_price=30.0),
+        Tool(name="Martillo", description="Martillo de carpintero",
+             brand="Truper", model="MT-16", category="Manuales", daily_price=5.0),
+    ])
+    test_db.commit()
+    return test_db
+
+
+class TestToolSearch:
+    """Tests para la búsqueda de herramientas"""
+
+    def test_prefix_search(self, tools):
+        """Test para búsqueda por prefijo mientras se escribe"""
+        results = search_tools(tools, q="tala")
+
+        assert [tool.name for tool in results] == ["Taladro Inalámbrico", "Sierra Circular"]
+
+    def test_search_ignores_accents(self, tools):
+        """Test para búsqueda sin acentos"""
+        results = search_tools(tools, q="electrico")
+
+        assert [tool.name for tool in results] == ["Taladro Inalámbrico"]
+
+    def test_search_with_filters(self, tools):
+        """Test para combinar búsqueda por texto y filtros"""
+        results = search_tools(tools, q="taladro", brand="Bosch")
+
+        assert [tool.name for tool in results] == ["Sierra Circular"]
+
+    def test_index_follows_updates_and_deletes(self, tools):
+        """Test para mantener el índice sincronizado con la tabla"""
+        hammer = tools.query(Tool).filter(Tool.name == "Martillo").first()
+        hammer.name = "Mazo"
+        tools.commit()
+
+        assert search_tools(tools, q="martillo") != []
+        assert [tool.name for tool in search_tools(tools, q="mazo")] == ["Mazo"]
+
+        tools.delete(hammer)
+        tools.commit()
+
+        assert search_tools(tools, q="mazo") == []
+
+    def test_search_with_fts_syntax(self, tools):
+        """Test para búsquedas con caracteres especiales de FTS"""
+        results = search_tools(tools, q='"sierra" (cir*')
+
+        assert [tool.name for tool in results] == ["Sierra Circular"]
+
+    def test_relevance_pages_by_position(self, tools):
+        """Test para recorrer por cursor los resultados ordenados por relevancia"""
+        seen = []
+        cursor = None
+        while True:
+            page = search_tools(tools, q="taladro", limit=1, cursor=cursor)
+            seen.extend(tool.name for tool in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == [tool.name for tool in search_tools(tools, q="taladro")]
+        assert seen == ["Taladro Inalámbrico", "Sierra Circular"]
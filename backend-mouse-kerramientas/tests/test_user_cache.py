@@ -0,0 +1,73 @@
+"""
+Tests para la caché del usuario autenticado
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.crud.user import create_user, update_user
+from app.dependencies import get_current_user
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_cache import user_cache
+
+
+def _create(db, username="cacheduser"):
+    return create_user(db, UserCreate(
+        email=f"{username}@example.com",
+        username=username,
+        password="testpassword123",
+        password_confirm="testpassword123"
+    ))
+
+
+class TestUserCache:
+    """Tests para get_current_user con caché"""
+
+    def setup_method(self):
+        user_cache.invalidate()
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_query(self, test_db):
+        """La segunda petición con el mismo token no consulta la base de datos"""
+        user = _create(test_db)
+        token = create_access_token(subject=user.username)
+        statements = []
+        engine = test_db.get_bind()
+        listener = lambda connection, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            first = await get_current_user(token, test_db)
+            queries = len(statements)
+            second = await get_current_user(token, test_db)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert queries == 1
+        assert len(statements) == queries
+        assert second.id == first.id
+        assert second.username == "cacheduser"
+        assert second.is_active is True
+
+    @pytest.mark.asyncio
+    async def test_update_user_invalidates(self, test_db):
+        """Desactivar el usuario con update_user invalida su entrada"""
+        user = _create(test_db)
+        token = create_access_token(subject=user.username)
+        await get_current_user(token, test_db)
+
+        update_user(test_db, user.id, UserUpdate(is_active=False))
+
+        assert user_cache.get("cacheduser") is None
+        current = await get_current_user(token, test_db)
+        assert current.is_active is False
+
+    def test_rollback_keeps_entry(self, test_db):
+        """Un cambio descartado no invalida la caché"""
+        user = _create(test_db)
+        user_cache.set(user.username, {"id": user.id})
+
+        user.full_name = "Otro nombre"
+        test_db.flush()
+        test_db.rollback()
+
+        assert user_cache.get("cacheduser") == {"id": user.id}